@@ -7,12 +7,6 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-import torch
-import timm
-import numpy as np
-from torchvision import transforms
-from PIL import Image
-
 COLOR_CLASSES = ['Brownish', 'Greenish']  # Match your training classes
 
 _color_model = None
@@ -29,6 +23,8 @@ def load_color_model(model_path: Optional[str] = None):
 		model_path = DEFAULT_MODEL
 	if not os.path.exists(model_path):
 		raise FileNotFoundError(f"Color model not found: {model_path}")
+	import timm
+	import torch
 	# Use timm to create the model, matching training
 	model = timm.create_model("efficientnet_b0", pretrained=False)
 	model.classifier = torch.nn.Linear(model.classifier.in_features, len(COLOR_CLASSES))
@@ -38,6 +34,8 @@ def load_color_model(model_path: Optional[str] = None):
 	return _color_model
 
 def preprocess_image(img_path: str, target_size=(224, 224)):
+	from PIL import Image
+	from torchvision import transforms
 	img = Image.open(img_path).convert('RGB')
 	transform = transforms.Compose([
 		transforms.Resize(target_size),
@@ -57,6 +55,8 @@ def get_durian_color(image_path: str, model_path: Optional[str] = None) -> Dict[
 		Dict with prediction result
 	"""
 	try:
+		import numpy as np
+		import torch
 		model = load_color_model(model_path)
 		img = preprocess_image(image_path)
 		with torch.no_grad():
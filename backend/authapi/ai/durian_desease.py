@@ -7,8 +7,6 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from ultralytics import YOLO
-
 _disease_model = None
 
 BASE_DIR = Path(__file__).parent.parent.parent
@@ -28,6 +26,7 @@ def load_disease_model(model_path: Optional[str] = None):
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Disease model not found: {model_path}")
 
+    from ultralytics import YOLO
     model = YOLO(str(model_path))
     _disease_model = model
     return _disease_model
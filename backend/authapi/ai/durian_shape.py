@@ -6,12 +6,6 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-import torch
-import timm
-import numpy as np
-from torchvision import transforms
-from PIL import Image
-
 # 🔥 IMPORTANT:
 # Must match training folder order (alphabetical order of folders inside train/)
 # Example:
@@ -37,6 +31,9 @@ def load_shape_model(model_path: Optional[str] = None):
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Shape model not found: {model_path}")
 
+    import timm
+    import torch
+
     # Must match training architecture (EfficientNet-B3)
     model = timm.create_model("efficientnet_b3", pretrained=False)
     model.classifier = torch.nn.Linear(
@@ -54,6 +51,9 @@ def load_shape_model(model_path: Optional[str] = None):
 
 
 def preprocess_image(img_path: str, target_size=(300, 300)):
+    from PIL import Image
+    from torchvision import transforms
+
     img = Image.open(img_path).convert("RGB")
 
     transform = transforms.Compose([
@@ -84,6 +84,8 @@ def get_durian_shape(
         Dict with prediction result
     """
     try:
+        import numpy as np
+        import torch
         model = load_shape_model(model_path)
         img = preprocess_image(image_path)
 
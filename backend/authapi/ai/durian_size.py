@@ -6,12 +6,6 @@ import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-import torch
-import timm
-import numpy as np
-from torchvision import transforms
-from PIL import Image
-
 # Must match training folder order (alphabetical)
 SIZE_CLASSES = ['large', 'medium', 'small']
 
@@ -33,6 +27,9 @@ def load_size_model(model_path: Optional[str] = None):
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Size model not found: {model_path}")
 
+    import timm
+    import torch
+
     # Create same architecture used in training
     model = timm.create_model("efficientnet_b0", pretrained=False)
     model.classifier = torch.nn.Linear(
@@ -50,6 +47,9 @@ def load_size_model(model_path: Optional[str] = None):
 
 
 def preprocess_image(img_path: str, target_size=(224, 224)):
+    from PIL import Image
+    from torchvision import transforms
+
     img = Image.open(img_path).convert('RGB')
 
     transform = transforms.Compose([
@@ -77,6 +77,8 @@ def get_durian_size(image_path: str, model_path: Optional[str] = None) -> Dict[s
         Dict with prediction result
     """
     try:
+        import numpy as np
+        import torch
         model = load_size_model(model_path)
         img = preprocess_image(image_path)
 
@@ -3,120 +3,197 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))  # adds backend/ to path
 
-from flask import Flask, request, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
 import datetime
+import importlib
+from typing import List, Optional
 from flask_mail import Mail
+from utils.json_provider import MongoJSONProvider
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Blueprints
-from routes.analytics_pdf_routes import analytics_pdf_bp
-from routes.forum_routes import forum_bp
-from routes.profile_routes import profile_bp
-from routes.auth_routes import auth_bp
-from routes.admin.admin_routes import admin_bp
-from routes.scanner_routes import scanner_bp
-from routes.chatbot_routes import chatbot_bp
-from routes.shop_routes import shop_bp
-from routes.transaction_routes import bp as transaction_bp
-from routes.admin.gen_analytics_pdf_routes import gen_analytics_pdf_bp
-
-# ---------------------------   
-# Initialize Flask
-# ---------------------------
-app = Flask(__name__)
+# Data access (no connection is opened until the first query)
+from db import configure_cloudinary, get_pool_metrics, ping as db_ping, start_snapshot_scheduler
+configure_cloudinary()
 
 # ---------------------------
-# Enable CORS
+# Roles
 # ---------------------------
-# Allow your local frontend & ngrok URLs
-app = Flask(__name__)
-CORS(app, supports_credentials=True, resources={r"/*": {"origins": "*"}}, expose_headers=["Authorization"])
+# Each role is a set of blueprints that can be deployed on its own:
+#   api       - auth, profile, forum, admin, chatbot, shop, transactions
+#   scanner   - /scanner/*; models run in-process, or on the inference
+#               service when INFERENCE_URL is set (see inference.py)
+#   reports   - analytics PDF reports (see reports/jobs.py)
+#   inference - /infer/*, the model service for scanner nodes
+# Blueprint modules are only imported for the roles being served, so an
+# api-only worker never loads the scanner or report code.
+ROLE_BLUEPRINTS = {
+    "api": [
+        ("routes.forum_routes", "forum_bp", "/forum"),
+        ("routes.profile_routes", "profile_bp", "/profile"),
+        ("routes.auth_routes", "auth_bp", "/auth"),
+        ("routes.admin.admin_routes", "admin_bp", "/admin"),
+        ("routes.chatbot_routes", "chatbot_bp", "/chatbot"),
+        ("routes.shop_routes", "shop_bp", "/shop"),
+        ("routes.transaction_routes", "bp", "/api"),
+    ],
+    "scanner": [
+        ("routes.scanner_routes", "scanner_bp", "/scanner"),
+    ],
+    "reports": [
+        ("routes.analytics_pdf_routes", "analytics_pdf_bp", None),
+        ("routes.admin.gen_analytics_pdf_routes", "gen_analytics_pdf_bp", None),
+    ],
+    "inference": [
+        ("routes.inference_routes", "inference_bp", "/infer"),
+    ],
+}
+DEFAULT_ROLES = ("api", "scanner", "reports")
+# Roles whose workers keep the analytics snapshots (db/snapshots.py) current
+SNAPSHOT_ROLES = ("api", "reports")
+# Roles that send email, and so deliver the outbox (handlers/outbox.py)
+OUTBOX_ROLES = ("api",)
 
-# ---------------------------
-# Configure Mail
-# ---------------------------
-app.config['MAIL_SERVER'] = os.getenv("MAIL_HOST")
-app.config['MAIL_PORT'] = int(os.getenv("MAIL_PORT", 2525))
-app.config['MAIL_USE_TLS'] = True
-app.config['MAIL_USE_SSL'] = False
-app.config['MAIL_TIMEOUT'] = 10
-app.config['MAIL_USERNAME'] = os.getenv("MAIL_USERNAME")
-app.config['MAIL_PASSWORD'] = os.getenv("MAIL_PASSWORD")
-app.config['MAIL_DEFAULT_SENDER'] = (
-    os.getenv("MAIL_FROM_NAME", "DurianSupport"),
-    os.getenv("MAIL_FROM_ADDRESS", "duriansupport@durianapp.com")
-)
-
-mail = Mail(app)
+ENDPOINTS = {
+    "api": {"auth": "/auth/*", "profile": "/profile/*", "forum": "/forum/*"},
+    "scanner": {"scanner": "/scanner/*"},
+    "reports": {"reports": "/analytics/*"},
+    "inference": {"inference": "/infer/*"},
+}
 
-# ---------------------------
-# Register Blueprints
-# ---------------------------
-app.register_blueprint(forum_bp, url_prefix='/forum')
-app.register_blueprint(profile_bp, url_prefix='/profile')
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(admin_bp, url_prefix='/admin')
-app.register_blueprint(scanner_bp, url_prefix='/scanner')
-app.register_blueprint(chatbot_bp, url_prefix='/chatbot')
-app.register_blueprint(shop_bp, url_prefix='/shop')
-app.register_blueprint(transaction_bp, url_prefix='/api')
-app.register_blueprint(analytics_pdf_bp)
-app.register_blueprint(gen_analytics_pdf_bp)
+mail = Mail()
+
+
+def parse_roles(value: Optional[str]) -> List[str]:
+    roles = [r.strip().lower() for r in (value or "").split(",") if r.strip()]
+    if not roles or roles == ["all"]:
+        return list(DEFAULT_ROLES)
+    unknown = [r for r in roles if r not in ROLE_BLUEPRINTS]
+    if unknown:
+        raise ValueError(f"Unknown APP_ROLES: {', '.join(unknown)} (choose from {', '.join(ROLE_BLUEPRINTS)})")
+    return roles
+
+
+def register_roles(app: Flask, roles: List[str]):
+    for role in roles:
+        for module_name, attr, prefix in ROLE_BLUEPRINTS[role]:
+            blueprint = getattr(importlib.import_module(module_name), attr)
+            app.register_blueprint(blueprint, url_prefix=prefix)
+
+
+def configure_mail(app: Flask):
+    app.config['MAIL_SERVER'] = os.getenv("MAIL_HOST")
+    app.config['MAIL_PORT'] = int(os.getenv("MAIL_PORT", 2525))
+    app.config['MAIL_USE_TLS'] = True
+    app.config['MAIL_USE_SSL'] = False
+    app.config['MAIL_TIMEOUT'] = 10
+    app.config['MAIL_USERNAME'] = os.getenv("MAIL_USERNAME")
+    app.config['MAIL_PASSWORD'] = os.getenv("MAIL_PASSWORD")
+    app.config['MAIL_DEFAULT_SENDER'] = (
+        os.getenv("MAIL_FROM_NAME", "DurianSupport"),
+        os.getenv("MAIL_FROM_ADDRESS", "duriansupport@durianapp.com")
+    )
+    mail.init_app(app)
 
-# ---------------------------
-# Core App Routes
-# ---------------------------
-@app.route("/health", methods=["GET"])
-def health():
-    return jsonify({
-        "status": "healthy",
-        "timestamp": datetime.datetime.utcnow().isoformat(),
-        "endpoints": {
-            "auth": "/auth/*",
-            "profile": "/profile/*",
-            "forum": "/forum/*"
-        }
-    })
-
-@app.route("/", methods=["GET", "OPTIONS"])
-def home():
-    return jsonify({
-        "message": "Durian App API",
-        "version": "2.0.0",
-        "endpoints": {
-            "auth": "/auth/*",
-            "profile": "/profile/*",
-            "forum": "/forum/*"
-        }
-    })
-
-@app.route("/status", methods=["GET", "OPTIONS"])
-def status():
-    return jsonify({
-        "message": "Auth API is running!",
-        "version": "2.0.0",
-        "endpoints": {
-            "auth": "/auth/* (signup, login, signup-with-pfp)",
-            "profile": "/profile/* (get, update, update-pfp)",
-            "forum": "/forum/* (posts, comments)"
-        }
-    })
 
 # ---------------------------
-# Error Handlers
+# App Factory
 # ---------------------------
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({"success": False, "error": "Endpoint not found"}), 404
+def create_app(roles: Optional[List[str]] = None) -> Flask:
+    """Build the app for the given roles (default: APP_ROLES, or api+scanner+reports)."""
+    roles = parse_roles(",".join(roles)) if roles else parse_roles(os.getenv("APP_ROLES"))
+
+    app = Flask(__name__)
+    app.config['APP_ROLES'] = roles
+    app.json = MongoJSONProvider(app)  # ObjectId/datetime-aware, orjson-backed when available
+    # Allow your local frontend & ngrok URLs
+    CORS(app, supports_credentials=True, resources={r"/*": {"origins": "*"}}, expose_headers=["Authorization"])
+    configure_mail(app)
+    register_roles(app, roles)
+
+    endpoints = {}
+    for role in roles:
+        endpoints.update(ENDPOINTS[role])
+    app.config['ENDPOINTS'] = endpoints
+
+    # ---------------------------
+    # Core App Routes
+    # ---------------------------
+    @app.route("/health", methods=["GET"])
+    def health():
+        return jsonify({
+            "status": "healthy",
+            "roles": roles,
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "endpoints": endpoints
+        })
+
+    @app.route("/health/db", methods=["GET"])
+    def health_db():
+        db_status = db_ping()
+        return jsonify({
+            "status": "healthy" if db_status["ok"] else "unhealthy",
+            "mongo": db_status,
+            "pool": get_pool_metrics(),
+            "timestamp": datetime.datetime.utcnow().isoformat()
+        }), 200 if db_status["ok"] else 503
+
+    @app.route("/", methods=["GET", "OPTIONS"])
+    def home():
+        return jsonify({
+            "message": "Durian App API",
+            "version": "2.0.0",
+            "roles": roles,
+            "endpoints": endpoints
+        })
+
+    @app.route("/status", methods=["GET", "OPTIONS"])
+    def status():
+        return jsonify({
+            "message": "Auth API is running!",
+            "version": "2.0.0",
+            "endpoints": {
+                "auth": "/auth/* (signup, login, signup-with-pfp)",
+                "profile": "/profile/* (get, update, update-pfp)",
+                "forum": "/forum/* (posts, comments)"
+            }
+        })
+
+    # ---------------------------
+    # Error Handlers
+    # ---------------------------
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({"success": False, "error": "Endpoint not found"}), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        return jsonify({"success": False, "error": "Internal server error"}), 500
+
+    print(f"[APP] Serving roles: {', '.join(roles)}")
+    return app
+
+
+def start_background(app: Flask):
+    """
+    Start the snapshot and outbox threads for the app's roles. Called from
+    the serving process only (gunicorn's post_worker_init, or the dev server
+    below), never at import, so tools that import the app stay thread-free.
+    """
+    roles = app.config['APP_ROLES']
+    if any(role in SNAPSHOT_ROLES for role in roles):
+        start_snapshot_scheduler()
+    if any(role in OUTBOX_ROLES for role in roles):
+        from handlers.outbox import start_outbox_workers
+        start_outbox_workers()
+
 
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({"success": False, "error": "Internal server error"}), 500
+# gunicorn app:app (roles from APP_ROLES)
+app = create_app()
 
 # ---------------------------
 # Run App
@@ -124,10 +201,9 @@ def internal_error(error):
 if __name__ == "__main__":
     print("🚀 Starting Durian App API v2.0.0")
     print("📋 Available endpoints:")
-    print("  🔐 Auth: /auth/*")
-    print("  👤 Profile: /profile/*")
-    print("  💬 Forum: /forum/*")
-    print("  ⚙️  Admin: /admin/*")
-    print("  📷 Scanner: /scanner/*")
-    print("  ❤️  Health: /health")
-    app.run(debug=True, host="0.0.0.0", port=8000)
\ No newline at end of file
+    for name, path in app.config['ENDPOINTS'].items():
+        print(f"  {name}: {path}")
+    print("  health: /health")
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background(app)  # in the reloader's child, not the watcher process
+    app.run(debug=True, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
\ No newline at end of file
@@ -1,17 +1,15 @@
 # backend/authapi/auth.py
 from flask import request, jsonify
-from db import users_collection, upload_user_pfp
-from passlib.context import CryptContext
+from db import users_collection, upload_user_pfp, record_user_created
+from db.cache import TTLCache
+from passwords import pwd_context, hash_password, verify_password, verify_and_update, HashingBusy
 from jose import jwt
 from bson.objectid import ObjectId
 from functools import wraps
 import datetime
 import os
-
-# ---------------------------
-# Password hashing
-# ---------------------------
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+import threading
+import time
 
 # ---------------------------
 # JWT config
@@ -21,32 +19,150 @@ JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
 # ---------------------------
-# Helper functions
+# Principal cache
 # ---------------------------
+# Tokens carry signed "role" and "active" claims. A per-process cache of
+# user documents (without the password hash) answers authorization checks;
+# on a miss, claims from a token younger than the cache TTL are trusted
+# unless the user's role or status changed after the token was issued.
+# Older tokens fall back to one users lookup, which is then cached.
+#
+# The cache is per worker, so role and status changes go through
+# invalidate_principal()/refresh_principals(), which also stamp
+# authzChangedAt on the user. Every worker polls for those stamps (one
+# indexed query per AUTHZ_SYNC_SECONDS, on the next auth check) and drops
+# the affected entries: a demotion or deactivation reaches all workers
+# within AUTHZ_SYNC_SECONDS, not PRINCIPAL_CACHE_TTL_SECONDS.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+AUTHZ_SYNC_SECONDS = float(os.getenv("AUTHZ_SYNC_SECONDS", 1))
+PRINCIPAL_PROJECTION = {"password": 0}
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+_principal_cache = TTLCache(ttl=PRINCIPAL_CACHE_TTL_SECONDS, maxsize=10000)
+_authz_changes = {}  # user id -> epoch seconds of the last change seen
+_authz_synced_at = time.time() - PRINCIPAL_CACHE_TTL_SECONDS
+_authz_lock = threading.Lock()
 
-def verify_password(password: str, hashed: str) -> bool:
-    try:
-        return pwd_context.verify(password, hashed)
-    except:
-        return password == hashed
+# ---------------------------
+# Helper functions
+# ---------------------------
 
-def get_current_admin():
+def create_access_token(user: dict) -> str:
+    now = datetime.datetime.utcnow()
+    payload = {
+        "sub": str(user["_id"]),
+        "role": user.get("role", "user"),
+        "active": user.get("isActive", True),
+        "iat": now,
+        "exp": now + datetime.timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def decode_request_token():
+    """Return the verified JWT payload of the current request, or None."""
+    if hasattr(request, "jwt_payload"):
+        return request.jwt_payload
+    payload = None
     auth_header = request.headers.get("Authorization")
-    if not auth_header:
+    if auth_header:
+        try:
+            token = auth_header.split(" ")[1]
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        except Exception:
+            payload = None
+    request.jwt_payload = payload
+    return payload
+
+def load_principal(user_id):
+    """Fetch a user (without password) from MongoDB and cache it."""
+    user = users_collection.find_one({"_id": ObjectId(user_id)}, PRINCIPAL_PROJECTION)
+    if user:
+        _principal_cache.set(str(user_id), user)
+    else:
+        _principal_cache.invalidate(str(user_id))
+    return user
+
+def _mark_authz_changed(oids):
+    """Stamp the users so other workers drop their cached principals."""
+    users_collection.update_many({"_id": {"$in": oids}}, {"$set": {"authzChangedAt": datetime.datetime.utcnow()}})
+
+def _sync_authz_changes():
+    """Drop cached principals whose role or status another worker changed."""
+    global _authz_synced_at
+    if time.time() - _authz_synced_at < AUTHZ_SYNC_SECONDS:
+        return
+    with _authz_lock:
+        now = time.time()
+        if now - _authz_synced_at < AUTHZ_SYNC_SECONDS:
+            return
+        # Overlap the previous window so a stamp written mid-poll is not missed
+        since = datetime.datetime.utcfromtimestamp(_authz_synced_at - AUTHZ_SYNC_SECONDS)
+        for user in users_collection.find({"authzChangedAt": {"$gt": since}}, {"authzChangedAt": 1}):
+            user_id = str(user["_id"])
+            changed_at = user["authzChangedAt"].replace(tzinfo=datetime.timezone.utc).timestamp()
+            if _authz_changes.get(user_id, 0) < changed_at:
+                _authz_changes[user_id] = changed_at
+                _principal_cache.invalidate(user_id)
+        # Claims older than the cache TTL are never trusted, so older changes can go
+        cutoff = now - PRINCIPAL_CACHE_TTL_SECONDS - AUTHZ_SYNC_SECONDS
+        for user_id in [k for k, t in _authz_changes.items() if t < cutoff]:
+            del _authz_changes[user_id]
+        _authz_synced_at = now
+
+def invalidate_principal(user_id):
+    """Refresh the cached principal after a role, status or profile change."""
+    _mark_authz_changed([ObjectId(user_id)])
+    _principal_cache.invalidate(str(user_id))
+    load_principal(user_id)
+
+def refresh_principals(user_ids):
+    """invalidate_principal for many users with a single query."""
+    oids = [ObjectId(user_id) for user_id in user_ids]
+    if not oids:
+        return
+    _mark_authz_changed(oids)
+    found = set()
+    for user in users_collection.find({"_id": {"$in": oids}}, PRINCIPAL_PROJECTION):
+        _principal_cache.set(str(user["_id"]), user)
+        found.add(user["_id"])
+    for oid in oids:
+        if oid not in found:
+            _principal_cache.invalidate(str(oid))
+
+def get_principal(payload: dict):
+    """Role and status for a verified token, without a DB read on the hot path."""
+    _sync_authz_changes()
+    user_id = payload.get("sub")
+    user = _principal_cache.get(user_id)
+    if user is not None:
+        return user
+    issued_at = payload.get("iat")
+    if "role" in payload and issued_at is not None:
+        age = time.time() - issued_at
+        # Fails closed: a change in the same second as iat means a DB read
+        if age < PRINCIPAL_CACHE_TTL_SECONDS and _authz_changes.get(user_id, 0) < issued_at:
+            return {"_id": ObjectId(user_id), "role": payload["role"], "isActive": payload.get("active", True)}
+    return load_principal(user_id)
+
+def get_current_user():
+    """Return the (cached) user document for the request's token, or None."""
+    payload = decode_request_token()
+    if not payload:
         return None
     try:
-        token = auth_header.split(" ")[1]
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        _sync_authz_changes()
         user_id = payload.get("sub")
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
-        if not user or user.get("role") != "admin":
-            return None
-        return user
-    except:
+        user = _principal_cache.get(user_id) or load_principal(user_id)
+    except Exception:
         return None
+    if not user or not user.get("isActive", True):
+        return None
+    return user
+
+def get_current_admin():
+    user = get_current_user()
+    if not user or user.get("role") != "admin":
+        return None
+    return user
 
 # ---------------------------
 # JWT decorators
@@ -59,12 +175,10 @@ def jwt_required(f):
         auth_header = request.headers.get("Authorization")
         if not auth_header:
             return jsonify({"success": False, "error": "Authorization header missing"}), 401
-        try:
-            token = auth_header.split(" ")[1]
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            request.user_id = payload.get("sub")
-        except Exception as e:
+        payload = decode_request_token()
+        if not payload:
             return jsonify({"success": False, "error": "Invalid or expired token"}), 401
+        request.user_id = payload.get("sub")
         return f(*args, **kwargs)
     return decorated
 
@@ -73,10 +187,13 @@ def admin_required(f):
     @wraps(f)
     @jwt_required
     def decorated(*args, **kwargs):
-        user = users_collection.find_one({"_id": ObjectId(request.user_id)})
-        if not user or user.get("role") != "admin":
+        try:
+            principal = get_principal(request.jwt_payload)
+        except Exception:
+            principal = None
+        if not principal or principal.get("role") != "admin" or not principal.get("isActive", True):
             return jsonify({"success": False, "error": "Admin access required"}), 403
-        request.user = user
+        request.user = principal
         return f(*args, **kwargs)
     return decorated
 
@@ -89,7 +206,11 @@ def signup_user(name: str, email: str, password: str, confirm_password: str):
         return {"error": "Passwords do not match"}
     if users_collection.find_one({"email": email}):
         return {"error": "User already exists"}
-    hashed = hash_password(password)
+    try:
+        hashed = hash_password(password)
+    except HashingBusy:
+        return {"error": "Server busy, please try again", "busy": True}
+    created_at = datetime.datetime.utcnow()
     users_collection.insert_one({
         "name": name,
         "email": email,
@@ -97,25 +218,30 @@ def signup_user(name: str, email: str, password: str, confirm_password: str):
         "role": "user",
         "isLoggedIn": False,
         "photoProfile": "https://via.placeholder.com/120",
-        "createdAt": datetime.datetime.utcnow()
+        "createdAt": created_at
     })
+    record_user_created(created_at)
     return {"success": True, "message": "User registered successfully"}
 
 def login_user(email: str, password: str):
     user = users_collection.find_one({"email": email})
-    if not user or not verify_password(password, user["password"]):
+    if not user:
+        return {"error": "Invalid credentials"}
+    try:
+        valid, new_hash = verify_and_update(password, user["password"])
+    except HashingBusy:
+        return {"error": "Server busy, please try again", "busy": True}
+    if not valid:
         return {"error": "Invalid credentials"}
     if not user.get("isActive", True):
         return {"error": "User is deactivated. Please contact support."}
-    users_collection.update_one(
-        {"_id": user["_id"]},
-        {"$set": {"isLoggedIn": True, "lastLogin": datetime.datetime.utcnow()}}
-    )
-    payload = {
-        "sub": str(user["_id"]),
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
-    }
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    update = {"isLoggedIn": True, "lastLogin": datetime.datetime.utcnow()}
+    if new_hash:
+        # Stored hash uses outdated parameters: upgrade it transparently
+        update["password"] = new_hash
+    users_collection.update_one({"_id": user["_id"]}, {"$set": update})
+    _principal_cache.invalidate(str(user["_id"]))
+    token = create_access_token(user)
     return {
         "success": True,
         "token": token,
@@ -137,7 +263,10 @@ def signup_user_with_pfp(name, email, password, confirm_password, photo_file=Non
         return {"error": "Passwords do not match"}
     if users_collection.find_one({"email": email}):
         return {"error": "User already exists"}
-    hashed = hash_password(password)
+    try:
+        hashed = hash_password(password)
+    except HashingBusy:
+        return {"error": "Server busy, please try again", "busy": True}
     user_doc = {
         "name": name,
         "email": email,
@@ -148,6 +277,7 @@ def signup_user_with_pfp(name, email, password, confirm_password, photo_file=Non
         "lastLogin": datetime.datetime.utcnow()
     }
     result = users_collection.insert_one(user_doc)
+    record_user_created(user_doc["createdAt"])
     user_id = str(result.inserted_id)
     photo_data = None
 
@@ -181,11 +311,7 @@ def signup_user_with_pfp(name, email, password, confirm_password, photo_file=Non
         users_collection.update_one({"_id": result.inserted_id}, {"$set": photo_data})
 
     user = users_collection.find_one({"_id": result.inserted_id})
-    payload = {
-        "sub": str(user["_id"]),
-        "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
-    }
-    token = jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    token = create_access_token(user)
     return {
         "success": True,
         "message": "User registered successfully",
@@ -0,0 +1,70 @@
+# backend/authapi/concurrency.py
+"""
+Concurrency helpers shared by the sync (threaded) and gevent serving modes
+
+In production the app runs under gunicorn's gevent worker (see
+gunicorn.conf.py). All socket I/O is monkey-patched there, so outbound HTTP
+(chatbot, reports), Cloudinary uploads, SMTP and MongoDB calls yield to
+other requests instead of holding a thread. CPU-bound work (model
+inference, password hashing) would block the event loop, so it must go
+through a NativePool, which runs it on real OS threads in that mode.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", min(2, os.cpu_count() or 1)))
+
+
+def gevent_active() -> bool:
+    """True when the process has been monkey-patched by gevent."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("socket")
+
+
+class NativePool:
+    """
+    Runs blocking CPU-bound calls on real OS threads.
+
+    Under gevent this is the hub's native thread pool, so waiting greenlets
+    keep serving I/O. Otherwise it is a plain ThreadPoolExecutor. Pools are
+    rebuilt after fork, since threads do not survive it.
+    """
+
+    def __init__(self, size: int, name: str):
+        self.size = max(1, size)
+        self.name = name
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    if gevent_active():
+                        from gevent.threadpool import ThreadPool
+                        self._pool = ThreadPool(self.size)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=self.name)
+                    self._pid = pid
+        return self._pool
+
+    def run(self, fn, *args, **kwargs):
+        pool = self._get_pool()
+        if isinstance(pool, ThreadPoolExecutor):
+            return pool.submit(fn, *args, **kwargs).result()
+        return pool.spawn(fn, *args, **kwargs).get()
+
+
+inference_pool = NativePool(INFERENCE_WORKERS, "inference")
+
+
+def run_inference(fn, *args, **kwargs):
+    """Run a model call off the request thread/greenlet."""
+    return inference_pool.run(fn, *args, **kwargs)
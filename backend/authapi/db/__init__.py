@@ -0,0 +1,165 @@
+# Data-access module - MongoDB collections and query helpers
+from .connection import (
+    MONGO_URI,
+    get_client,
+    get_database,
+    get_db,
+    close_client,
+    get_pool_metrics,
+    ping,
+    LazyCollection,
+    users_collection,
+    posts_collection,
+    comments_collection,
+    analytics_collection,
+    scans_collection,
+    products_collection
+)
+from .users import (
+    set_logged_in,
+    update_photo_profile,
+    build_user_query,
+    list_users,
+    count_users,
+    bulk_update_users,
+    iter_users
+)
+from .authors import get_author, get_authors, invalidate_author, hydrate_authors
+from .forum import (
+    create_comment,
+    get_comments_by_post,
+    get_comment_count,
+    like_comment,
+    toggle_comment_like,
+    update_comment,
+    delete_comment,
+    get_user_comments,
+    has_user_liked_comment,
+    create_post,
+    get_post,
+    get_posts,
+    like_post,
+    toggle_post_like,
+    get_forum_stats
+)
+from .likes import (
+    likes_collection,
+    toggle_like,
+    liked_target_ids,
+    annotate_liked,
+    has_user_liked
+)
+from .views import record_view, pending_views, flush_views
+from .search import search_posts, build_search_query
+from .counts import forum_totals, rebuild_category_counters
+from .embeddings import index_post, related_posts, rank_texts, rebuild_post_index
+from .media import (
+    configure_cloudinary,
+    upload_user_pfp,
+    delete_user_pfp,
+    get_pfp_url,
+    generate_default_pfp_url
+)
+from .scans import (
+    save_scan,
+    get_user_scans,
+    get_scan_by_id,
+    delete_scan,
+    get_user_scan_stats,
+    get_weekly_scan_data,
+    get_quality_distribution
+)
+from .rollups import rollups_collection, record_user_created, rebuild_rollups
+from .snapshots import take_snapshot, catch_up as take_due_snapshots, latest_metrics, start_snapshot_scheduler
+from .analytics import (
+    get_user_analytics,
+    get_admin_analytics,
+    compute_admin_analytics,
+    get_latest_metrics,
+    get_admin_analytics_data,
+    get_user_data_version,
+    get_admin_data_version
+)
+
+__all__ = [
+    'get_client',
+    'get_database',
+    'get_db',
+    'close_client',
+    'get_pool_metrics',
+    'ping',
+    'users_collection',
+    'posts_collection',
+    'comments_collection',
+    'analytics_collection',
+    'scans_collection',
+    'products_collection',
+    'set_logged_in',
+    'update_photo_profile',
+    'build_user_query',
+    'list_users',
+    'count_users',
+    'bulk_update_users',
+    'iter_users',
+    'get_author',
+    'get_authors',
+    'invalidate_author',
+    'hydrate_authors',
+    'create_comment',
+    'get_comments_by_post',
+    'get_comment_count',
+    'like_comment',
+    'toggle_comment_like',
+    'update_comment',
+    'delete_comment',
+    'get_user_comments',
+    'has_user_liked_comment',
+    'create_post',
+    'get_post',
+    'get_posts',
+    'like_post',
+    'toggle_post_like',
+    'get_forum_stats',
+    'likes_collection',
+    'toggle_like',
+    'liked_target_ids',
+    'annotate_liked',
+    'has_user_liked',
+    'record_view',
+    'pending_views',
+    'flush_views',
+    'search_posts',
+    'build_search_query',
+    'forum_totals',
+    'rebuild_category_counters',
+    'index_post',
+    'related_posts',
+    'rank_texts',
+    'rebuild_post_index',
+    'configure_cloudinary',
+    'upload_user_pfp',
+    'delete_user_pfp',
+    'get_pfp_url',
+    'generate_default_pfp_url',
+    'save_scan',
+    'get_user_scans',
+    'get_scan_by_id',
+    'delete_scan',
+    'get_user_scan_stats',
+    'get_weekly_scan_data',
+    'get_quality_distribution',
+    'rollups_collection',
+    'record_user_created',
+    'rebuild_rollups',
+    'take_snapshot',
+    'take_due_snapshots',
+    'latest_metrics',
+    'start_snapshot_scheduler',
+    'get_user_analytics',
+    'get_admin_analytics',
+    'compute_admin_analytics',
+    'get_latest_metrics',
+    'get_admin_analytics_data',
+    'get_user_data_version',
+    'get_admin_data_version',
+]
@@ -0,0 +1,192 @@
+# backend/authapi/db/analytics.py
+"""
+Analytics service layer
+
+The JSON endpoints (/scanner/analytics/<user_id>, /admin/GenAnalytics) and
+the PDF report routes all build their data here, in-process, instead of the
+PDF routes calling the API over HTTP.
+
+Platform-wide numbers come from the daily rollups in db/rollups.py, never
+from scanning the scans collection.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from .cache import TTLCache
+from .connection import users_collection, posts_collection, scans_collection
+from .counts import estimated_total
+from .rollups import rollups_collection, COUNTERS, STATUS_FIELDS, day_key, day_start
+from .snapshots import latest_metrics
+from .scans import get_user_scan_stats, get_weekly_scan_data, get_quality_distribution, get_user_scans
+
+ADMIN_ANALYTICS_TTL_SECONDS = float(os.getenv("ADMIN_ANALYTICS_TTL_SECONDS", 30))
+ADMIN_DAILY_DAYS = 7
+
+_admin_cache = TTLCache(ttl=ADMIN_ANALYTICS_TTL_SECONDS, maxsize=4)
+
+
+def format_time_ago(created_at: Optional[datetime], now: Optional[datetime] = None) -> str:
+    if not created_at:
+        return "Unknown"
+    time_diff = (now or datetime.utcnow()) - created_at
+    if time_diff.days > 0:
+        return f"{time_diff.days} days ago"
+    if time_diff.seconds > 3600:
+        return f"{time_diff.seconds // 3600} hrs ago"
+    if time_diff.seconds > 60:
+        return f"{time_diff.seconds // 60} min ago"
+    return "Just now"
+
+
+def get_user_analytics(user_id: str, time_range: str = "month", recent_limit: int = 10) -> Dict[str, Any]:
+    """Stats, weekly activity, quality distribution and recent scans for one user."""
+    now = datetime.utcnow()
+    recent_scans = [
+        {
+            "id": str(scan.get("_id")),
+            "variety": scan.get("variety", "Unknown"),
+            "quality": scan.get("quality_score", 0),
+            "status": scan.get("status", "Unknown"),
+            "time": format_time_ago(scan.get("created_at"), now),
+            "image_url": scan.get("image_url"),
+            "thumbnail_url": scan.get("thumbnail_url"),
+            "created_at": scan.get("created_at"),
+            "durian_count": scan.get("durian_count", 0),
+            "confidence": scan.get("confidence", 0)
+        }
+        for scan in get_user_scans(user_id, limit=recent_limit)
+    ]
+    return {
+        "stats": get_user_scan_stats(user_id, time_range),
+        "weekly_data": get_weekly_scan_data(user_id),
+        "quality_distribution": get_quality_distribution(user_id, time_range),
+        "recent_scans": recent_scans,
+        "time_range": time_range
+    }
+
+
+# ---------------------------
+# Platform analytics
+# ---------------------------
+
+def _platform_pipeline(since: str):
+    totals = {field: {"$sum": f"${field}"} for field in COUNTERS}
+    return [{"$facet": {
+        "totals": [{"$group": {"_id": None, **totals}}],
+        "daily": [
+            {"$match": {"_id": {"$gte": since}}},
+            {"$project": {"scans": 1, "durians": 1, "new_users": 1, "rejected": 1}}
+        ]
+    }}]
+
+
+def _daily_series(rows: List[Dict[str, Any]], today: datetime) -> List[Dict[str, Any]]:
+    """One entry per day of the window, oldest first, zero-filled."""
+    by_day = {row["_id"]: row for row in rows}
+    series = []
+    for offset in range(ADMIN_DAILY_DAYS - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        row = by_day.get(day_key(day), {})
+        series.append({
+            "day": day.strftime("%a"),
+            "date": day_key(day),
+            "scans": row.get("scans", 0),
+            "successful": row.get("scans", 0) - row.get("rejected", 0),
+            "durians": row.get("durians", 0),
+            "new_users": row.get("new_users", 0)
+        })
+    return series
+
+
+def _percent(part: float, whole: float) -> float:
+    return round(part / whole * 100, 2) if whole else 0
+
+
+def compute_admin_analytics() -> Dict[str, Any]:
+    """
+    Platform totals, status breakdown and daily series in one $facet over
+    the daily rollups, so the cost depends on the number of days, not scans.
+    """
+    today = day_start(datetime.utcnow())
+    since = day_key(today - timedelta(days=ADMIN_DAILY_DAYS - 1))
+    result = next(rollups_collection.aggregate(_platform_pipeline(since)), {})
+    totals = (result.get("totals") or [{}])[0]
+
+    total_scans = totals.get("scans", 0)
+    rejected = totals.get("rejected", 0)
+    successful = total_scans - rejected
+    return {
+        "total_users": estimated_total("users")[0],
+        "total_posts": estimated_total("posts")[0],
+        "total_scans": total_scans,
+        "total_durians_detected": totals.get("durians", 0),
+        "overall_success_rate": _percent(successful, total_scans),
+        "avg_quality": round(totals.get("quality_sum", 0) / total_scans, 1) if total_scans else 0,
+        "status_breakdown": {field: totals.get(field, 0) for field in STATUS_FIELDS.values()},
+        "scan_success_breakdown": {"successful": successful, "rejected": rejected},
+        "daily_scans": _daily_series(result.get("daily", []), today)
+    }
+
+
+def get_latest_metrics() -> Optional[Dict[str, Any]]:
+    """The newest analytics snapshot's metrics (see db/snapshots.py), cached."""
+    return _admin_cache.get_or_set("snapshot", latest_metrics)
+
+
+def get_admin_analytics() -> Dict[str, Any]:
+    """Platform-wide analytics for the admin GenAnalytics page (cached)."""
+    def load():
+        data = compute_admin_analytics()
+        snapshot = get_latest_metrics() or {}
+        data["user_growth_percent"] = snapshot.get("user_growth_percent", 0)
+        data["weekly_growth_percent"] = snapshot.get("weekly_growth_percent", 0)
+        return data
+
+    return _admin_cache.get_or_set("platform", load)
+
+
+def _latest_scan_id(query: Dict[str, Any]) -> str:
+    latest = scans_collection.find_one(query, {"_id": 1}, sort=[("_id", -1)])
+    return str(latest["_id"]) if latest else "none"
+
+
+def get_user_data_version(user_id: str) -> str:
+    """
+    Changes whenever the user's report would: a scan is added or removed,
+    or the UTC day rolls over (time windows and "x days ago" labels shift).
+    """
+    try:
+        query = {"user_id": ObjectId(user_id)}
+    except InvalidId:
+        query = {"user_id": user_id}
+    day = datetime.utcnow().strftime("%Y-%m-%d")
+    return f"{day}:{scans_collection.count_documents(query)}:{_latest_scan_id(query)}"
+
+
+def get_admin_data_version() -> str:
+    """The latest snapshot, or before the first one the platform-wide totals."""
+    snapshot = get_latest_metrics()
+    if snapshot:
+        return snapshot["snapshot_id"]
+    day = datetime.utcnow().strftime("%Y-%m-%d")
+    counts = [
+        users_collection.estimated_document_count(),
+        posts_collection.estimated_document_count(),
+        scans_collection.estimated_document_count()
+    ]
+    return f"{day}:{':'.join(map(str, counts))}:{_latest_scan_id({})}"
+
+
+def get_admin_analytics_data():
+    """
+    Fetches GenAnalytics data for the PDF report: the latest snapshot's
+    metrics, or the live numbers before the first snapshot is taken.
+    """
+    data = dict(get_latest_metrics() or get_admin_analytics())
+    data.setdefault("total_posts", estimated_total("posts")[0])
+    return data
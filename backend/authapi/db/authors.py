@@ -0,0 +1,73 @@
+# backend/authapi/db/authors.py
+"""
+Author profile cache
+
+Posts, comments and scans store a copy of the author's name and avatar
+taken at write time. Writes now take that copy from a per-process TTL
+cache instead of a users lookup, and read endpoints call hydrate_authors()
+to overwrite the stored copies with current values for a whole page in a
+single $in query. Profile and avatar updates call invalidate_author().
+"""
+
+import os
+from typing import Optional, Dict, Any, List, Iterable
+
+from bson import ObjectId
+
+from .cache import TTLCache
+from .connection import users_collection
+
+AUTHOR_CACHE_TTL_SECONDS = float(os.getenv("AUTHOR_CACHE_TTL_SECONDS", 300))
+
+AUTHOR_PROJECTION = {"name": 1, "photoProfile": 1, "photoThumbnail": 1}
+
+_author_cache = TTLCache(ttl=AUTHOR_CACHE_TTL_SECONDS, maxsize=10000)
+
+
+def _oid(value) -> ObjectId:
+    return ObjectId(value) if not isinstance(value, ObjectId) else value
+
+
+def get_author(user_id) -> Optional[Dict[str, Any]]:
+    """Return {"_id", "name", "photoProfile", ...} for a user, or None."""
+    return get_authors([user_id]).get(_oid(user_id))
+
+
+def get_authors(user_ids: Iterable) -> Dict[ObjectId, Dict[str, Any]]:
+    """Resolve many authors: cache hits first, then one $in query for the rest."""
+    authors: Dict[ObjectId, Dict[str, Any]] = {}
+    missing: List[ObjectId] = []
+    for oid in {_oid(u) for u in user_ids if u}:
+        author = _author_cache.get(oid)
+        if author is None:
+            missing.append(oid)
+        else:
+            authors[oid] = author
+
+    if missing:
+        for user in users_collection.find({"_id": {"$in": missing}}, AUTHOR_PROJECTION):
+            _author_cache.set(user["_id"], user)
+            authors[user["_id"]] = user
+    return authors
+
+
+def invalidate_author(user_id):
+    if user_id:
+        _author_cache.invalidate(_oid(user_id))
+
+
+def hydrate_authors(
+    docs: List[Dict[str, Any]],
+    user_field: str = "user_id",
+    name_field: str = "username",
+    avatar_field: str = "user_avatar"
+) -> List[Dict[str, Any]]:
+    """Replace stored author copies on a page of documents with current profiles."""
+    authors = get_authors(d.get(user_field) for d in docs if isinstance(d.get(user_field), ObjectId))
+    for doc in docs:
+        author = authors.get(doc.get(user_field))
+        if author:
+            doc[name_field] = author.get("name", doc.get(name_field, "Anonymous"))
+            if avatar_field:
+                doc[avatar_field] = author.get("photoProfile", doc.get(avatar_field, ""))
+    return docs
@@ -0,0 +1,314 @@
+# backend/authapi/db/connection.py
+"""
+MongoDB connection handling
+
+The client is created lazily on first use, so importing the data-access
+package never opens sockets and each process ends up with exactly one
+connection pool. A client inherited across fork() (gunicorn pre-fork
+workers) is discarded in the child and rebuilt on the next query.
+
+Pool settings come from the environment:
+
+    MONGO_MAX_POOL_SIZE              (default 50)
+    MONGO_MIN_POOL_SIZE              (default 0)
+    MONGO_MAX_IDLE_TIME_MS           (default 300000)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS      (default 10000)
+    MONGO_CONNECT_TIMEOUT_MS         (default 10000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS (default 5000)
+    MONGO_HEARTBEAT_FREQUENCY_MS     (default 10000)
+    MONGO_COMPRESSORS                (default "zstd,snappy,zlib")
+    MONGO_READ_PREFERENCE            (default "primary")
+    MONGO_WRITE_CONCERN_W            (default unset -> server default)
+    MONGO_WRITE_CONCERN_J            (default unset)
+"""
+
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo import monitoring
+
+# Load .env
+load_dotenv()
+
+# ---------------------------
+# MongoDB setup
+# ---------------------------
+MONGO_URI = os.getenv("MONGO_URI")
+DB_NAME = os.getenv("MONGO_DB_NAME", "durianapp")
+
+_client: Optional[MongoClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+# Compressor name -> module that must be importable for pymongo to use it
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def _available_compressors(requested: str) -> List[str]:
+    """Keep only the compressors whose Python codec is installed."""
+    available = []
+    for name in (c.strip() for c in requested.split(",")):
+        module = _COMPRESSOR_MODULES.get(name)
+        if not module:
+            continue
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+def client_options() -> Dict[str, Any]:
+    """Build MongoClient keyword arguments from the environment."""
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 50),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS", 300000),
+        "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 10000),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "heartbeatFrequencyMS": _env_int("MONGO_HEARTBEAT_FREQUENCY_MS", 10000),
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+        "event_listeners": [pool_metrics],
+    }
+
+    compressors = _available_compressors(os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib"))
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+
+    w = os.getenv("MONGO_WRITE_CONCERN_W")
+    if w:
+        options["w"] = int(w) if w.isdigit() else w
+    j = os.getenv("MONGO_WRITE_CONCERN_J")
+    if j:
+        options["journal"] = j.lower() in ("1", "true", "yes")
+
+    return options
+
+
+# ---------------------------
+# Pool metrics
+# ---------------------------
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener that keeps running counters for checkouts and
+    pool-wait time. Read a snapshot with get_pool_metrics().
+    """
+
+    # Upper bounds (ms) of the wait-time histogram buckets
+    WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.pools_created = 0
+            self.pools_cleared = 0
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.checkout_failures: Dict[str, int] = {}
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(self.WAIT_BUCKETS_MS) + 1)
+
+    def _record_wait(self, event):
+        duration = getattr(event, "duration", None)
+        if duration is None:
+            return
+        wait_ms = duration * 1000
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        for i, bound in enumerate(self.WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_buckets[i] += 1
+                break
+        else:
+            self.wait_buckets[-1] += 1
+
+    def pool_created(self, event):
+        with self._lock:
+            self.pools_created += 1
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            reason = str(getattr(event, "reason", "unknown"))
+            self.checkout_failures[reason] = self.checkout_failures.get(reason, 0) + 1
+            self._record_wait(event)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self._record_wait(event)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checkins += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            timed = self.checkouts + sum(self.checkout_failures.values())
+            labels = [f"<={b}ms" for b in self.WAIT_BUCKETS_MS] + [f">{self.WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "pid": os.getpid(),
+                "pools_created": self.pools_created,
+                "pools_cleared": self.pools_cleared,
+                "connections_open": self.connections_created - self.connections_closed,
+                "connections_in_use": self.checkouts - self.checkins,
+                "checkouts": self.checkouts,
+                "checkout_failures": dict(self.checkout_failures),
+                "wait_avg_ms": round(self.wait_total_ms / timed, 3) if timed else 0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram": dict(zip(labels, self.wait_buckets)),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Return pool counters for this process plus the configured limits."""
+    metrics = pool_metrics.snapshot()
+    metrics["max_pool_size"] = _env_int("MONGO_MAX_POOL_SIZE", 50)
+    metrics["min_pool_size"] = _env_int("MONGO_MIN_POOL_SIZE", 0)
+    metrics["client_created"] = _client is not None and _client_pid == os.getpid()
+    return metrics
+
+
+# ---------------------------
+# Client lifecycle
+# ---------------------------
+
+def get_client() -> MongoClient:
+    """Return the process-wide MongoClient, creating it on first use."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                # A client inherited from the parent process is dropped, not
+                # closed: its sockets belong to the parent.
+                _client = MongoClient(MONGO_URI, **client_options())
+                _client_pid = pid
+                print(f"[DB] MongoClient created in pid {pid}")
+    return _client
+
+
+def get_database() -> Database:
+    """Return the application database."""
+    return get_client()[DB_NAME]
+
+
+def get_db() -> Database:
+    return get_database()
+
+
+def close_client():
+    """Close the process-wide client (used by one-off commands and tests)."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def _reset_after_fork():
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    pool_metrics.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def ping() -> Dict[str, Any]:
+    """Round-trip a ping to the server and report latency."""
+    start = time.perf_counter()
+    try:
+        get_client().admin.command("ping")
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+class LazyCollection:
+    """
+    Module-level stand-in for a pymongo Collection.
+
+    Attribute access is forwarded to the real collection, which is resolved
+    through get_database() at call time. This keeps imports such as
+    ``from db import users_collection`` free of connection side effects.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+
+    @property
+    def collection(self) -> Collection:
+        return get_database()[self._name]
+
+    def __getattr__(self, attr):
+        return getattr(self.collection, attr)
+
+    def __getitem__(self, key):
+        return self.collection[key]
+
+    def __repr__(self):
+        return f"LazyCollection({self._name!r})"
+
+
+# ---------------------------
+# Collections
+# ---------------------------
+users_collection = LazyCollection("users")
+posts_collection = LazyCollection("posts")
+comments_collection = LazyCollection("comments")
+analytics_collection = LazyCollection("analytics")
+scans_collection = LazyCollection("scans")
+products_collection = LazyCollection("products")
@@ -0,0 +1,128 @@
+# backend/authapi/db/counts.py
+"""
+Cheap totals for forum lists and stats
+
+* unfiltered collection totals use estimated_document_count (collection
+  metadata, no scan) and are cached for COUNT_CACHE_TTL_SECONDS
+* per-category post totals come from counters in ``forum_counters``,
+  created by the init_forum_counters migration and kept up to date by
+  create_post with $inc; a category without a counter is counted directly
+* filtered (search) totals run count_documents at most once per
+  SEARCH_COUNT_CACHE_TTL_SECONDS per distinct filter, and are skipped
+  entirely when the page itself shows where the result set ends
+
+Each helper returns (total, approximate) so responses can flag totals that
+may lag behind the data.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from bson import json_util
+
+from .cache import TTLCache
+from .connection import LazyCollection, posts_collection, comments_collection, users_collection
+
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", 30))
+SEARCH_COUNT_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_COUNT_CACHE_TTL_SECONDS", 10))
+
+counters_collection = LazyCollection("forum_counters")
+
+_counts_cache = TTLCache(ttl=COUNT_CACHE_TTL_SECONDS, maxsize=2048)
+
+COLLECTIONS = {
+    "posts": posts_collection,
+    "comments": comments_collection,
+    "users": users_collection,
+}
+
+
+def _category_key(category: str) -> str:
+    return f"posts:category:{category}"
+
+
+def estimated_total(name: str) -> Tuple[int, bool]:
+    """Metadata-based total for a whole collection (cached)."""
+    total = _counts_cache.get_or_set(
+        ("estimated", name),
+        lambda: COLLECTIONS[name].estimated_document_count()
+    )
+    return total, True
+
+
+def category_total(category: str) -> Tuple[int, bool]:
+    """Post total for one category from the maintained counter (cached)."""
+    def load():
+        doc = counters_collection.find_one({"_id": _category_key(category)})
+        return doc.get("count", 0) if doc else None
+
+    total = _counts_cache.get_or_set(("category", category), load)
+    if total is None:
+        # Counter not initialised yet (before the init_forum_counters migration)
+        total = posts_collection.count_documents({"category": category})
+        _counts_cache.set(("category", category), total)
+        return total, False
+    return max(total, 0), True
+
+
+def filtered_total(query: Dict[str, Any], name: str = "posts") -> Tuple[int, bool]:
+    """count_documents for an arbitrary filter, cached briefly per filter."""
+    key = ("filtered", name, json_util.dumps(query, sort_keys=True))
+    cached = _counts_cache.get(key)
+    if cached is not None:
+        return cached, True
+    total = COLLECTIONS[name].count_documents(query)
+    _counts_cache.set(key, total, SEARCH_COUNT_CACHE_TTL_SECONDS)
+    return total, False
+
+
+def post_list_total(
+    query: Dict[str, Any],
+    category: str,
+    searching: bool,
+    page_len: int,
+    skip: int,
+    limit: int
+) -> Tuple[int, bool]:
+    """Total for a /forum/posts page without a second full-filter count."""
+    if page_len < limit and (page_len > 0 or skip == 0):
+        # The page reached the end of the result set: the total is exact
+        return skip + page_len, False
+    if searching:
+        return filtered_total(query)
+    if category and category != "All":
+        return category_total(category)
+    return estimated_total("posts")
+
+
+def record_post_created(category: Optional[str]):
+    if category:
+        # No upsert: a counter created here would start at 1 and be trusted,
+        # so uninitialised categories stay on the count_documents fallback
+        counters_collection.update_one({"_id": _category_key(category)}, {"$inc": {"count": 1}})
+        _counts_cache.invalidate(("category", category))
+    _counts_cache.invalidate(("estimated", "posts"))
+
+
+def rebuild_category_counters():
+    """Recount posts per category into forum_counters (one aggregation)."""
+    for row in posts_collection.aggregate([{"$group": {"_id": "$category", "count": {"$sum": 1}}}]):
+        if row["_id"] is None:
+            continue
+        counters_collection.update_one(
+            {"_id": _category_key(row["_id"])},
+            {"$set": {"count": row["count"]}},
+            upsert=True
+        )
+    _counts_cache.clear()
+
+
+def forum_totals() -> Dict[str, Any]:
+    """Totals for the forum stats panel, all from collection metadata."""
+    totals = {name: estimated_total(name)[0] for name in ("posts", "comments", "users")}
+    return {
+        "total_posts": totals["posts"],
+        "total_comments": totals["comments"],
+        "total_users": totals["users"],
+        "approximate": True,
+    }
@@ -0,0 +1,412 @@
+# backend/authapi/db/embeddings.py
+"""
+Local embedding index for chatbot retrieval
+
+Texts are embedded in-process and on the CPU with a feature-hashing
+encoder: unigrams and bigrams are hashed into EMBEDDING_DIM signed buckets,
+damped with log1p and L2-normalised. No model download or GPU is needed.
+
+Post vectors live in an on-disk float32 matrix opened with numpy.memmap,
+so a search is one vectorised dot product over pages the OS already
+caches. Post ids are kept in a parallel memmap of 12-byte ObjectIds.
+create_post appends the new row. The index is a local file, so a host
+without one builds it in the background on the first retrieval (one
+process per host, chosen by an O_EXCL marker file; searches return nothing
+until it is ready). A rebuild writes new files and swaps them in with
+os.replace, so workers that have the old ones mapped keep working. It can
+also be rebuilt with:
+
+    python -m db.embeddings --rebuild
+
+Scans are few per user, so they are embedded at query time and never
+stored.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from .connection import posts_collection
+from .search import tokenize
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialised within a process
+    fcntl = None
+
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", 512))
+EMBEDDING_INDEX_DIR = os.getenv(
+    "EMBEDDING_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "embeddings")
+)
+EMBEDDING_INITIAL_CAPACITY = 1024
+EMBEDDING_BUILD_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_BUILD_TIMEOUT_SECONDS", 1800))
+EMBEDDING_MAX_TEXT_CHARS = 4000
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it its me my of on or
+our so that the their them there these this to was we what when where which who why will with
+you your
+""".split())
+
+
+# ---------------------------
+# Encoder
+# ---------------------------
+
+def _features(text: str) -> List[str]:
+    words = [w for w in tokenize((text or "")[:EMBEDDING_MAX_TEXT_CHARS]) if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def embed(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Unit-length float32 vector for a piece of text (all zeros if empty)."""
+    features = _features(text)
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features),
+        dtype=np.uint64,
+        count=len(features)
+    )
+    buckets = (hashes % np.uint64(dim)).astype(np.int64)
+    signs = np.where((hashes >> np.uint64(63)) == 1, 1.0, -1.0).astype(np.float32)
+    np.add.at(vector, buckets, signs)
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def embed_many(texts: Sequence[str], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    if not texts:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.vstack([embed(t, dim) for t in texts])
+
+
+def top_k(matrix: np.ndarray, query: np.ndarray, k: int, min_score: float = 0.0) -> List[Tuple[int, float]]:
+    """Row indices and cosine scores of the k best matches (rows are unit length)."""
+    if matrix.shape[0] == 0 or k <= 0 or not query.any():
+        return []
+    scores = matrix @ query
+    k = min(k, scores.shape[0])
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best])]
+    return [(int(i), float(scores[i])) for i in best if scores[i] > min_score]
+
+
+def post_text(post: Dict[str, Any]) -> str:
+    return f"{post.get('title', '')}\n{post.get('category', '')}\n{post.get('content', '')}"
+
+
+# ---------------------------
+# On-disk index
+# ---------------------------
+
+class EmbeddingIndex:
+    """Append-only memmapped matrix of unit vectors keyed by ObjectId."""
+
+    def __init__(self, name: str, directory: str, dim: int):
+        self.name = name
+        self.directory = directory
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._ids = None
+        self._count = 0
+        self._capacity = 0
+        self._rows: Dict[bytes, int] = {}
+        self._meta_mtime = None
+
+    # -- paths --
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.name}.{suffix}")
+
+    def _read_meta(self) -> Optional[Dict[str, int]]:
+        try:
+            with open(self._path("meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self):
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"count": self._count, "capacity": self._capacity, "dim": self.dim}, f)
+        os.replace(tmp, self._path("meta.json"))
+        self._meta_mtime = os.path.getmtime(self._path("meta.json"))
+
+    def _map(self, capacity: int, mode: str):
+        self._vectors = np.memmap(self._path("f32"), dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+        self._ids = np.memmap(self._path("ids"), dtype=np.uint8, mode=mode, shape=(capacity, 12))
+        self._capacity = capacity
+
+    def _reset(self):
+        self._vectors, self._ids, self._count, self._capacity, self._rows = None, None, 0, 0, {}
+
+    def _refresh(self, locked: bool = False):
+        """
+        (Re)open the files if they changed on disk, e.g. after another worker
+        appended. `locked`: the caller already holds the exclusive file lock.
+        """
+        meta_path = self._path("meta.json")
+        try:
+            mtime = os.path.getmtime(meta_path)
+        except OSError:
+            self._reset()
+            self._meta_mtime = None
+            return
+        if mtime == self._meta_mtime and self._vectors is not None:
+            return
+        # Shared lock: a rebuild swaps the three files under the exclusive one
+        with self._file_lock() as lock_file:
+            if fcntl and not locked:
+                fcntl.flock(lock_file, fcntl.LOCK_SH)
+            meta = self._read_meta()
+            if not meta or meta.get("dim") != self.dim:
+                print(f"[DB] Embedding index {self.name} missing or built with another dimension; rebuild it")
+                self._reset()
+                self._meta_mtime = mtime
+                return
+            self._map(meta["capacity"], "r+")
+            self._count = meta["count"]
+            self._rows = {bytes(self._ids[i]): i for i in range(self._count)}
+            self._meta_mtime = os.path.getmtime(meta_path)
+
+    def _grow(self, needed: int):
+        capacity = max(EMBEDDING_INITIAL_CAPACITY, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self._capacity and self._vectors is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for suffix, width in (("f32", self.dim * 4), ("ids", 12)):
+            with open(self._path(suffix), "ab") as f:
+                f.truncate(capacity * width)
+        self._map(capacity, "r+")
+
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        return open(self._path("lock"), "w")
+
+    # -- public --
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._count
+
+    def add(self, ids: Sequence[ObjectId], vectors: np.ndarray):
+        """Append vectors (or overwrite rows of ids already present)."""
+        if not len(ids):
+            return
+        with self._lock, self._file_lock() as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._refresh(locked=True)
+            if self._vectors is None:
+                return  # no index on this host yet; the build will include these rows
+            self._grow(self._count + len(ids))
+            for oid, vector in zip(ids, vectors):
+                key = oid.binary
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._count
+                    self._count += 1
+                    self._rows[key] = row
+                    self._ids[row] = np.frombuffer(key, dtype=np.uint8)
+                self._vectors[row] = vector
+            self._vectors.flush()
+            self._ids.flush()
+            self._write_meta()
+
+    def search(self, query: np.ndarray, k: int, min_score: float = 0.0) -> List[Tuple[ObjectId, float]]:
+        with self._lock:
+            self._refresh()
+            if self._vectors is None or not self._count:
+                return []
+            matches = top_k(self._vectors[:self._count], query, k, min_score)
+            return [(ObjectId(bytes(self._ids[row])), score) for row, score in matches]
+
+    def rebuild(self, batches) -> int:
+        """
+        Replace the index with the (ids, vectors) batches given. The new
+        files are written aside without any lock held and swapped in at the
+        end, so searches and appends keep using the old index meanwhile.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp = {name: f"{self._path(name)}.{suffix}" for name in ("f32", "ids")}
+        count, capacity = 0, 0
+        vectors_map = ids_map = None
+        try:
+            for ids, vectors in batches:
+                needed = count + len(ids)
+                if needed > capacity:
+                    capacity = max(EMBEDDING_INITIAL_CAPACITY, capacity)
+                    while capacity < needed:
+                        capacity *= 2
+                    for name, width in (("f32", self.dim * 4), ("ids", 12)):
+                        with open(tmp[name], "ab") as f:
+                            f.truncate(capacity * width)
+                    vectors_map = np.memmap(tmp["f32"], dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+                    ids_map = np.memmap(tmp["ids"], dtype=np.uint8, mode="r+", shape=(capacity, 12))
+                vectors_map[count:needed] = vectors
+                ids_map[count:needed] = np.frombuffer(b"".join(o.binary for o in ids), dtype=np.uint8).reshape(-1, 12)
+                count = needed
+            if vectors_map is None:
+                capacity = EMBEDDING_INITIAL_CAPACITY
+                for name, width in (("f32", self.dim * 4), ("ids", 12)):
+                    with open(tmp[name], "wb") as f:
+                        f.truncate(capacity * width)
+            else:
+                vectors_map.flush()
+                ids_map.flush()
+                del vectors_map, ids_map
+
+            with self._lock, self._file_lock() as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                for name in ("f32", "ids"):
+                    os.replace(tmp[name], self._path(name))
+                self._reset()
+                self._count, self._capacity = count, capacity
+                self._write_meta()
+                self._meta_mtime = None  # remap the new files on next use
+            return count
+        finally:
+            for path in tmp.values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def claim_build(self) -> bool:
+        """True for the one process on this host that should build a missing index."""
+        os.makedirs(self.directory, exist_ok=True)
+        marker = self._path("building")
+        try:
+            fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                stale = time.time() - os.path.getmtime(marker) > EMBEDDING_BUILD_TIMEOUT_SECONDS
+            except OSError:
+                stale = False
+            if not stale:
+                return False
+            os.remove(marker)
+            return self.claim_build()
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+
+    def release_build(self):
+        try:
+            os.remove(self._path("building"))
+        except OSError:
+            pass
+
+
+post_index = EmbeddingIndex("posts", EMBEDDING_INDEX_DIR, EMBEDDING_DIM)
+_build_checked = False  # this process has already looked; the marker decides who builds
+
+
+# ---------------------------
+# Posts
+# ---------------------------
+
+def index_post(post: Dict[str, Any]):
+    """Add one post to the index; called by create_post. Never raises."""
+    try:
+        post_index.add([post["_id"]], embed(post_text(post))[None, :])
+    except Exception as e:
+        print(f"[DB] Error indexing post embedding: {e}")
+
+
+def _post_batches(query: Dict[str, Any], batch_size: int):
+    ids, texts = [], []
+    for post in posts_collection.find(query, {"title": 1, "content": 1, "category": 1}):
+        ids.append(post["_id"])
+        texts.append(post_text(post))
+        if len(ids) >= batch_size:
+            yield ids, embed_many(texts)
+            ids, texts = [], []
+    if ids:
+        yield ids, embed_many(texts)
+
+
+def rebuild_post_index(batch_size: int = 1000) -> int:
+    # Posts created while the build runs went to the old files (or nowhere,
+    # before the first build) and are lost by the swap; add them again.
+    # add() overwrites ids already present
+    started = ObjectId.from_datetime(datetime.utcnow() - timedelta(minutes=1))
+    count = post_index.rebuild(_post_batches({}, batch_size))
+    for ids, vectors in _post_batches({"_id": {"$gte": started}}, batch_size):
+        post_index.add(ids, vectors)
+    print(f"[DB] Post embedding index rebuilt: {count} posts")
+    return count
+
+
+def _build_post_index():
+    try:
+        rebuild_post_index()
+    except Exception as e:
+        print(f"[DB] Post embedding index build failed: {e}")
+    finally:
+        post_index.release_build()
+
+
+def _ensure_post_index():
+    global _build_checked
+    if _build_checked:
+        return
+    _build_checked = True
+    if post_index.count() or not post_index.claim_build():
+        return
+    threading.Thread(target=_build_post_index, name="post-embeddings-build", daemon=True).start()
+
+
+def related_posts(query: str, k: int = 3, min_score: float = 0.1) -> List[Dict[str, Any]]:
+    """Top-k posts for a query, most similar first, with a "score" field."""
+    _ensure_post_index()
+    matches = post_index.search(embed(query), k, min_score)
+    if not matches:
+        return []
+    scores = dict(matches)
+    posts = posts_collection.find(
+        {"_id": {"$in": list(scores)}},
+        {"title": 1, "content": 1, "category": 1, "created_at": 1}
+    )
+    found = [{**post, "score": scores[post["_id"]]} for post in posts]
+    return sorted(found, key=lambda p: -p["score"])
+
+
+def rank_texts(query: str, texts: Sequence[str], k: int, min_score: float = 0.0) -> List[Tuple[int, float]]:
+    """Rank small ad-hoc text lists (e.g. a user's scans) against a query."""
+    return top_k(embed_many(texts), embed(query), k, min_score)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chatbot embedding index")
+    parser.add_argument("--rebuild", action="store_true", help="Re-embed every forum post")
+    parser.add_argument("--query", help="Show the posts closest to a query")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        rebuild_post_index()
+    if args.query:
+        for post in related_posts(args.query, k=5, min_score=0.0):
+            print(f"{post['score']:.3f}  {post['_id']}  {post.get('title', '')}")
+    if not args.rebuild and not args.query:
+        print(f"[DB] {post_index.count()} posts indexed in {EMBEDDING_INDEX_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+# backend/authapi/db/forum.py
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from .connection import posts_collection, comments_collection
+from .authors import get_author
+from .likes import toggle_like, has_user_liked, delete_likes_for
+from .views import record_view, pending_views
+from .search import search_fields, search_posts
+from .counts import record_post_created, forum_totals
+from .embeddings import index_post
+
+# Legacy liked_by arrays and internal search fields are never returned
+LIST_PROJECTION = {"liked_by": 0, "search_tokens": 0}
+
+# ---------------------------
+# Comments Functions
+# ---------------------------
+
+def create_comment(user_id: str, post_id: str, content: str) -> Optional[Dict[str, Any]]:
+    """
+    Create a new comment for a forum post (stores ObjectIds)
+    """
+    try:
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+        post_oid = ObjectId(post_id) if not isinstance(post_id, ObjectId) else post_id
+
+        user = get_author(user_oid)
+        if not user:
+            return None
+
+        # Increment post replies count; doubles as the post existence check
+        result = posts_collection.update_one({"_id": post_oid}, {"$inc": {"replies": 1}})
+        if result.matched_count == 0:
+            return None
+
+        comment_data = {
+            "user_id": user_oid,
+            "username": user.get("name", "Anonymous"),
+            "user_avatar": user.get("photoProfile", ""),
+            "post_id": post_oid,
+            "content": content,
+            "likes": 0,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+
+        try:
+            comments_collection.insert_one(comment_data)
+        except Exception:
+            posts_collection.update_one({"_id": post_oid}, {"$inc": {"replies": -1}})
+            raise
+
+        # insert_one sets comment_data["_id"]
+        return comment_data
+
+    except Exception as e:
+        print(f"[DB] Error creating comment: {e}")
+        return None
+
+
+def get_comments_by_post(post_id: str, limit: int = 50, skip: int = 0) -> List[Dict[str, Any]]:
+    """
+    Get all comments for a specific post (post_id as string)
+    """
+    try:
+        post_oid = ObjectId(post_id) if not isinstance(post_id, ObjectId) else post_id
+        comments = comments_collection.find({"post_id": post_oid}, LIST_PROJECTION).sort("created_at", 1).skip(skip).limit(limit)
+        return list(comments)
+    except Exception as e:
+        print(f"[DB] Error getting comments: {e}")
+        return []
+
+
+def get_comment_count(post_id: str) -> int:
+    try:
+        post_oid = ObjectId(post_id) if not isinstance(post_id, ObjectId) else post_id
+        return comments_collection.count_documents({"post_id": post_oid})
+    except Exception as e:
+        print(f"[DB] Error counting comments: {e}")
+        return 0
+
+
+def toggle_comment_like(comment_id: str, user_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Toggle like/unlike for a comment. Returns (updated comment, liked)."""
+    try:
+        comment_oid = ObjectId(comment_id) if not isinstance(comment_id, ObjectId) else comment_id
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+        return toggle_like("comment", comment_oid, user_oid)
+    except Exception as e:
+        print(f"[DB] Error liking comment: {e}")
+        return None, False
+
+
+def like_comment(comment_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Toggle like/unlike for a comment"""
+    comment, _ = toggle_comment_like(comment_id, user_id)
+    return comment
+
+
+def update_comment(comment_id: str, user_id: str, new_content: str) -> Optional[Dict[str, Any]]:
+    try:
+        comment_oid = ObjectId(comment_id) if not isinstance(comment_id, ObjectId) else comment_id
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+
+        return comments_collection.find_one_and_update(
+            {"_id": comment_oid, "user_id": user_oid},
+            {"$set": {"content": new_content, "updated_at": datetime.utcnow()}},
+            projection=LIST_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+    except Exception as e:
+        print(f"[DB] Error updating comment: {e}")
+        return None
+
+
+def delete_comment(comment_id: str, user_id: str) -> bool:
+    try:
+        comment_oid = ObjectId(comment_id) if not isinstance(comment_id, ObjectId) else comment_id
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+
+        # Fetch comment so we can access post_id for decrementing replies
+        comment = comments_collection.find_one({"_id": comment_oid, "user_id": user_oid})
+        if not comment:
+            return False
+
+        result = comments_collection.delete_one({"_id": comment_oid, "user_id": user_oid})
+        if result.deleted_count > 0:
+            delete_likes_for("comment", [comment_oid])
+            # Decrement replies on post
+            try:
+                posts_collection.update_one({"_id": comment.get("post_id")}, {"$inc": {"replies": -1}})
+            except:
+                pass
+            return True
+        return False
+    except Exception as e:
+        print(f"[DB] Error deleting comment: {e}")
+        return False
+
+
+def get_user_comments(user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+    try:
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+        comments = comments_collection.find({"user_id": user_oid}, LIST_PROJECTION).sort("created_at", -1).limit(limit)
+        return list(comments)
+    except Exception as e:
+        print(f"[DB] Error getting user comments: {e}")
+        return []
+
+
+def has_user_liked_comment(comment_id: str, user_id: str) -> bool:
+    try:
+        comment_oid = ObjectId(comment_id) if not isinstance(comment_id, ObjectId) else comment_id
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+        return has_user_liked("comment", comment_oid, user_oid)
+    except Exception as e:
+        print(f"[DB] Error checking like status: {e}")
+        return False
+
+
+# ---------------------------
+# Posts Functions
+# ---------------------------
+
+def create_post(user_id: str, title: str, content: str, category: str) -> Optional[Dict[str, Any]]:
+    try:
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+        user = get_author(user_oid)
+        if not user:
+            return None
+
+        post_data = {
+            "user_id": user_oid,
+            "username": user.get("name", "Anonymous"),
+            "user_avatar": user.get("photoProfile", ""),
+            "title": title,
+            "content": content,
+            "category": category,
+            "replies": 0,
+            "views": 0,
+            "likes": 0,
+            "is_pinned": False,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+
+        document = {**post_data, **search_fields(title, content, post_data["username"])}
+        result = posts_collection.insert_one(document)
+        if result.inserted_id:
+            record_post_created(category)
+            post_data["_id"] = result.inserted_id
+            index_post(post_data)
+            return post_data
+        return None
+    except Exception as e:
+        print(f"[DB] Error creating post: {e}")
+        return None
+
+
+def get_post(post_id: str, increment_views: bool = True) -> Optional[Dict[str, Any]]:
+    try:
+        post_oid = ObjectId(post_id) if not isinstance(post_id, ObjectId) else post_id
+        post = posts_collection.find_one({"_id": post_oid}, LIST_PROJECTION)
+        if not post:
+            return None
+        if increment_views:
+            # Buffered: written in batches by the view counter, not on the read path
+            record_view(post_oid)
+        post["views"] = post.get("views", 0) + pending_views(post_oid)
+        return post
+    except Exception as e:
+        print(f"[DB] Error getting post: {e}")
+        return None
+
+
+def get_posts(category: str = "All", limit: int = 50, skip: int = 0, search: str = "") -> Dict[str, Any]:
+    try:
+        # Text index + token prefix index; ranked by relevance when searching
+        return search_posts(search, category=category, limit=limit, skip=skip, projection=LIST_PROJECTION)
+    except Exception as e:
+        # Raise rather than show an empty forum; the route answers 500
+        print(f"[DB] Error getting posts: {e}")
+        raise
+
+
+def toggle_post_like(post_id: str, user_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Toggle like/unlike for a post. Returns (updated post, liked)."""
+    try:
+        post_oid = ObjectId(post_id) if not isinstance(post_id, ObjectId) else post_id
+        user_oid = ObjectId(user_id) if not isinstance(user_id, ObjectId) else user_id
+        return toggle_like("post", post_oid, user_oid)
+    except Exception as e:
+        print(f"[DB] Error liking post: {e}")
+        return None, False
+
+
+def like_post(post_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    post, _ = toggle_post_like(post_id, user_id)
+    return post
+
+
+def get_forum_stats() -> Dict[str, int]:
+    try:
+        # Collection metadata counts, cached; see db.counts
+        return forum_totals()
+    except Exception as e:
+        print(f"[DB] Error getting stats: {e}")
+        return {"total_posts": 0, "total_comments": 0, "total_users": 0}
@@ -0,0 +1,129 @@
+# backend/authapi/db/likes.py
+"""
+Likes for posts and comments
+
+Each like is its own document in the ``likes`` collection:
+
+    {"target_type": "post", "target_id": ObjectId, "user_id": ObjectId, "created_at": datetime}
+
+A unique index on (target_type, target_id, user_id) makes a like
+idempotent, and the target document keeps only a denormalized ``likes``
+counter, so posts no longer grow with their popularity. Until the
+move_liked_by_to_likes migration has run, toggle_like also honours likes
+still held in a target's legacy ``liked_by`` array.
+"""
+
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Set, Iterable
+
+from bson import ObjectId
+from pymongo import ReturnDocument, ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from .connection import LazyCollection, posts_collection, comments_collection
+
+likes_collection = LazyCollection("likes")
+
+TARGET_COLLECTIONS = {
+    "post": posts_collection,
+    "comment": comments_collection,
+}
+
+
+def _oid(value) -> ObjectId:
+    return ObjectId(value) if not isinstance(value, ObjectId) else value
+
+
+def ensure_like_indexes():
+    likes_collection.create_index(
+        [("target_type", ASCENDING), ("target_id", ASCENDING), ("user_id", ASCENDING)],
+        unique=True,
+        name="target_user_unique"
+    )
+    likes_collection.create_index([("user_id", ASCENDING)], name="user_id")
+
+
+def toggle_like(target_type: str, target_id, user_id) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Like the target, or remove the like if the user already liked it.
+
+    Returns (updated target document, liked), or (None, False) if the target
+    does not exist. An existing like (a document, or a legacy liked_by
+    entry) is removed first; otherwise one is inserted, with the unique index
+    arbitrating concurrent toggles. The counter moves only when a like was
+    actually inserted or removed.
+    """
+    collection = TARGET_COLLECTIONS[target_type]
+    target_oid = _oid(target_id)
+    user_oid = _oid(user_id)
+    key = {"target_type": target_type, "target_id": target_oid, "user_id": user_oid}
+
+    if likes_collection.delete_one(key).deleted_count:
+        liked, delta = False, -1
+    else:
+        # Not yet moved by move_liked_by_to_likes: unlike it in place
+        legacy = {"$in": [user_oid, str(user_oid)]}
+        doc = collection.find_one_and_update(
+            {"_id": target_oid, "liked_by": legacy},
+            {"$pull": {"liked_by": legacy}, "$inc": {"likes": -1}, "$set": {"updated_at": datetime.utcnow()}},
+            projection={"liked_by": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is not None:
+            return doc, False
+        try:
+            likes_collection.insert_one({**key, "created_at": datetime.utcnow()})
+            liked, delta = True, 1
+        except DuplicateKeyError:
+            liked, delta = True, 0  # a concurrent request liked it first
+
+    update = {"$set": {"updated_at": datetime.utcnow()}}
+    if delta:
+        update["$inc"] = {"likes": delta}
+    doc = collection.find_one_and_update(
+        {"_id": target_oid},
+        update,
+        projection={"liked_by": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+    if doc is None and liked:
+        # Target does not exist; drop the orphaned like
+        likes_collection.delete_one(key)
+    return doc, liked
+
+
+def liked_target_ids(target_type: str, target_ids: Iterable, user_id) -> Set[ObjectId]:
+    """Return the subset of target_ids the user has liked, in one query."""
+    if not user_id or not ObjectId.is_valid(user_id):
+        return set()
+    oids = [_oid(t) for t in target_ids]
+    if not oids:
+        return set()
+    cursor = likes_collection.find(
+        {"target_type": target_type, "user_id": _oid(user_id), "target_id": {"$in": oids}},
+        {"target_id": 1, "_id": 0}
+    )
+    return {doc["target_id"] for doc in cursor}
+
+
+def annotate_liked(target_type: str, docs: List[Dict[str, Any]], user_id) -> List[Dict[str, Any]]:
+    """Set doc["liked"] on a page of posts or comments for the given user."""
+    liked = liked_target_ids(target_type, [d["_id"] for d in docs], user_id)
+    for doc in docs:
+        doc["liked"] = doc["_id"] in liked
+    return docs
+
+
+def has_user_liked(target_type: str, target_id, user_id) -> bool:
+    return likes_collection.find_one(
+        {"target_type": target_type, "target_id": _oid(target_id), "user_id": _oid(user_id)},
+        {"_id": 1}
+    ) is not None
+
+
+def delete_likes_for(target_type: str, target_ids: Iterable):
+    """Remove the likes of deleted posts or comments."""
+    oids = [_oid(t) for t in target_ids]
+    if oids:
+        likes_collection.delete_many({"target_type": target_type, "target_id": {"$in": oids}})
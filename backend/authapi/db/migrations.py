@@ -0,0 +1,214 @@
+# backend/authapi/db/migrations.py
+"""
+One-time data migrations
+
+Migrations used to run at import time from db.py, which meant every worker
+boot issued full-collection writes. They now run explicitly:
+
+    cd backend/authapi
+    python -m db.migrations            # apply pending migrations
+    python -m db.migrations --list     # show applied / pending
+    python -m db.migrations --force initialize_roles
+
+Applied migrations are recorded in the ``migrations`` collection so each
+one runs at most once per database.
+"""
+
+import argparse
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from pymongo import UpdateOne
+
+from .connection import LazyCollection, users_collection, close_client
+from .connection import posts_collection
+from .likes import likes_collection, ensure_like_indexes, TARGET_COLLECTIONS
+from .search import ensure_search_indexes, search_fields
+from .counts import rebuild_category_counters
+from .rollups import rebuild_rollups
+from .snapshots import ensure_snapshot_indexes
+from .outbox import ensure_outbox_indexes
+
+migrations_collection = LazyCollection("migrations")
+
+# Ordered registry: name -> function
+MIGRATIONS: Dict[str, Callable[[], None]] = {}
+
+
+def migration(name: str):
+    """Register a migration function under a stable name."""
+    def decorator(f):
+        MIGRATIONS[name] = f
+        return f
+    return decorator
+
+
+# ---------------------------
+# Migrations
+# ---------------------------
+
+@migration("initialize_roles")
+def initialize_roles():
+    result = users_collection.update_many(
+        {"role": {"$exists": False}},
+        {"$set": {"role": "user"}}
+    )
+    print(f"Updated {result.modified_count} users with default role.")
+
+
+@migration("create_like_indexes")
+def create_like_indexes():
+    ensure_like_indexes()
+    print("Created likes indexes.")
+
+
+@migration("move_liked_by_to_likes")
+def move_liked_by_to_likes():
+    """Copy embedded liked_by arrays into the likes collection and drop them."""
+    for target_type, collection in TARGET_COLLECTIONS.items():
+        moved = 0
+        for doc in collection.find({"liked_by.0": {"$exists": True}}, {"liked_by": 1}):
+            user_oids = set(doc["liked_by"])
+            ops = [
+                UpdateOne(
+                    {"target_type": target_type, "target_id": doc["_id"], "user_id": user_oid},
+                    {"$setOnInsert": {"created_at": datetime.utcnow()}},
+                    upsert=True
+                )
+                for user_oid in user_oids
+            ]
+            likes_collection.bulk_write(ops, ordered=False)
+            # Recount: the target may already have likes in the new collection
+            total = likes_collection.count_documents({"target_type": target_type, "target_id": doc["_id"]})
+            collection.update_one({"_id": doc["_id"]}, {"$set": {"likes": total}})
+            moved += len(user_oids)
+        result = collection.update_many({"liked_by": {"$exists": True}}, {"$unset": {"liked_by": ""}})
+        print(f"Moved {moved} {target_type} likes; cleaned {result.modified_count} documents.")
+
+
+@migration("create_search_indexes")
+def create_search_indexes():
+    ensure_search_indexes()
+    print("Created forum search indexes.")
+
+
+@migration("backfill_search_tokens")
+def backfill_search_tokens(batch_size: int = 500):
+    updated = 0
+    ops = []
+    cursor = posts_collection.find(
+        {"search_tokens": {"$exists": False}},
+        {"title": 1, "content": 1, "username": 1}
+    )
+    for post in cursor:
+        fields = search_fields(post.get("title", ""), post.get("content", ""), post.get("username", ""))
+        ops.append(UpdateOne({"_id": post["_id"]}, {"$set": fields}))
+        if len(ops) >= batch_size:
+            updated += posts_collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += posts_collection.bulk_write(ops, ordered=False).modified_count
+    print(f"Indexed {updated} posts for search.")
+
+
+@migration("init_forum_counters")
+def init_forum_counters():
+    rebuild_category_counters()
+    print("Initialised per-category post counters.")
+
+
+@migration("backfill_analytics_rollups")
+def backfill_analytics_rollups():
+    days = rebuild_rollups()
+    print(f"Rebuilt analytics rollups for {days} days.")
+
+
+@migration("create_snapshot_indexes")
+def create_snapshot_indexes():
+    ensure_snapshot_indexes()
+    print("Created analytics snapshot indexes.")
+
+
+@migration("create_user_indexes")
+def create_user_indexes():
+    # Admin user list: filter by role / status, newest first
+    users_collection.create_index([("role", 1), ("_id", -1)])
+    users_collection.create_index([("isActive", 1), ("_id", -1)])
+    users_collection.create_index("email")
+    print("Created user indexes.")
+
+
+@migration("create_outbox_indexes")
+def create_outbox_indexes():
+    ensure_outbox_indexes()
+    print("Created email outbox indexes.")
+
+
+@migration("expire_hourly_snapshots")
+def expire_hourly_snapshots():
+    # TTL index on expire_at, and prune hourly snapshots written before it
+    ensure_snapshot_indexes()
+    print("Added hourly analytics snapshot retention.")
+
+
+@migration("create_authz_change_index")
+def create_authz_change_index():
+    # Polled by every worker (auth._sync_authz_changes); only changed users have the field
+    users_collection.create_index("authzChangedAt", sparse=True)
+    print("Created authzChangedAt index.")
+
+
+# ---------------------------
+# Runner
+# ---------------------------
+
+def applied_migrations() -> List[str]:
+    return [doc["_id"] for doc in migrations_collection.find({}, {"_id": 1})]
+
+
+def run_migrations(force: List[str] = None) -> List[str]:
+    """Apply every pending migration (plus any named in force). Returns names run."""
+    force = force or []
+    done = set(applied_migrations())
+    ran = []
+    for name, func in MIGRATIONS.items():
+        if name in done and name not in force:
+            continue
+        print(f"[MIGRATE] Running {name}")
+        func()
+        migrations_collection.update_one(
+            {"_id": name},
+            {"$set": {"applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        ran.append(name)
+    return ran
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply Durian App data migrations")
+    parser.add_argument("--list", action="store_true", help="list migrations and their status")
+    parser.add_argument("--force", nargs="*", default=[], metavar="NAME",
+                        help="re-run the named migrations even if already applied")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.list:
+            done = set(applied_migrations())
+            for name in MIGRATIONS:
+                print(f"  [{'x' if name in done else ' '}] {name}")
+            return 0
+
+        unknown = [name for name in args.force if name not in MIGRATIONS]
+        if unknown:
+            parser.error(f"unknown migrations: {', '.join(unknown)}")
+
+        ran = run_migrations(force=args.force)
+        print(f"[MIGRATE] {len(ran)} migration(s) applied" if ran else "[MIGRATE] Nothing to do")
+        return 0
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+# backend/authapi/db/outbox.py
+"""
+Email outbox store
+
+Outgoing mail is written to ``email_outbox`` before anything talks to SMTP,
+so a slow or unavailable mail server never fails the request that produced
+the message. handlers/outbox.py delivers it. A message moves through
+
+    pending -> sending -> sent
+                      \\-> pending (retry at next_attempt_at) ... -> dead
+
+Workers claim a message with a lease (locked_until), so a worker that dies
+mid-send only delays it. Sent messages drop their body and expire after
+OUTBOX_SENT_RETENTION_DAYS; dead ones stay until retried from the admin
+dead-letter view.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from .connection import LazyCollection
+
+OUTBOX_SENT_RETENTION_DAYS = int(os.getenv("OUTBOX_SENT_RETENTION_DAYS", 7))
+
+outbox_collection = LazyCollection("email_outbox")
+
+STATUSES = ("pending", "sending", "sent", "dead")
+LIST_PROJECTION = {"raw": 0}
+
+
+def ensure_outbox_indexes():
+    outbox_collection.create_index([("status", 1), ("next_attempt_at", 1)])
+    outbox_collection.create_index([("status", 1), ("locked_until", 1)])
+    outbox_collection.create_index("sent_at", expireAfterSeconds=OUTBOX_SENT_RETENTION_DAYS * 86400)
+
+
+def enqueue_messages(messages: List[Dict[str, Any]]) -> List[ObjectId]:
+    """Store messages ({kind, sender, to, subject, raw}) for delivery."""
+    if not messages:
+        return []
+    now = datetime.utcnow()
+    docs = [
+        {**message, "status": "pending", "attempts": 0, "created_at": now, "next_attempt_at": now}
+        for message in messages
+    ]
+    return outbox_collection.insert_many(docs, ordered=False).inserted_ids
+
+
+def claim_next(worker: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+    """Take the next due message (or one whose sender's lease ran out)."""
+    now = datetime.utcnow()
+    return outbox_collection.find_one_and_update(
+        {"$or": [
+            {"status": "pending", "next_attempt_at": {"$lte": now}},
+            {"status": "sending", "locked_until": {"$lt": now}}
+        ]},
+        {
+            "$set": {"status": "sending", "worker": worker, "locked_until": now + timedelta(seconds=lease_seconds)},
+            "$inc": {"attempts": 1}
+        },
+        sort=[("next_attempt_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def mark_sent(message_id: ObjectId):
+    outbox_collection.update_one(
+        {"_id": message_id},
+        {"$set": {"status": "sent", "sent_at": datetime.utcnow()},
+         "$unset": {"raw": "", "locked_until": "", "worker": ""}}
+    )
+
+
+def mark_retry(message_id: ObjectId, error: str, delay_seconds: float):
+    outbox_collection.update_one(
+        {"_id": message_id},
+        {"$set": {
+            "status": "pending",
+            "last_error": error,
+            "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay_seconds)
+        }, "$unset": {"locked_until": "", "worker": ""}}
+    )
+
+
+def mark_dead(message_id: ObjectId, error: str):
+    outbox_collection.update_one(
+        {"_id": message_id},
+        {"$set": {"status": "dead", "last_error": error, "dead_at": datetime.utcnow()},
+         "$unset": {"locked_until": "", "worker": ""}}
+    )
+
+
+def list_messages(status: str = "dead", limit: int = 50, skip: int = 0) -> List[Dict[str, Any]]:
+    """Newest messages in a status, without their bodies."""
+    return list(
+        outbox_collection.find({"status": status}, LIST_PROJECTION)
+        .sort("_id", -1)
+        .skip(skip)
+        .limit(limit)
+    )
+
+
+def requeue_dead(message_ids: Optional[List[ObjectId]] = None) -> int:
+    """Give dead messages (all of them, or the listed ones) a fresh set of attempts."""
+    query: Dict[str, Any] = {"status": "dead"}
+    if message_ids is not None:
+        query["_id"] = {"$in": message_ids}
+    result = outbox_collection.update_many(query, {
+        "$set": {"status": "pending", "attempts": 0, "next_attempt_at": datetime.utcnow()},
+        "$unset": {"dead_at": ""}
+    })
+    return result.modified_count
+
+
+def outbox_stats() -> Dict[str, int]:
+    counts = {status: 0 for status in STATUSES}
+    for row in outbox_collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+        counts[row["_id"]] = row["count"]
+    return counts
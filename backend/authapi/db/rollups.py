@@ -0,0 +1,117 @@
+# backend/authapi/db/rollups.py
+"""
+Daily platform rollups
+
+One small document per UTC day in ``analytics_rollups``:
+
+    {_id: "2026-10-19", date, scans, durians, quality_sum,
+     export_ready, local_sale, rejected, new_users}
+
+save_scan/delete_scan and the signup paths keep them current with $inc, so
+platform-wide analytics aggregate a few hundred rollup documents instead
+of the whole scans collection. ``python -m db.migrations --force
+backfill_analytics_rollups`` rebuilds them from scratch.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+
+from .connection import LazyCollection, scans_collection, users_collection
+
+rollups_collection = LazyCollection("analytics_rollups")
+
+# scan "status" value -> rollup counter
+STATUS_FIELDS = {
+    "Export Ready": "export_ready",
+    "Local Sale": "local_sale",
+    "Rejected": "rejected",
+}
+COUNTERS = ("scans", "durians", "quality_sum", "new_users") + tuple(STATUS_FIELDS.values())
+
+
+def day_key(when: datetime) -> str:
+    return when.strftime("%Y-%m-%d")
+
+
+def day_start(when: datetime) -> datetime:
+    return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _inc(when: datetime, counters: Dict[str, Any]):
+    try:
+        rollups_collection.update_one(
+            {"_id": day_key(when)},
+            {"$inc": counters, "$setOnInsert": {"date": day_start(when)}},
+            upsert=True
+        )
+    except Exception as e:
+        # Analytics must never fail the write that triggered them
+        print(f"[DB] Rollup update failed: {e}")
+
+
+def _scan_counters(scan: Dict[str, Any], sign: int) -> Dict[str, Any]:
+    counters = {
+        "scans": sign,
+        "durians": sign * (scan.get("durian_count") or 0),
+        "quality_sum": sign * (scan.get("quality_score") or 0),
+    }
+    status_field = STATUS_FIELDS.get(scan.get("status"))
+    if status_field:
+        counters[status_field] = sign
+    return counters
+
+
+def record_scan(scan: Dict[str, Any]):
+    _inc(scan.get("created_at") or datetime.utcnow(), _scan_counters(scan, 1))
+
+
+def record_scan_deleted(scan: Dict[str, Any]):
+    _inc(scan.get("created_at") or datetime.utcnow(), _scan_counters(scan, -1))
+
+
+def record_user_created(created_at: Optional[datetime] = None):
+    _inc(created_at or datetime.utcnow(), {"new_users": 1})
+
+
+# ---------------------------
+# Rebuild
+# ---------------------------
+
+def _day_group(date_field: str, fields: Dict[str, Any]):
+    return [
+        {"$match": {date_field: {"$type": "date"}}},
+        {"$group": {
+            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": f"${date_field}"}},
+            **fields
+        }}
+    ]
+
+
+def rebuild_rollups() -> int:
+    """Recompute every day from scans and users (two aggregations). Returns days written."""
+    status_sums = {
+        field: {"$sum": {"$cond": [{"$eq": ["$status", status]}, 1, 0]}}
+        for status, field in STATUS_FIELDS.items()
+    }
+    days: Dict[str, Dict[str, Any]] = {}
+    for row in scans_collection.aggregate(_day_group("created_at", {
+        "scans": {"$sum": 1},
+        "durians": {"$sum": {"$ifNull": ["$durian_count", 0]}},
+        "quality_sum": {"$sum": {"$ifNull": ["$quality_score", 0]}},
+        **status_sums
+    })):
+        days[row.pop("_id")] = row
+    for row in users_collection.aggregate(_day_group("createdAt", {"new_users": {"$sum": 1}})):
+        days.setdefault(row["_id"], {})["new_users"] = row["new_users"]
+
+    ops = []
+    for key, row in days.items():
+        values = {field: row.get(field, 0) for field in COUNTERS}
+        values["date"] = datetime.strptime(key, "%Y-%m-%d")
+        ops.append(UpdateOne({"_id": key}, {"$set": values}, upsert=True))
+    rollups_collection.delete_many({"_id": {"$nin": list(days)}})
+    if ops:
+        rollups_collection.bulk_write(ops, ordered=False)
+    return len(ops)
@@ -0,0 +1,127 @@
+# backend/authapi/db/search.py
+"""
+Forum post search
+
+Two indexes back the search box:
+
+* a weighted text index over title, username and content, used for the
+  complete words of a query and for relevance ranking (textScore)
+* a multikey index over ``search_tokens``, the lowercased unique words of
+  the post, used for prefix matching on the word the user is still typing
+  with an anchored, escaped regex (an index range scan, not a full scan)
+
+search_tokens is written by create_post through search_fields() and can be
+backfilled with the ``backfill_search_tokens`` migration. Until the text
+index exists (``create_search_indexes``), searches fall back to matching
+whole words against search_tokens too, unranked.
+"""
+
+import re
+from typing import Dict, Any, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+
+from .connection import posts_collection
+from .counts import post_list_total
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MIN_TOKEN_LENGTH = 2
+MAX_TOKENS_PER_POST = 500
+
+TEXT_INDEX_WEIGHTS = {"title": 10, "username": 5, "content": 1}
+INDEX_NOT_FOUND = 27
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def search_fields(title: str, content: str, username: str) -> Dict[str, Any]:
+    """Search fields to store on a post; call on every create/update."""
+    tokens = sorted(set(tokenize(title) + tokenize(content) + tokenize(username)))
+    return {"search_tokens": tokens[:MAX_TOKENS_PER_POST]}
+
+
+def ensure_search_indexes():
+    posts_collection.create_index(
+        [("title", TEXT), ("content", TEXT), ("username", TEXT)],
+        weights=TEXT_INDEX_WEIGHTS,
+        name="posts_text"
+    )
+    posts_collection.create_index([("search_tokens", ASCENDING)], name="posts_search_tokens")
+    posts_collection.create_index([("category", ASCENDING), ("created_at", DESCENDING)], name="posts_category_created")
+
+
+def build_search_query(search: str, use_text: bool = True) -> Tuple[Dict[str, Any], bool]:
+    """
+    Turn a raw search string into a Mongo filter.
+
+    Every word but the last must match as a whole word through the text
+    index (or search_tokens, with use_text=False); the last one is treated
+    as a prefix unless the query ends with a space. Returns (filter, ranked)
+    where ranked says whether the filter uses $text and can be sorted by
+    textScore.
+    """
+    words = tokenize(search)
+    if not words:
+        return {}, False
+
+    if search[-1:].isspace():
+        complete, prefix = words, None
+    else:
+        complete, prefix = words[:-1], words[-1]
+
+    if not use_text:
+        conditions = [{"search_tokens": word} for word in complete]
+        if prefix:
+            conditions.append({"search_tokens": {"$regex": f"^{re.escape(prefix)}"}})
+        return (conditions[0] if len(conditions) == 1 else {"$and": conditions}), False
+
+    query: Dict[str, Any] = {}
+    if complete:
+        # Quoted, so every word is required ($search alone ORs them)
+        query["$text"] = {"$search": " ".join(f'"{w}"' for w in complete)}
+    if prefix:
+        query["search_tokens"] = {"$regex": f"^{re.escape(prefix)}"}
+    return query, bool(complete)
+
+
+def _missing_text_index(error: OperationFailure) -> bool:
+    return error.code == INDEX_NOT_FOUND or "text index required" in str(error)
+
+
+def search_posts(
+    search: str,
+    category: str = "All",
+    limit: int = 50,
+    skip: int = 0,
+    projection: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """Ranked, paginated post search. Returns {"posts", "total", "approximate"}."""
+    try:
+        return _search_posts(search, category, limit, skip, projection, use_text=True)
+    except OperationFailure as e:
+        if not _missing_text_index(e):
+            raise
+        print("[DB] Posts text index missing, searching unranked; run the create_search_indexes migration")
+        return _search_posts(search, category, limit, skip, projection, use_text=False)
+
+
+def _search_posts(search, category, limit, skip, projection, use_text: bool) -> Dict[str, Any]:
+    query, ranked = build_search_query(search, use_text)
+    if category and category != "All":
+        query["category"] = category
+
+    projection = dict(projection or {})
+    projection["search_tokens"] = 0
+    if ranked:
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"}), ("created_at", DESCENDING)]
+    else:
+        sort = [("created_at", DESCENDING)]
+
+    posts = list(posts_collection.find(query, projection).sort(sort).skip(skip).limit(limit))
+    searching = bool(tokenize(search))
+    total, approximate = post_list_total(query, category, searching, len(posts), skip, limit)
+    return {"posts": posts, "total": total, "approximate": approximate}
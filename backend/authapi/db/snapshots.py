@@ -0,0 +1,308 @@
+# backend/authapi/db/snapshots.py
+"""
+Platform analytics snapshots
+
+A background thread in each web worker writes snapshots of the platform
+totals to the ``analytics`` collection at every UTC hour boundary
+("hourly:2026-10-19T13:00") and every midnight ("daily:2026-10-19"):
+
+    {_id, period, at, taken_at,
+     totals: {users, scans, durians, quality_sum, export_ready, local_sale, rejected},
+     delta: {...same counters, created since the previous snapshot},
+     metrics: {...ready-to-render admin report stats}}
+
+Snapshots are incremental: a new one is the previous totals plus the users
+and scans whose ObjectId falls between the two boundaries, a range scan on
+_id. Only the very first snapshot (dated two weeks back, to seed the daily
+history) counts everything. Growth percentages compare the last two weeks
+of daily snapshots, and the admin report reads the latest snapshot's
+metrics as a single document.
+
+Snapshot ids are deterministic, so the workers racing to take the same one
+simply collide on _id. Deleted scans are not subtracted; totals count what
+was created. ``python -m db.snapshots --rebuild`` re-seeds the chain.
+
+Hourly snapshots carry an ``expire_at`` SNAPSHOT_HOURLY_RETENTION_HOURS
+after their boundary and a TTL index removes them; daily ones are kept.
+(After an outage longer than that, the chain re-seeds from a full count.)
+"""
+
+import argparse
+import os
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from .connection import analytics_collection, scans_collection, users_collection, close_client
+from .rollups import STATUS_FIELDS
+
+SNAPSHOTS_ENABLED = os.getenv("SNAPSHOTS_ENABLED", "1") == "1"
+SNAPSHOT_CHECK_SECONDS = float(os.getenv("SNAPSHOT_CHECK_SECONDS", 60))
+SNAPSHOT_MAX_CATCHUP_HOURS = int(os.getenv("SNAPSHOT_MAX_CATCHUP_HOURS", 48))
+SNAPSHOT_HOURLY_RETENTION_HOURS = int(os.getenv("SNAPSHOT_HOURLY_RETENTION_HOURS", SNAPSHOT_MAX_CATCHUP_HOURS + 24))
+DAILY_SERIES_DAYS = 7
+
+COUNTERS = ("users", "scans", "durians", "quality_sum") + tuple(STATUS_FIELDS.values())
+
+HOURLY = "hourly"
+DAILY = "daily"
+
+
+def ensure_snapshot_indexes():
+    analytics_collection.create_index([("period", ASCENDING), ("at", DESCENDING)])
+    analytics_collection.create_index("expire_at", expireAfterSeconds=0)
+    # Hourly snapshots written before retention existed have no expire_at
+    analytics_collection.delete_many({
+        "period": HOURLY,
+        "expire_at": {"$exists": False},
+        "at": {"$lt": datetime.utcnow() - timedelta(hours=SNAPSHOT_HOURLY_RETENTION_HOURS)}
+    })
+
+
+def _snapshot_id(period: str, at: datetime) -> str:
+    return f"{period}:{at.strftime('%Y-%m-%dT%H:00' if period == HOURLY else '%Y-%m-%d')}"
+
+
+def _hour(when: datetime) -> datetime:
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+# ---------------------------
+# Counting
+# ---------------------------
+
+def _id_range(start: Optional[datetime], end: datetime) -> Dict[str, Any]:
+    bounds = {"$lt": ObjectId.from_datetime(end)}
+    if start is not None:
+        bounds["$gte"] = ObjectId.from_datetime(start)
+    return {"_id": bounds}
+
+
+def count_created(start: Optional[datetime], end: datetime) -> Dict[str, int]:
+    """Users and scans created in [start, end) (everything before end if start is None)."""
+    status_sums = {
+        field: {"$sum": {"$cond": [{"$eq": ["$status", status]}, 1, 0]}}
+        for status, field in STATUS_FIELDS.items()
+    }
+    scans = next(scans_collection.aggregate([
+        {"$match": _id_range(start, end)},
+        {"$group": {
+            "_id": None,
+            "scans": {"$sum": 1},
+            "durians": {"$sum": {"$ifNull": ["$durian_count", 0]}},
+            "quality_sum": {"$sum": {"$ifNull": ["$quality_score", 0]}},
+            **status_sums
+        }}
+    ]), {})
+    counts = {field: scans.get(field, 0) for field in COUNTERS}
+    counts["users"] = users_collection.count_documents(_id_range(start, end))
+    return counts
+
+
+def _add(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    return {field: a.get(field, 0) + b.get(field, 0) for field in COUNTERS}
+
+
+def _sub(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    return {field: a.get(field, 0) - b.get(field, 0) for field in COUNTERS}
+
+
+# ---------------------------
+# Metrics
+# ---------------------------
+
+def _growth(current: int, previous: int) -> float:
+    """Same rule as the per-user weekly_growth in db/scans.py."""
+    if previous > 0:
+        return round((current - previous) / previous * 100, 1)
+    return 100 if current > 0 else 0
+
+
+def _metrics(totals: Dict[str, int], dailies: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Report stats from the latest totals and the daily snapshots before them (newest first)."""
+    # dailies[0] is the most recent midnight, dailies[7] a week before it
+    week = dailies[7]["totals"] if len(dailies) > 7 else None
+    two_weeks = dailies[14]["totals"] if len(dailies) > 14 else None
+    this_week = _sub(totals, week) if week else {}
+    last_week = _sub(week, two_weeks) if week and two_weeks else {}
+
+    scans = totals.get("scans", 0)
+    rejected = totals.get("rejected", 0)
+    return {
+        "total_users": totals.get("users", 0),
+        "total_scans": scans,
+        "total_durians_detected": totals.get("durians", 0),
+        "overall_success_rate": round((scans - rejected) / scans * 100, 2) if scans else 0,
+        "avg_quality": round(totals.get("quality_sum", 0) / scans, 1) if scans else 0,
+        "status_breakdown": {field: totals.get(field, 0) for field in STATUS_FIELDS.values()},
+        "scan_success_breakdown": {"successful": scans - rejected, "rejected": rejected},
+        "user_growth_percent": _growth(this_week.get("users", 0), last_week.get("users", 0)),
+        "weekly_growth_percent": _growth(this_week.get("scans", 0), last_week.get("scans", 0)),
+        "daily_scans": [
+            {
+                "day": (daily["at"] - timedelta(days=1)).strftime("%a"),
+                "date": (daily["at"] - timedelta(days=1)).strftime("%Y-%m-%d"),
+                "scans": daily["delta"].get("scans", 0),
+                "successful": daily["delta"].get("scans", 0) - daily["delta"].get("rejected", 0),
+                "durians": daily["delta"].get("durians", 0),
+                "new_users": daily["delta"].get("users", 0)
+            }
+            for daily in reversed(dailies[:DAILY_SERIES_DAYS])
+        ]
+    }
+
+
+# ---------------------------
+# Snapshots
+# ---------------------------
+
+def latest_snapshot(period: str = HOURLY) -> Optional[Dict[str, Any]]:
+    return analytics_collection.find_one({"period": period}, sort=[("at", -1)])
+
+
+def _recent_dailies(before: datetime, limit: int = 2 * DAILY_SERIES_DAYS + 1) -> List[Dict[str, Any]]:
+    return list(
+        analytics_collection.find({"period": DAILY, "at": {"$lte": before}}, {"at": 1, "totals": 1, "delta": 1})
+        .sort("at", -1)
+        .limit(limit)
+    )
+
+
+def _write(snapshot: Dict[str, Any]) -> bool:
+    try:
+        analytics_collection.insert_one(snapshot)
+        return True
+    except DuplicateKeyError:
+        return False  # another worker took it first
+
+
+def take_snapshot(at: datetime, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Hourly snapshot at boundary `at` (plus the daily one at midnight)."""
+    delta = count_created(previous["at"] if previous else None, at)
+    totals = _add(previous["totals"], delta) if previous else delta
+
+    daily = None
+    if at.hour == 0:
+        last_daily = latest_snapshot(DAILY)
+        daily = {
+            "_id": _snapshot_id(DAILY, at),
+            "period": DAILY,
+            "at": at,
+            "taken_at": datetime.utcnow(),
+            "totals": totals,
+            "delta": _sub(totals, last_daily["totals"]) if last_daily else totals
+        }
+
+    dailies = _recent_dailies(at)
+    if daily is not None:
+        dailies = [daily] + [d for d in dailies if d["_id"] != daily["_id"]]
+    metrics = _metrics(totals, dailies)
+
+    snapshot = {
+        "_id": _snapshot_id(HOURLY, at),
+        "period": HOURLY,
+        "at": at,
+        "taken_at": datetime.utcnow(),
+        "totals": totals,
+        "delta": delta,
+        "metrics": metrics,
+        "expire_at": at + timedelta(hours=SNAPSHOT_HOURLY_RETENTION_HOURS)
+    }
+    if daily is not None:
+        _write({**daily, "metrics": metrics})
+    _write(snapshot)
+    return snapshot
+
+
+def catch_up(now: Optional[datetime] = None) -> int:
+    """Take every hourly snapshot due since the last one. Returns how many were written."""
+    boundary = _hour(now or datetime.utcnow())
+    previous = latest_snapshot(HOURLY)
+    written = 0
+    if previous is None:
+        # First run: one full count as of two weeks ago, then daily steps,
+        # so growth percentages have history from the start
+        seed = boundary.replace(hour=0) - timedelta(days=2 * DAILY_SERIES_DAYS)
+        previous = take_snapshot(seed, None)
+        written = 1
+    due = []
+    at = previous["at"] + timedelta(hours=1)
+    while at <= boundary:
+        due.append(at)
+        at += timedelta(hours=1)
+    if len(due) > SNAPSHOT_MAX_CATCHUP_HOURS:
+        # Long outage: skip ahead rather than replay every hour (midnights kept)
+        due = [d for d in due[:-SNAPSHOT_MAX_CATCHUP_HOURS] if d.hour == 0] + due[-SNAPSHOT_MAX_CATCHUP_HOURS:]
+    for at in due:
+        previous = take_snapshot(at, previous)
+    written += len(due)
+    if written:
+        print(f"[DB] Took {written} analytics snapshot(s), latest {previous['_id']}")
+    return written
+
+
+def latest_metrics() -> Optional[Dict[str, Any]]:
+    """Metrics of the newest snapshot, one small document (None before the first)."""
+    snapshot = analytics_collection.find_one({"period": HOURLY}, {"metrics": 1, "at": 1}, sort=[("at", -1)])
+    if not snapshot:
+        return None
+    return {**snapshot["metrics"], "snapshot_id": snapshot["_id"], "snapshot_at": snapshot["at"]}
+
+
+def rebuild_snapshots() -> int:
+    """Drop all snapshots and re-seed from a full count."""
+    analytics_collection.delete_many({"period": {"$in": [HOURLY, DAILY]}})
+    return catch_up()
+
+
+# ---------------------------
+# Scheduler
+# ---------------------------
+_thread_pid = None
+_thread_lock = threading.Lock()
+
+
+def _run():
+    # Jitter so workers started together do not all count at once
+    stop = threading.Event()
+    stop.wait(random.uniform(0, min(10, SNAPSHOT_CHECK_SECONDS)))
+    while True:
+        try:
+            catch_up()
+        except Exception as e:
+            print(f"[DB] Analytics snapshot failed: {e}")
+        stop.wait(SNAPSHOT_CHECK_SECONDS)
+
+
+def start_snapshot_scheduler():
+    """Start this worker's snapshot thread (threads do not survive fork)."""
+    global _thread_pid
+    if not SNAPSHOTS_ENABLED:
+        return
+    pid = os.getpid()
+    with _thread_lock:
+        if _thread_pid == pid:
+            return
+        threading.Thread(target=_run, name="analytics-snapshots", daemon=True).start()
+        _thread_pid = pid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Take or rebuild platform analytics snapshots")
+    parser.add_argument("--rebuild", action="store_true", help="drop all snapshots and re-seed")
+    args = parser.parse_args(argv)
+    try:
+        written = rebuild_snapshots() if args.rebuild else catch_up()
+        print(f"[DB] {written} snapshot(s) written")
+        return 0
+    finally:
+        close_client()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
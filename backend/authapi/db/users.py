@@ -0,0 +1,154 @@
+# backend/authapi/db/users.py
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+from .connection import users_collection
+from .authors import invalidate_author
+from .counts import estimated_total, filtered_total
+
+# ---------------------------
+# User helpers
+# ---------------------------
+
+def set_logged_in(user_id: str, is_logged_in: bool):
+    """Update the user's login status."""
+    users_collection.update_one(
+        {"_id": user_id},
+        {"$set": {"isLoggedIn": is_logged_in, "lastLogin": datetime.utcnow()}},
+        upsert=False
+    )
+
+def update_photo_profile(user_id: str, photo_url: str, photo_public_id: Optional[str] = None):
+    """Update the user's profile photo."""
+    update_data = {"photoProfile": photo_url}
+    if photo_public_id:
+        update_data["photoPublicId"] = photo_public_id
+    
+    users_collection.update_one(
+        {"_id": user_id},
+        {"$set": update_data},
+        upsert=False
+    )
+    invalidate_author(user_id)
+
+
+# ---------------------------
+# Admin listing, bulk updates and export
+# ---------------------------
+
+USER_LIST_PROJECTION = {
+    "name": 1, "email": 1, "role": 1, "profile_picture": 1, "photoProfile": 1,
+    "createdAt": 1, "updatedAt": 1, "lastLogin": 1, "isActive": 1, "deactivationReason": 1
+}
+VALID_ROLES = ("user", "admin")
+
+
+def build_user_query(search: str = "", role: Optional[str] = None, active: Optional[bool] = None) -> Dict[str, Any]:
+    """Server-side filter for the admin user list and export."""
+    query: Dict[str, Any] = {}
+    if search:
+        pattern = {"$regex": re.escape(search.strip()), "$options": "i"}
+        query["$or"] = [{"name": pattern}, {"email": pattern}]
+    if role:
+        query["role"] = role
+    if active is True:
+        query["isActive"] = {"$ne": False}  # users created before isActive existed are active
+    elif active is False:
+        query["isActive"] = False
+    return query
+
+
+def list_users(query: Dict[str, Any], limit: int = 50, after: Optional[str] = None, skip: int = 0) -> Dict[str, Any]:
+    """
+    One page of users, newest first. Pass the previous page's next_cursor as
+    ``after`` to page by _id instead of skip, which stays fast on deep pages.
+    """
+    page_query = dict(query)
+    if after:
+        page_query["_id"] = {"$lt": ObjectId(after)}
+        skip = 0
+    users = list(
+        users_collection.find(page_query, USER_LIST_PROJECTION)
+        .sort("_id", -1)
+        .skip(skip)
+        .limit(limit + 1)
+    )
+    has_more = len(users) > limit
+    users = users[:limit]
+    return {
+        "users": users,
+        "next_cursor": str(users[-1]["_id"]) if has_more and users else None
+    }
+
+
+def count_users(query: Dict[str, Any]) -> Tuple[int, bool]:
+    """(total, approximate) for a user filter; unfiltered totals come from metadata."""
+    if not query:
+        return estimated_total("users")
+    return filtered_total(query, "users")
+
+
+def _bulk_update(action: str, role: Optional[str], reason: Optional[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(state filter, update) for a bulk action; the filter skips users already in that state."""
+    now = datetime.utcnow().isoformat()
+    if action == "deactivate":
+        return (
+            {"isActive": {"$ne": False}},
+            {"$set": {"isActive": False, "deactivationReason": reason or "No reason provided",
+                      "deactivatedAt": now, "updatedAt": now}}
+        )
+    if action == "activate":
+        return (
+            {"isActive": False},
+            {"$set": {"isActive": True, "updatedAt": now}, "$unset": {"deactivationReason": "", "deactivatedAt": ""}}
+        )
+    if action == "role":
+        if role not in VALID_ROLES:
+            raise ValueError("Invalid role")
+        return {"role": {"$ne": role}}, {"$set": {"role": role, "updatedAt": now}}
+    raise ValueError(f"Unknown action: {action}")
+
+
+def bulk_update_users(user_ids: List[str], action: str, role: Optional[str] = None,
+                      reason: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Apply activate / deactivate / role to many users with one bulk_write.
+    Returns the counts plus the users that actually changed (for emails and
+    principal cache refresh) and any ids that were not valid ObjectIds.
+    """
+    state_filter, update = _bulk_update(action, role, reason)
+    oids, invalid = [], []
+    for user_id in dict.fromkeys(user_ids):
+        try:
+            oids.append(ObjectId(user_id))
+        except (InvalidId, TypeError):
+            invalid.append(user_id)
+
+    changed = list(users_collection.find(
+        {"_id": {"$in": oids}, **state_filter},
+        {"name": 1, "email": 1}
+    )) if oids else []
+    ops = [UpdateOne({"_id": user["_id"], **state_filter}, update) for user in changed]
+    result = users_collection.bulk_write(ops, ordered=False) if ops else None
+    for user in changed:
+        invalidate_author(user["_id"])
+    return {
+        "requested": len(oids) + len(invalid),
+        "modified": result.modified_count if result else 0,
+        "changed": changed,
+        "invalid_ids": invalid
+    }
+
+
+def iter_users(query: Dict[str, Any], batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Stream every matching user from one server-side cursor (for exports)."""
+    cursor = users_collection.find(query, USER_LIST_PROJECTION, batch_size=batch_size).sort("_id", 1)
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
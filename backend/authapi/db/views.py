@@ -0,0 +1,113 @@
+# backend/authapi/db/views.py
+"""
+Buffered post view counting
+
+Reading a post used to issue a synchronous $inc on ``views``. Views are now
+coalesced per post in memory and written with one unordered bulk_write
+every VIEW_FLUSH_INTERVAL_SECONDS (default 5), or sooner once
+VIEW_FLUSH_MAX_PENDING (default 1000) views are buffered. Pending counts
+are flushed at interpreter shutdown, so a crash loses at most one interval
+or one batch of views, whichever comes first.
+"""
+
+import atexit
+import os
+import threading
+from typing import Dict
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from .connection import posts_collection
+
+VIEW_FLUSH_INTERVAL_SECONDS = float(os.getenv("VIEW_FLUSH_INTERVAL_SECONDS", 5))
+VIEW_FLUSH_MAX_PENDING = int(os.getenv("VIEW_FLUSH_MAX_PENDING", 1000))
+
+
+class ViewCounter:
+    """Coalesces view increments per post and flushes them in batches."""
+
+    def __init__(self, collection, interval: float, max_pending: int):
+        self.collection = collection
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[ObjectId, int] = {}
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+    def record(self, post_oid: ObjectId, count: int = 1):
+        self._ensure_thread()
+        with self._lock:
+            self._pending[post_oid] = self._pending.get(post_oid, 0) + count
+            self._pending_total += count
+            full = self._pending_total >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def pending(self, post_oid: ObjectId) -> int:
+        with self._lock:
+            return self._pending.get(post_oid, 0)
+
+    def flush(self) -> int:
+        """Write buffered views to MongoDB. Returns the number of posts updated."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._pending_total = 0
+            if not batch:
+                return 0
+            ops = [UpdateOne({"_id": oid}, {"$inc": {"views": n}}) for oid, n in batch.items()]
+            try:
+                self.collection.bulk_write(ops, ordered=False)
+            except Exception as e:
+                print(f"[DB] View flush failed, requeueing {len(batch)} posts: {e}")
+                with self._lock:
+                    for oid, n in batch.items():
+                        self._pending[oid] = self._pending.get(oid, 0) + n
+                        self._pending_total += n
+                return 0
+            return len(batch)
+
+    def _ensure_thread(self):
+        # Threads do not survive fork(), so each worker starts its own
+        pid = os.getpid()
+        if self._thread_pid == pid:
+            return
+        with self._lock:
+            if self._thread_pid == pid:
+                return
+            if self._thread_pid is not None:
+                # Inherited counts belong to the parent process
+                self._pending = {}
+                self._pending_total = 0
+            self._thread = threading.Thread(target=self._run, name="view-counter-flush", daemon=True)
+            self._thread_pid = pid
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+view_counter = ViewCounter(posts_collection, VIEW_FLUSH_INTERVAL_SECONDS, VIEW_FLUSH_MAX_PENDING)
+
+
+def record_view(post_oid: ObjectId):
+    view_counter.record(post_oid)
+
+
+def pending_views(post_oid: ObjectId) -> int:
+    return view_counter.pending(post_oid)
+
+
+def flush_views() -> int:
+    return view_counter.flush()
+
+
+atexit.register(flush_views)
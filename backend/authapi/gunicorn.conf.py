@@ -0,0 +1,52 @@
+# backend/authapi/gunicorn.conf.py
+"""
+Production serving configuration, picked up automatically by
+
+    gunicorn app:app
+
+when started from backend/authapi. With gevent installed each worker is a
+single event loop holding up to GUNICORN_WORKER_CONNECTIONS in-flight
+requests, so slow outbound I/O (chatbot, Cloudinary, SMTP, report calls)
+no longer ties up one thread per request. Model inference and password
+hashing run on native thread pools (see concurrency.py). Without gevent
+the threaded "gthread" worker is used.
+
+APP_ROLES picks the blueprints a deployment serves (see create_app in
+app.py), e.g. a small API tier and a CPU-dense scanner node:
+
+    APP_ROLES=api,reports gunicorn app:app
+    APP_ROLES=inference GUNICORN_WORKERS=1 PORT=8100 gunicorn app:app
+    APP_ROLES=scanner INFERENCE_URL=http://127.0.0.1:8100 gunicorn app:app
+
+Background threads (analytics snapshots, email outbox delivery) are
+started per worker in post_worker_init, not when the app is imported.
+
+The Flask development server (python app.py) is unchanged.
+"""
+
+import multiprocessing
+import os
+
+try:
+    import gevent  # noqa: F401
+    _has_gevent = True
+except ImportError:
+    _has_gevent = False
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent" if _has_gevent else "gthread")
+workers = int(os.getenv("GUNICORN_WORKERS", min(4, multiprocessing.cpu_count())))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 500))
+threads = int(os.getenv("GUNICORN_THREADS", 8))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# The app must be imported after the worker has monkey-patched the stdlib
+preload_app = False
+
+
+def post_worker_init(worker):
+    from app import app, start_background
+    start_background(app)
+    print(f"[SERVER] Worker {worker.pid} ready ({worker_class})")
@@ -3,6 +3,8 @@ from .cloudinary_handler import CloudinaryPFP
 from .email_handler import (
     send_deactivation_email,
     send_reactivation_email,
+    send_checkout_email,
+    queue_account_emails,
     MAILTRAP_HOST,
     MAILTRAP_PORT,
     MAILTRAP_USERNAME,
@@ -15,4 +17,6 @@ __all__ = [
     'CloudinaryPFP',
     'send_deactivation_email',
     'send_reactivation_email',
+    'send_checkout_email',
+    'queue_account_emails',
 ]
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from db.cache import TTLCache
+from db import related_posts, rank_texts, get_user_scans
+
+# ---------------------------
+# Configuration
+# ---------------------------
+CHAT_API_URL = os.getenv("CHAT_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+CHAT_MODEL = os.getenv("CHAT_MODEL", "llama-3.1-8b-instant")
+CHAT_MAX_TOKENS = int(os.getenv("CHAT_MAX_TOKENS", 1000))
+CHAT_TEMPERATURE = float(os.getenv("CHAT_TEMPERATURE", 0.7))
+CHAT_CONNECT_TIMEOUT = float(os.getenv("CHAT_CONNECT_TIMEOUT", 5))
+CHAT_READ_TIMEOUT = float(os.getenv("CHAT_READ_TIMEOUT", 30))
+CHAT_POOL_SIZE = int(os.getenv("CHAT_POOL_SIZE", 20))
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", 16))
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", 2))
+CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", 3600))
+CHAT_CACHE_MAXSIZE = int(os.getenv("CHAT_CACHE_MAXSIZE", 2000))
+CHAT_HISTORY_MESSAGES = int(os.getenv("CHAT_HISTORY_MESSAGES", 8))
+
+RAG_ENABLED = os.getenv("RAG_ENABLED", "true").lower() == "true"
+RAG_POST_K = int(os.getenv("RAG_POST_K", 3))
+RAG_SCAN_K = int(os.getenv("RAG_SCAN_K", 3))
+RAG_SCAN_LIMIT = int(os.getenv("RAG_SCAN_LIMIT", 20))
+RAG_MIN_SCORE = float(os.getenv("RAG_MIN_SCORE", 0.1))
+RAG_SNIPPET_CHARS = int(os.getenv("RAG_SNIPPET_CHARS", 300))
+RAG_MAX_CONTEXT_CHARS = int(os.getenv("RAG_MAX_CONTEXT_CHARS", 1500))
+
+
+class ChatError(Exception):
+    """Upstream failure; status is the HTTP status to return to the client."""
+
+    def __init__(self, message: str, status: int = 502):
+        super().__init__(message)
+        self.status = status
+
+
+class ChatBusy(ChatError):
+    def __init__(self):
+        super().__init__("Chat assistant is busy, please try again", 503)
+
+
+# ---------------------------
+# Pooled HTTP session
+# ---------------------------
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Keep-alive session shared by all requests in this worker process."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session_pid != pid:
+        with _session_lock:
+            if _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CHAT_POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session, _session_pid = session, pid
+    return _session
+
+
+# ---------------------------
+# Response cache and limiter
+# ---------------------------
+_response_cache = TTLCache(ttl=CHAT_CACHE_TTL_SECONDS, maxsize=CHAT_CACHE_MAXSIZE)
+_slots = threading.BoundedSemaphore(CHAT_MAX_CONCURRENCY)
+
+
+def cache_key(messages: List[Dict[str, Any]]) -> str:
+    """Identical conversations (same system prompt and turns) share a key."""
+    normalized = [{"role": m.get("role"), "content": (m.get("content") or "").strip()} for m in messages]
+    raw = json.dumps([CHAT_MODEL, CHAT_MAX_TOKENS, CHAT_TEMPERATURE, normalized], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _acquire():
+    if not _slots.acquire(timeout=CHAT_QUEUE_TIMEOUT):
+        raise ChatBusy()
+
+
+def _post(messages: List[Dict[str, Any]], stream: bool) -> requests.Response:
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ChatError("GROQ_API_KEY not configured", 500)
+    try:
+        response = get_session().post(
+            CHAT_API_URL,
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            json={
+                "model": CHAT_MODEL,
+                "messages": messages,
+                "max_tokens": CHAT_MAX_TOKENS,
+                "temperature": CHAT_TEMPERATURE,
+                "stream": stream,
+            },
+            timeout=(CHAT_CONNECT_TIMEOUT, CHAT_READ_TIMEOUT),
+            stream=stream,
+        )
+    except requests.RequestException as e:
+        raise ChatError(f"Chat API unreachable: {e}")
+    if response.status_code != 200:
+        response.close()
+        raise ChatError(f"Groq API error: {response.status_code}", response.status_code)
+    return response
+
+
+# ---------------------------
+# Retrieval grounding
+# ---------------------------
+
+def _snippet(text: str) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= RAG_SNIPPET_CHARS else text[:RAG_SNIPPET_CHARS].rsplit(" ", 1)[0] + "..."
+
+
+def _scan_text(scan: Dict[str, Any]) -> str:
+    created = scan.get("created_at")
+    date = created.strftime("%Y-%m-%d") if hasattr(created, "strftime") else "unknown date"
+    return (
+        f"Scan on {date}: durian variety {scan.get('variety', 'Unknown')}, "
+        f"quality score {scan.get('quality_score', 0)} ({scan.get('status', 'unknown')}), "
+        f"{scan.get('durian_count', 0)} durians detected"
+    )
+
+
+def retrieve_context(query: str, user_id: str = None) -> List[str]:
+    """
+    Top forum posts and the user's most relevant recent scans for a query.
+    user_id must be authenticated by the caller (see chatbot_routes).
+    """
+    snippets = []
+    for post in related_posts(query, k=RAG_POST_K, min_score=RAG_MIN_SCORE):
+        snippets.append(f"[Forum: {post.get('title', '')}] {_snippet(post.get('content', ''))}")
+
+    if user_id:
+        scan_texts = [_scan_text(scan) for scan in get_user_scans(user_id, limit=RAG_SCAN_LIMIT)]
+        for index, _ in rank_texts(query, scan_texts, RAG_SCAN_K, RAG_MIN_SCORE):
+            snippets.append(f"[Your {scan_texts[index]}]")
+    return snippets
+
+
+def ground_messages(messages: List[Dict[str, Any]], user_id: str = None) -> List[Dict[str, Any]]:
+    """
+    Trim history to the last CHAT_HISTORY_MESSAGES turns and insert a
+    system message with retrieved context after the leading system prompt.
+    """
+    system = []
+    for message in messages:
+        if message.get("role") != "system":
+            break
+        system.append(message)
+    turns = [m for m in messages[len(system):] if m.get("role") != "system"][-CHAT_HISTORY_MESSAGES:]
+
+    query = next((m.get("content") or "" for m in reversed(turns) if m.get("role") == "user"), "")
+    if not RAG_ENABLED or not query.strip():
+        return system + turns
+
+    try:
+        snippets = retrieve_context(query, user_id)
+    except Exception as e:
+        print(f"[ERROR] Chat retrieval failed: {e}")
+        snippets = []
+    if not snippets:
+        return system + turns
+
+    context, used = [], 0
+    for snippet in snippets:
+        if used + len(snippet) > RAG_MAX_CONTEXT_CHARS:
+            break
+        context.append(f"- {snippet}")
+        used += len(snippet)
+    grounding = {
+        "role": "system",
+        "content": "Relevant context from the Durianostics forum and this user's scans "
+                   "(use it only if it helps answer):\n" + "\n".join(context)
+    }
+    return system + [grounding] + turns
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+
+def complete(messages: List[Dict[str, Any]]) -> str:
+    """Full completion text, served from the cache when possible."""
+    key = cache_key(messages)
+    cached = _response_cache.get(key)
+    if cached is not None:
+        return cached
+
+    _acquire()
+    try:
+        response = _post(messages, stream=False)
+        content = response.json()["choices"][0]["message"]["content"]
+    finally:
+        _slots.release()
+    _response_cache.set(key, content)
+    return content
+
+
+def stream(messages: List[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Yield completion text deltas as the upstream produces them.
+
+    The concurrency slot is taken before the first yield and released when
+    the generator finishes or the client disconnects. Completed answers are
+    cached, and a cache hit yields the whole answer at once.
+    """
+    key = cache_key(messages)
+    cached = _response_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    _acquire()
+    try:
+        response = _post(messages, stream=True)
+        parts = []
+        finished = False
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    finished = True
+                    break
+                try:
+                    choice = json.loads(data)["choices"][0]
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    raise ChatError(f"Malformed chat stream chunk: {e!r}")
+                delta = choice.get("delta", {}).get("content")
+                if delta:
+                    parts.append(delta)
+                    yield delta
+                if choice.get("finish_reason"):
+                    finished = True
+        if finished:
+            _response_cache.set(key, "".join(parts))
+    except requests.RequestException as e:
+        raise ChatError(f"Chat stream interrupted: {e}")
+    finally:
+        _slots.release()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _response_cache.stats()
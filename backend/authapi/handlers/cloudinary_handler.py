@@ -10,7 +10,7 @@ class CloudinaryPFP:
     """Profile Picture handler for Cloudinary"""
     
     @staticmethod
-    async def upload_profile_picture(
+    def upload_profile_picture(
         image_data: bytes,
         user_id: str,
         username: str,
@@ -102,7 +102,7 @@ class CloudinaryPFP:
         Update user's profile picture in MongoDB
         This function should be imported from your db.py
         """
-        from db import users_collection
+        from db import users_collection, invalidate_author
         
         update_data = {
             "photoProfile": pfp_data.get("photoProfile"),
@@ -118,6 +118,7 @@ class CloudinaryPFP:
             {"_id": user_id},
             {"$set": update_data}
         )
+        invalidate_author(user_id)
     
     @staticmethod
     def get_default_pfp(username: str) -> Dict:
@@ -135,7 +136,7 @@ class CloudinaryScan:
     """Scan image handler for Cloudinary"""
     
     @staticmethod
-    async def upload_scan_image(
+    def upload_scan_image(
         image_data: bytes,
         user_id: str,
         scan_id: str
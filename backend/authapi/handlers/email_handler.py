@@ -1,5 +1,13 @@
+# backend/authapi/handlers/email_handler.py
+"""
+Transactional emails
+
+The build_*_message functions compose the messages; the send_* functions
+queue them in the outbox (handlers/outbox.py) and return at once, True if
+the message was stored. Delivery, retries and SMTP connections are the
+outbox workers' job, so no request waits on the mail server.
+"""
 
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
@@ -10,16 +18,20 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
-# Mailtrap SMTP Configuration from .env
-MAILTRAP_HOST = os.getenv("MAIL_HOST", "sandbox.smtp.mailtrap.io")
-MAILTRAP_PORT = int(os.getenv("MAIL_PORT", "2525"))
-MAILTRAP_USERNAME = os.getenv("MAIL_USERNAME", "")
-MAILTRAP_PASSWORD = os.getenv("MAIL_PASSWORD", "")
+from .outbox import (
+    queue_email,
+    queue_emails,
+    SMTP_HOST as MAILTRAP_HOST,
+    SMTP_PORT as MAILTRAP_PORT,
+    SMTP_USERNAME as MAILTRAP_USERNAME,
+    SMTP_PASSWORD as MAILTRAP_PASSWORD
+)
+
 FROM_EMAIL = os.getenv("MAIL_FROM_ADDRESS", "noreply@durianostics.com")
 FROM_NAME = os.getenv("MAIL_FROM_NAME", "Durianostics Admin")
 
 
-def send_checkout_email(
+def build_checkout_message(
     user_email: str,
     user_name: str,
     items,
@@ -29,48 +41,47 @@ def send_checkout_email(
     address=None,
     phone=None,
     payment_method=None
-) -> bool:
+) -> MIMEMultipart:
     """
-    Send order confirmation email with attached PDF receipt via Mailtrap
+    Order confirmation email with attached PDF receipt
     Fully UTF-8 safe to support characters like ₱.
     """
-    try:
-        # Ensure pdf_bytes is bytes
-        if isinstance(pdf_bytes, str):
-            pdf_bytes = pdf_bytes.encode("latin1")
-
-        # Create multipart message
-        msg = MIMEMultipart("alternative")
-        msg.set_charset("utf-8")
-        msg["Subject"] = Header(
-            f"Your DurianApp Order Receipt (Transaction ID: {transaction_id})",
-            "utf-8"
-        )
-        msg["From"] = Header(f"{FROM_NAME} <{FROM_EMAIL}>", "utf-8")
-        msg["To"] = Header(user_email, "utf-8")
-
-        # Build order summary
-        item_lines = "".join(
-            [f"<li>{item['name']} x{item['quantity']} - P{item['price']}</li>" for item in items]
-        )
-
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Thank you for your purchase, {user_name}!</h2>
-            <p>Transaction ID: <b>{transaction_id}</b></p>
-            <p><b>Delivery Address:</b> {address or 'N/A'}<br>
-               <b>Phone:</b> {phone or 'N/A'}<br>
-               <b>Payment Method:</b> {payment_method or 'N/A'}</p>
-            <h3>Order Summary:</h3>
-            <ul>{item_lines}</ul>
-            <p><b>Total:</b> P{total}</p>
-            <p>Your receipt is attached as a PDF.</p>
-        </body>
-        </html>
-        """
-
-        text_content = f"""
+    # Ensure pdf_bytes is bytes
+    if isinstance(pdf_bytes, str):
+        pdf_bytes = pdf_bytes.encode("latin1")
+
+    # Create multipart message
+    msg = MIMEMultipart("alternative")
+    msg.set_charset("utf-8")
+    msg["Subject"] = Header(
+        f"Your DurianApp Order Receipt (Transaction ID: {transaction_id})",
+        "utf-8"
+    )
+    msg["From"] = Header(f"{FROM_NAME} <{FROM_EMAIL}>", "utf-8")
+    msg["To"] = Header(user_email, "utf-8")
+
+    # Build order summary
+    item_lines = "".join(
+        [f"<li>{item['name']} x{item['quantity']} - P{item['price']}</li>" for item in items]
+    )
+
+    html_content = f"""
+    <html>
+    <body>
+        <h2>Thank you for your purchase, {user_name}!</h2>
+        <p>Transaction ID: <b>{transaction_id}</b></p>
+        <p><b>Delivery Address:</b> {address or 'N/A'}<br>
+           <b>Phone:</b> {phone or 'N/A'}<br>
+           <b>Payment Method:</b> {payment_method or 'N/A'}</p>
+        <h3>Order Summary:</h3>
+        <ul>{item_lines}</ul>
+        <p><b>Total:</b> P{total}</p>
+        <p>Your receipt is attached as a PDF.</p>
+    </body>
+    </html>
+    """
+
+    text_content = f"""
 Thank you for your purchase, {user_name}!
 Transaction ID: {transaction_id}
 Delivery Address: {address or 'N/A'}
@@ -78,54 +89,38 @@ Phone: {phone or 'N/A'}
 Payment Method: {payment_method or 'N/A'}
 Total: P{total}
 Your receipt is attached as a PDF.
-        """
-
-        # Attach plain text and HTML (both UTF-8)
-        part1 = MIMEText(text_content, "plain", "utf-8")
-        part2 = MIMEText(html_content, "html", "utf-8")
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Attach PDF
-        pdf_part = MIMEApplication(pdf_bytes, _subtype="pdf")
-        pdf_part.add_header('Content-Disposition', 'attachment', filename="receipt.pdf")
-        msg.attach(pdf_part)
-
-        # Send email via Mailtrap
-        with smtplib.SMTP(MAILTRAP_HOST, MAILTRAP_PORT) as server:
-            server.starttls()
-            server.login(MAILTRAP_USERNAME, MAILTRAP_PASSWORD)
-            server.sendmail(FROM_EMAIL, user_email, msg.as_string())
+    """
 
-        print(f"Checkout email sent successfully to {user_email}")
-        return True
+    # Attach plain text and HTML (both UTF-8)
+    part1 = MIMEText(text_content, "plain", "utf-8")
+    part2 = MIMEText(html_content, "html", "utf-8")
+    msg.attach(part1)
+    msg.attach(part2)
 
-    except Exception as e:
-        print(f"Failed to send checkout email to {user_email}: {str(e)}")
-        return False
+    # Attach PDF
+    pdf_part = MIMEApplication(pdf_bytes, _subtype="pdf")
+    pdf_part.add_header('Content-Disposition', 'attachment', filename="receipt.pdf")
+    msg.attach(pdf_part)
+    return msg
 
 
-def send_deactivation_email(user_email: str, user_name: str, reason: str) -> bool:
+def build_deactivation_message(user_email: str, user_name: str, reason: str) -> MIMEMultipart:
     """
-    Send account deactivation notification email via Mailtrap
+    Account deactivation notification email
     
     Args:
         user_email: The email address of the deactivated user
         user_name: The name of the deactivated user
         reason: The reason for deactivation provided by admin
-    
-    Returns:
-        bool: True if email sent successfully, False otherwise
     """
-    try:
-        # Create message
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = "Your Durianostics Account Has Been Deactivated"
-        msg["From"] = f"{FROM_NAME} <{FROM_EMAIL}>"
-        msg["To"] = user_email
-
-        # Plain text version
-        text_content = f"""
+    # Create message
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = "Your Durianostics Account Has Been Deactivated"
+    msg["From"] = f"{FROM_NAME} <{FROM_EMAIL}>"
+    msg["To"] = user_email
+
+    # Plain text version
+    text_content = f"""
 Hello {user_name},
 
 We regret to inform you that your Durianostics account has been deactivated by an administrator.
@@ -139,133 +134,117 @@ We apologize for any inconvenience this may cause.
 
 Best regards,
 The Durianostics Team
-        """
+    """
 
-        # HTML version
-        html_content = f"""
+    # HTML version
+    html_content = f"""
 <!DOCTYPE html>
 <html>
 <head>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        .header {{
-            background-color: #1b5e20;
-            color: white;
-            padding: 20px;
-            text-align: center;
-            border-radius: 8px 8px 0 0;
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 24px;
-        }}
-        .content {{
-            background-color: #f9f9f9;
-            padding: 30px;
-            border: 1px solid #ddd;
-            border-top: none;
-            border-radius: 0 0 8px 8px;
-        }}
-        .reason-box {{
-            background-color: #fff3e0;
-            border-left: 4px solid #ff9800;
-            padding: 15px;
-            margin: 20px 0;
-            border-radius: 4px;
-        }}
-        .reason-box h3 {{
-            margin: 0 0 10px 0;
-            color: #e65100;
-        }}
-        .footer {{
-            margin-top: 20px;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            font-size: 12px;
-            color: #666;
-            text-align: center;
-        }}
-        .appeal-link {{
-            color: #1b5e20;
-            text-decoration: underline;
-        }}
-    </style>
+<style>
+    body {{
+        font-family: Arial, sans-serif;
+        line-height: 1.6;
+        color: #333;
+        max-width: 600px;
+        margin: 0 auto;
+        padding: 20px;
+    }}
+    .header {{
+        background-color: #1b5e20;
+        color: white;
+        padding: 20px;
+        text-align: center;
+        border-radius: 8px 8px 0 0;
+    }}
+    .header h1 {{
+        margin: 0;
+        font-size: 24px;
+    }}
+    .content {{
+        background-color: #f9f9f9;
+        padding: 30px;
+        border: 1px solid #ddd;
+        border-top: none;
+        border-radius: 0 0 8px 8px;
+    }}
+    .reason-box {{
+        background-color: #fff3e0;
+        border-left: 4px solid #ff9800;
+        padding: 15px;
+        margin: 20px 0;
+        border-radius: 4px;
+    }}
+    .reason-box h3 {{
+        margin: 0 0 10px 0;
+        color: #e65100;
+    }}
+    .footer {{
+        margin-top: 20px;
+        padding-top: 20px;
+        border-top: 1px solid #ddd;
+        font-size: 12px;
+        color: #666;
+        text-align: center;
+    }}
+    .appeal-link {{
+        color: #1b5e20;
+        text-decoration: underline;
+    }}
+</style>
 </head>
 <body>
-    <div class="header">
-        <h1>🍈 Durianostics</h1>
+<div class="header">
+    <h1>🍈 Durianostics</h1>
+</div>
+<div class="content">
+    <p>Hello <strong>{user_name}</strong>,</p>
+    
+    <p>We regret to inform you that your Durianostics account has been <strong>deactivated</strong> by an administrator.</p>
+    
+    <div class="reason-box">
+        <h3>Reason for Deactivation:</h3>
+        <p>{reason}</p>
     </div>
-    <div class="content">
-        <p>Hello <strong>{user_name}</strong>,</p>
-        
-        <p>We regret to inform you that your Durianostics account has been <strong>deactivated</strong> by an administrator.</p>
-        
-        <div class="reason-box">
-            <h3>Reason for Deactivation:</h3>
-            <p>{reason}</p>
-        </div>
-        
-        <p>If you believe this action was taken in error or would like to appeal this decision, please contact our support team at <a href="mailto:support@durianostics.com" class="appeal-link">support@durianostics.com</a>.</p>
-        
-        <p>We apologize for any inconvenience this may cause.</p>
-        
-        <p>Best regards,<br>
-        <strong>The Durianostics Team</strong></p>
-        
-        <div class="footer">
-            <p>This is an automated message from Durianostics. Please do not reply directly to this email.</p>
-            <p>&copy; 2026 Durianostics. All rights reserved.</p>
-        </div>
+    
+    <p>If you believe this action was taken in error or would like to appeal this decision, please contact our support team at <a href="mailto:support@durianostics.com" class="appeal-link">support@durianostics.com</a>.</p>
+    
+    <p>We apologize for any inconvenience this may cause.</p>
+    
+    <p>Best regards,<br>
+    <strong>The Durianostics Team</strong></p>
+    
+    <div class="footer">
+        <p>This is an automated message from Durianostics. Please do not reply directly to this email.</p>
+        <p>&copy; 2026 Durianostics. All rights reserved.</p>
     </div>
+</div>
 </body>
 </html>
-        """
-
-        # Attach both versions
-        part1 = MIMEText(text_content, "plain")
-        part2 = MIMEText(html_content, "html")
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send email via Mailtrap SMTP
-        with smtplib.SMTP(MAILTRAP_HOST, MAILTRAP_PORT) as server:
-            server.starttls()
-            server.login(MAILTRAP_USERNAME, MAILTRAP_PASSWORD)
-            server.sendmail(FROM_EMAIL, user_email, msg.as_string())
-        
-        print(f"Deactivation email sent successfully to {user_email}")
-        return True
+    """
 
-    except Exception as e:
-        print(f"Failed to send deactivation email to {user_email}: {str(e)}")
-        return False
+    # Attach both versions
+    part1 = MIMEText(text_content, "plain")
+    part2 = MIMEText(html_content, "html")
+    msg.attach(part1)
+    msg.attach(part2)
+    return msg
 
 
-def send_reactivation_email(user_email: str, user_name: str) -> bool:
+def build_reactivation_message(user_email: str, user_name: str) -> MIMEMultipart:
     """
-    Send account reactivation notification email via Mailtrap
+    Account reactivation notification email
     
     Args:
         user_email: The email address of the reactivated user
         user_name: The name of the reactivated user
-    
-    Returns:
-        bool: True if email sent successfully, False otherwise
     """
-    try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = "Your Durianostics Account Has Been Reactivated"
-        msg["From"] = f"{FROM_NAME} <{FROM_EMAIL}>"
-        msg["To"] = user_email
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = "Your Durianostics Account Has Been Reactivated"
+    msg["From"] = f"{FROM_NAME} <{FROM_EMAIL}>"
+    msg["To"] = user_email
 
-        text_content = f"""
+    text_content = f"""
 Hello {user_name},
 
 Great news! Your Durianostics account has been reactivated.
@@ -276,91 +255,116 @@ If you have any questions, please contact our support team at support@durianosti
 
 Best regards,
 The Durianostics Team
-        """
+    """
 
-        html_content = f"""
+    html_content = f"""
 <!DOCTYPE html>
 <html>
 <head>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        .header {{
-            background-color: #1b5e20;
-            color: white;
-            padding: 20px;
-            text-align: center;
-            border-radius: 8px 8px 0 0;
-        }}
-        .content {{
-            background-color: #f9f9f9;
-            padding: 30px;
-            border: 1px solid #ddd;
-            border-top: none;
-            border-radius: 0 0 8px 8px;
-        }}
-        .success-box {{
-            background-color: #e8f5e9;
-            border-left: 4px solid #4caf50;
-            padding: 15px;
-            margin: 20px 0;
-            border-radius: 4px;
-        }}
-        .footer {{
-            margin-top: 20px;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            font-size: 12px;
-            color: #666;
-            text-align: center;
-        }}
-    </style>
+<style>
+    body {{
+        font-family: Arial, sans-serif;
+        line-height: 1.6;
+        color: #333;
+        max-width: 600px;
+        margin: 0 auto;
+        padding: 20px;
+    }}
+    .header {{
+        background-color: #1b5e20;
+        color: white;
+        padding: 20px;
+        text-align: center;
+        border-radius: 8px 8px 0 0;
+    }}
+    .content {{
+        background-color: #f9f9f9;
+        padding: 30px;
+        border: 1px solid #ddd;
+        border-top: none;
+        border-radius: 0 0 8px 8px;
+    }}
+    .success-box {{
+        background-color: #e8f5e9;
+        border-left: 4px solid #4caf50;
+        padding: 15px;
+        margin: 20px 0;
+        border-radius: 4px;
+    }}
+    .footer {{
+        margin-top: 20px;
+        padding-top: 20px;
+        border-top: 1px solid #ddd;
+        font-size: 12px;
+        color: #666;
+        text-align: center;
+    }}
+</style>
 </head>
 <body>
-    <div class="header">
-        <h1>🍈 Durianostics</h1>
+<div class="header">
+    <h1>🍈 Durianostics</h1>
+</div>
+<div class="content">
+    <p>Hello <strong>{user_name}</strong>,</p>
+    
+    <div class="success-box">
+        <p>✅ Great news! Your Durianostics account has been <strong>reactivated</strong>.</p>
     </div>
-    <div class="content">
-        <p>Hello <strong>{user_name}</strong>,</p>
-        
-        <div class="success-box">
-            <p>✅ Great news! Your Durianostics account has been <strong>reactivated</strong>.</p>
-        </div>
-        
-        <p>You can now log in and access all features of the platform.</p>
-        
-        <p>If you have any questions, please contact our support team at <a href="mailto:support@durianostics.com">support@durianostics.com</a>.</p>
-        
-        <p>Best regards,<br>
-        <strong>The Durianostics Team</strong></p>
-        
-        <div class="footer">
-            <p>&copy; 2026 Durianostics. All rights reserved.</p>
-        </div>
+    
+    <p>You can now log in and access all features of the platform.</p>
+    
+    <p>If you have any questions, please contact our support team at <a href="mailto:support@durianostics.com">support@durianostics.com</a>.</p>
+    
+    <p>Best regards,<br>
+    <strong>The Durianostics Team</strong></p>
+    
+    <div class="footer">
+        <p>&copy; 2026 Durianostics. All rights reserved.</p>
     </div>
+</div>
 </body>
 </html>
-        """
-
-        part1 = MIMEText(text_content, "plain")
-        part2 = MIMEText(html_content, "html")
-        msg.attach(part1)
-        msg.attach(part2)
-
-        with smtplib.SMTP(MAILTRAP_HOST, MAILTRAP_PORT) as server:
-            server.starttls()
-            server.login(MAILTRAP_USERNAME, MAILTRAP_PASSWORD)
-            server.sendmail(FROM_EMAIL, user_email, msg.as_string())
-        
-        print(f"Reactivation email sent successfully to {user_email}")
-        return True
-
-    except Exception as e:
-        print(f"Failed to send reactivation email to {user_email}: {str(e)}")
-        return False
+    """
+
+    part1 = MIMEText(text_content, "plain")
+    part2 = MIMEText(html_content, "html")
+    msg.attach(part1)
+    msg.attach(part2)
+    return msg
+
+
+# ---------------------------
+# Queue for delivery
+# ---------------------------
+
+def send_checkout_email(user_email: str, user_name: str, items, total, transaction_id, pdf_bytes,
+                        address=None, phone=None, payment_method=None) -> bool:
+    """Queue the order confirmation; True if it was stored for delivery."""
+    msg = build_checkout_message(
+        user_email, user_name, items, total, transaction_id, pdf_bytes,
+        address=address, phone=phone, payment_method=payment_method
+    )
+    return queue_email(msg, user_email, "checkout")
+
+
+def send_deactivation_email(user_email: str, user_name: str, reason: str) -> bool:
+    return queue_email(build_deactivation_message(user_email, user_name, reason), user_email, "deactivation")
+
+
+def send_reactivation_email(user_email: str, user_name: str) -> bool:
+    return queue_email(build_reactivation_message(user_email, user_name), user_email, "reactivation")
+
+
+def queue_account_emails(action: str, users, reason: str = None) -> int:
+    """Queue (de)activation emails for many users in one insert. Returns how many were queued."""
+    items = []
+    for user in users:
+        if not user.get("email"):
+            continue
+        if action == "deactivate":
+            msg, kind = build_deactivation_message(user["email"], user.get("name", "User"), reason), "deactivation"
+        else:
+            msg, kind = build_reactivation_message(user["email"], user.get("name", "User")), "reactivation"
+        items.append((msg, user["email"], kind))
+    return queue_emails(items)
@@ -0,0 +1,253 @@
+# backend/authapi/handlers/outbox.py
+"""
+Background email delivery
+
+queue_email() stores a message in the outbox (db/outbox.py) and returns
+immediately. OUTBOX_WORKERS threads per web worker deliver it, each over
+its own persistent SMTP connection: STARTTLS and login happen once per
+connection, not once per message. A connection idle for longer than
+SMTP_IDLE_SECONDS is closed, and a dropped one is reopened on the next
+message.
+
+Failed sends are retried with exponential backoff (OUTBOX_BACKOFF_SECONDS,
+doubling up to OUTBOX_BACKOFF_MAX_SECONDS, with jitter). After
+OUTBOX_MAX_ATTEMPTS, or straight away on a permanent 5xx rejection, a
+message goes to the dead-letter list (GET /admin/outbox).
+
+For local development, point it at a debugging server that prints mail
+instead of sending it:
+
+    python -m aiosmtpd -n -l localhost:1025
+    MAIL_HOST=localhost MAIL_PORT=1025 MAIL_USE_TLS=0 MAIL_USERNAME= python app.py
+
+    python -m handlers.outbox --work      # deliver without the web app
+    python -m handlers.outbox --dead      # list dead letters
+    python -m handlers.outbox --retry     # requeue all dead letters
+"""
+
+import argparse
+import os
+import random
+import smtplib
+import socket
+import threading
+import time
+from email.message import Message
+from typing import Any, Dict, List, Optional, Tuple
+
+from db.outbox import (
+    enqueue_messages, claim_next, mark_sent, mark_retry, mark_dead,
+    list_messages, requeue_dead, outbox_stats
+)
+
+SMTP_HOST = os.getenv("MAIL_HOST", "sandbox.smtp.mailtrap.io")
+SMTP_PORT = int(os.getenv("MAIL_PORT", "2525"))
+SMTP_USERNAME = os.getenv("MAIL_USERNAME", "")
+SMTP_PASSWORD = os.getenv("MAIL_PASSWORD", "")
+SMTP_USE_TLS = os.getenv("MAIL_USE_TLS", "1").lower() in ("1", "true", "yes")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 10))
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", 60))
+MAIL_FROM_ADDRESS = os.getenv("MAIL_FROM_ADDRESS", "noreply@durianostics.com")
+
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "1") == "1"
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 2))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 5))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 6))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", 30))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", 3600))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", 120))
+
+
+# ---------------------------
+# SMTP connection
+# ---------------------------
+
+class SMTPConnection:
+    """One authenticated SMTP session, reopened when it drops or idles out."""
+
+    def __init__(self):
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _open(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_USE_TLS:
+            smtp.starttls()
+        if SMTP_USERNAME:
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+        return smtp
+
+    def send(self, sender: str, to: List[str], raw: str):
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self.close()  # the server has likely timed us out already
+        for attempt in (1, 2):
+            if self._smtp is None:
+                self._smtp = self._open()
+            try:
+                self._smtp.sendmail(sender, to, raw.encode("utf-8"))
+                self._last_used = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+                # Stale keep-alive connection: reconnect once before failing the attempt
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def close_if_idle(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self.close()
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+
+# ---------------------------
+# Delivery
+# ---------------------------
+
+def _is_permanent(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return error.smtp_code >= 500
+    return False
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), OUTBOX_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def deliver(message: Dict[str, Any], connection: SMTPConnection) -> bool:
+    """Send one claimed message and record the outcome. True if sent."""
+    try:
+        connection.send(message["sender"], message["to"], message["raw"])
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        if _is_permanent(e) or message["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+            print(f"[MAIL] Giving up on {message['kind']} email to {', '.join(message['to'])}: {error}")
+            mark_dead(message["_id"], error)
+        else:
+            delay = backoff_seconds(message["attempts"])
+            print(f"[MAIL] {message['kind']} email to {', '.join(message['to'])} failed, retrying in {delay:.0f}s: {error}")
+            mark_retry(message["_id"], error, delay)
+        return False
+    mark_sent(message["_id"])
+    print(f"[MAIL] Sent {message['kind']} email to {', '.join(message['to'])}")
+    return True
+
+
+def drain(connection: SMTPConnection, worker: str, limit: Optional[int] = None) -> int:
+    """Deliver due messages until none are left (or limit). Returns how many were tried."""
+    tried = 0
+    while limit is None or tried < limit:
+        message = claim_next(worker, OUTBOX_LEASE_SECONDS)
+        if message is None:
+            break
+        deliver(message, connection)
+        tried += 1
+    return tried
+
+
+# ---------------------------
+# Workers
+# ---------------------------
+_wakeup = threading.Event()
+_workers_pid = None
+_workers_lock = threading.Lock()
+
+
+def _run(worker: str):
+    connection = SMTPConnection()
+    while True:
+        _wakeup.wait(OUTBOX_POLL_SECONDS)
+        _wakeup.clear()
+        try:
+            if drain(connection, worker) == 0:
+                connection.close_if_idle()
+        except Exception as e:
+            # e.g. MongoDB unavailable; messages stay in the outbox
+            print(f"[MAIL] Outbox worker error: {e}")
+            connection.close()
+
+
+def start_outbox_workers():
+    """Start this process's delivery threads (threads do not survive fork)."""
+    global _workers_pid
+    if not OUTBOX_ENABLED:
+        return
+    pid = os.getpid()
+    with _workers_lock:
+        if _workers_pid == pid:
+            return
+        for n in range(max(1, OUTBOX_WORKERS)):
+            name = f"outbox-{pid}-{n}"
+            threading.Thread(target=_run, args=(name,), name=name, daemon=True).start()
+        _workers_pid = pid
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+
+def queue_emails(items: List[Tuple[Message, str, str]]) -> int:
+    """Queue (message, recipient, kind) items for delivery. Returns how many were stored."""
+    if not items:
+        return 0
+    ids = enqueue_messages([
+        {
+            "kind": kind,
+            "sender": MAIL_FROM_ADDRESS,
+            "to": [recipient],
+            "subject": str(msg["Subject"]),
+            "raw": msg.as_string()
+        }
+        for msg, recipient, kind in items
+    ])
+    _wakeup.set()
+    return len(ids)
+
+
+def queue_email(msg: Message, recipient: str, kind: str) -> bool:
+    """Queue one message; False if it could not be stored."""
+    try:
+        return queue_emails([(msg, recipient, kind)]) == 1
+    except Exception as e:
+        print(f"[MAIL] Could not queue {kind} email to {recipient}: {e}")
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Email outbox tools")
+    parser.add_argument("--work", action="store_true", help="deliver queued mail until interrupted")
+    parser.add_argument("--dead", action="store_true", help="list dead letters")
+    parser.add_argument("--retry", action="store_true", help="requeue all dead letters")
+    args = parser.parse_args(argv)
+
+    if args.retry:
+        print(f"[MAIL] Requeued {requeue_dead()} dead letters")
+    if args.dead:
+        for message in list_messages("dead", limit=100):
+            print(f"  {message['_id']}  {message['kind']:<14} {', '.join(message['to']):<32} {message.get('last_error', '')}")
+    if args.work:
+        connection = SMTPConnection()
+        print(f"[MAIL] Delivering to {SMTP_HOST}:{SMTP_PORT} (Ctrl+C to stop)")
+        try:
+            while True:
+                if drain(connection, f"cli-{os.getpid()}") == 0:
+                    connection.close_if_idle()
+                    time.sleep(OUTBOX_POLL_SECONDS)
+        except KeyboardInterrupt:
+            connection.close()
+    print(f"[MAIL] Outbox: {outbox_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+# backend/authapi/importprofile.py
+"""
+Import-time profiling
+
+Imports a module in a fresh interpreter under ``python -X importtime`` and
+reports where the time went, so heavy dependencies that sneak into a
+worker's startup path are easy to spot:
+
+    python -m importprofile                 # the whole app (app.py)
+    python -m importprofile routes.scanner_routes --top 15
+    python -m importprofile app --fail-over 1500
+
+Packages are ranked by the total self time of all their modules, and
+single modules by cumulative time (themselves plus what they pulled in).
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for every import, in order."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [HERE, os.path.dirname(HERE), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise RuntimeError(f"import {module} failed: {tail[0]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def summarize(rows: List[Tuple[str, int, int, int]]) -> Dict[str, object]:
+    packages: Dict[str, int] = defaultdict(int)
+    counts: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        root = name.split(".")[0]
+        packages[root] += self_us
+        counts[root] += 1
+    return {
+        "total_us": sum(self_us for _, self_us, _, _ in rows),
+        "modules": len(rows),
+        "packages": sorted(((p, us, counts[p]) for p, us in packages.items()), key=lambda p: -p[1]),
+        "slowest": sorted(rows, key=lambda r: -r[2]),
+    }
+
+
+def report(module: str, top: int) -> int:
+    summary = summarize(measure(module))
+    total_ms = summary["total_us"] / 1000
+    print(f"[PROFILE] import {module}: {total_ms:.0f} ms across {summary['modules']} modules\n")
+
+    print(f"{'package':<28} {'self ms':>9} {'share':>6} {'modules':>8}")
+    for name, us, count in summary["packages"][:top]:
+        print(f"{name:<28} {us / 1000:>9.1f} {us / summary['total_us']:>6.0%} {count:>8}")
+
+    print(f"\n{'module (cumulative)':<48} {'ms':>9}")
+    for name, _, cumulative_us, depth in summary["slowest"][:top]:
+        print(f"{'  ' * min(depth, 4) + name:<48} {cumulative_us / 1000:>9.1f}")
+    return int(total_ms)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile import time with python -X importtime")
+    parser.add_argument("module", nargs="?", default="app", help="Module to import (default: app)")
+    parser.add_argument("--top", type=int, default=20, help="Rows to show per table")
+    parser.add_argument("--fail-over", type=float, help="Exit non-zero if the import takes longer (ms)")
+    args = parser.parse_args(argv)
+
+    total_ms = report(args.module, args.top)
+    if args.fail_over is not None and total_ms > args.fail_over:
+        print(f"\n[PROFILE] {total_ms} ms is over the {args.fail_over:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
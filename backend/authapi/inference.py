@@ -0,0 +1,178 @@
+# backend/authapi/inference.py
+"""
+Inference client
+
+The scanner routes call the models through infer(), which runs them in one
+of two places:
+
+- in this process, on the native inference pool (the default, and what a
+  single-node deployment or `python app.py` uses),
+- on a separate inference service when INFERENCE_URL is set, e.g.
+  http://127.0.0.1:8100 for a service started next to the scanner tier
+  with APP_ROLES=inference. Requests go through one keep-alive session per
+  worker process, so scans reuse pooled connections instead of opening one
+  per call.
+
+Either way the result is the dict the ai/ functions return; transport
+errors come back as {"success": False, ...} like any model error. The ai/
+modules (and torch) are only imported where the models actually run.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from concurrency import run_inference
+
+INFERENCE_URL = os.getenv("INFERENCE_URL", "").rstrip("/")
+INFERENCE_TOKEN = os.getenv("INFERENCE_TOKEN")
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", 60))
+INFERENCE_CONNECT_TIMEOUT = float(os.getenv("INFERENCE_CONNECT_TIMEOUT", 3))
+INFERENCE_POOL_SIZE = int(os.getenv("INFERENCE_POOL_SIZE", 10))
+
+TOKEN_HEADER = "X-Inference-Token"
+EXT_HEADER = "X-Image-Ext"
+
+
+# ---------------------------
+# Local models
+# ---------------------------
+
+def _detect(image_path: str) -> Dict[str, Any]:
+    from ai.yolo_detector import get_yolo_detector
+    return get_yolo_detector().predict(image_path)
+
+
+def _color(image_path: str) -> Dict[str, Any]:
+    from ai.durian_color import get_durian_color
+    return get_durian_color(image_path)
+
+
+def _shape(image_path: str) -> Dict[str, Any]:
+    from ai.durian_shape import get_durian_shape
+    return get_durian_shape(image_path)
+
+
+def _size(image_path: str) -> Dict[str, Any]:
+    from ai.durian_size import get_durian_size
+    return get_durian_size(image_path)
+
+
+def _disease(image_path: str) -> Dict[str, Any]:
+    from ai.durian_desease import get_durian_disease
+    return get_durian_disease(image_path)
+
+
+def _scan(image_path: str) -> Dict[str, Any]:
+    """Detection plus color, shape and size: everything /scanner/detect shows."""
+    result = _detect(image_path)
+    result["color"] = _color(image_path)
+    result["shape"] = _shape(image_path)
+    result["size"] = _size(image_path)
+    return result
+
+
+TASKS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "scan": _scan,
+    "detect": _detect,
+    "color": _color,
+    "shape": _shape,
+    "size": _size,
+    "disease": _disease,
+}
+
+
+def run_task(task: str, image_path: str) -> Dict[str, Any]:
+    """Run a task on this process's models (blocking; use the inference pool)."""
+    if task not in TASKS:
+        raise ValueError(f"Unknown inference task: {task}")
+    return TASKS[task](image_path)
+
+
+def local_status() -> Dict[str, Any]:
+    from ai.yolo_detector import get_yolo_detector
+    detector = get_yolo_detector()
+    return {
+        "model": str(detector.model_path.name) if detector.model_path else None,
+        "available": detector.available,
+        "connection_test": detector.test_connection()
+    }
+
+
+# ---------------------------
+# Pooled HTTP session
+# ---------------------------
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Keep-alive session to the inference service, one per worker process."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session_pid != pid:
+        with _session_lock:
+            if _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=INFERENCE_POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                if INFERENCE_TOKEN:
+                    session.headers[TOKEN_HEADER] = INFERENCE_TOKEN
+                _session, _session_pid = session, pid
+    return _session
+
+
+def _unavailable(e: Exception) -> Dict[str, Any]:
+    print(f"[INFERENCE] Service error: {e}")
+    return {"success": False, "error": "InferenceUnavailable", "message": str(e)}
+
+
+def _remote(task: str, image_path: str) -> Dict[str, Any]:
+    ext = os.path.splitext(image_path)[1].lstrip(".")
+    with open(image_path, "rb") as f:
+        image = f.read()
+    try:
+        response = get_session().post(
+            f"{INFERENCE_URL}/infer/{task}",
+            data=image,
+            headers={"Content-Type": "application/octet-stream", EXT_HEADER: ext},
+            timeout=(INFERENCE_CONNECT_TIMEOUT, INFERENCE_TIMEOUT)
+        )
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        return _unavailable(e)
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+
+def is_remote() -> bool:
+    return bool(INFERENCE_URL)
+
+
+def infer(task: str, image_path: str) -> Dict[str, Any]:
+    """Run an inference task on the image at image_path, wherever the models live."""
+    if INFERENCE_URL:
+        return _remote(task, image_path)
+    return run_inference(run_task, task, image_path)
+
+
+def status() -> Dict[str, Any]:
+    """Model availability, from the inference service when one is configured."""
+    if not INFERENCE_URL:
+        return local_status()
+    try:
+        response = get_session().get(
+            f"{INFERENCE_URL}/infer/health",
+            timeout=(INFERENCE_CONNECT_TIMEOUT, INFERENCE_CONNECT_TIMEOUT)
+        )
+        return response.json()
+    except (requests.RequestException, ValueError) as e:
+        result = _unavailable(e)
+        return {"model": None, "available": False, "connection_test": result}
@@ -0,0 +1,173 @@
+# backend/authapi/passwords.py
+"""
+Password hashing
+
+argon2 runs in a dedicated, bounded pool of OS threads instead of the
+request thread or greenlet. argon2-cffi releases the GIL while hashing, so
+PASSWORD_HASH_WORKERS hashes run in parallel while the rest of the worker
+keeps serving requests. At most PASSWORD_HASH_QUEUE_MAX hashes may wait for
+a pool thread. Past that, HashingBusy is raised instead of letting a login
+burst pile up.
+
+Cost parameters are explicit and set through the environment. Measure them
+on the target hardware with:
+
+    python -m passwords --benchmark
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from concurrency import NativePool
+
+# ---------------------------
+# Settings
+# ---------------------------
+# Defaults follow the OWASP argon2id baseline (19 MiB, 2 passes, 1 lane)
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 2))
+ARGON2_MEMORY_COST_KIB = int(os.getenv("ARGON2_MEMORY_COST_KIB", 19456))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 1))
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_MAX = int(os.getenv("PASSWORD_HASH_QUEUE_MAX", 32))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", 10))
+
+
+def build_context(time_cost: int, memory_cost: int, parallelism: int) -> CryptContext:
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+
+
+pwd_context = build_context(ARGON2_TIME_COST, ARGON2_MEMORY_COST_KIB, ARGON2_PARALLELISM)
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+# ---------------------------
+# Executor
+# ---------------------------
+
+class HashingPool:
+    """Native thread pool with a bounded number of in-flight hashing jobs."""
+
+    def __init__(self, workers: int, queue_max: int, timeout: float):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, queue_max))
+        self._pool = NativePool(self.workers, "pwd-hash")
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusy("Password hashing queue is full")
+        try:
+            return self._pool.run(fn, *args)
+        finally:
+            self._slots.release()
+
+
+hashing_pool = HashingPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_MAX, PASSWORD_HASH_TIMEOUT_SECONDS)
+
+
+# ---------------------------
+# Public helpers
+# ---------------------------
+
+def hash_password(password: str) -> str:
+    return hashing_pool.run(pwd_context.hash, password)
+
+
+def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return (valid, new_hash).
+
+    new_hash is set when the stored hash uses outdated parameters or a
+    deprecated scheme, or is a legacy plaintext value, and should replace it.
+    """
+    try:
+        return hashing_pool.run(pwd_context.verify_and_update, password, hashed)
+    except HashingBusy:
+        raise
+    except Exception:
+        # Legacy accounts stored before hashing was introduced
+        if password == hashed:
+            return True, hash_password(password)
+        return False, None
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return verify_and_update(password, hashed)[0]
+
+
+# ---------------------------
+# Benchmark
+# ---------------------------
+
+BENCHMARK_SETTINGS = [
+    # (time_cost, memory_cost KiB, parallelism)
+    (2, 19456, 1),
+    (3, 12288, 1),
+    (2, 47104, 1),
+    (1, 65536, 1),
+    (3, 65536, 4),
+]
+
+
+def benchmark(settings, seconds: float, workers: int):
+    print(f"{'time':>4} {'memory':>9} {'lanes':>5} {'ms/hash':>8} {'hash/s':>7} {'hash/s x' + str(workers):>11}")
+    for time_cost, memory_cost, parallelism in settings:
+        context = build_context(time_cost, memory_cost, parallelism)
+        context.hash("warmup")
+
+        count, start = 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            context.hash("benchmark-password")
+            count += 1
+        single = count / (time.perf_counter() - start)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = max(workers, int(single * seconds))
+            start = time.perf_counter()
+            list(pool.map(context.hash, ["benchmark-password"] * jobs))
+            pooled = jobs / (time.perf_counter() - start)
+
+        print(f"{time_cost:>4} {memory_cost:>6}KiB {parallelism:>5} {1000 / single:>8.1f} {single:>7.1f} {pooled:>11.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Password hashing utilities")
+    parser.add_argument("--benchmark", action="store_true", help="Report argon2 hashes/second per setting")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time spent per setting")
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS, help="Concurrent hashes for the pooled column")
+    parser.add_argument("--time-cost", type=int, help="Benchmark only this time cost")
+    parser.add_argument("--memory-cost", type=int, help="Benchmark only this memory cost (KiB)")
+    parser.add_argument("--parallelism", type=int, default=1, help="Lanes for --time-cost/--memory-cost")
+    args = parser.parse_args(argv)
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    settings = BENCHMARK_SETTINGS
+    if args.time_cost or args.memory_cost:
+        settings = [(args.time_cost or ARGON2_TIME_COST, args.memory_cost or ARGON2_MEMORY_COST_KIB, args.parallelism)]
+    print(f"[AUTH] Current: time_cost={ARGON2_TIME_COST} memory_cost={ARGON2_MEMORY_COST_KIB}KiB "
+          f"parallelism={ARGON2_PARALLELISM} workers={PASSWORD_HASH_WORKERS}")
+    benchmark(settings, args.seconds, args.workers)
+
+
+if __name__ == "__main__":
+    main()
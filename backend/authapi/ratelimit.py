@@ -0,0 +1,221 @@
+# backend/authapi/ratelimit.py
+"""
+Token-bucket rate limiting
+
+Each limited endpoint has a bucket per client IP and, where the request
+names one, a bucket per account (login email, scanner user id). A rejected
+request costs one dictionary lookup: no password hashing, no MongoDB and no
+model inference. Rejections get a 429 with a Retry-After header.
+
+Limits are "<requests>/<period>" strings, e.g. "10/minute", overridable per
+endpoint through RATE_LIMIT_<NAME>_IP and RATE_LIMIT_<NAME>_ACCOUNT.
+
+By default buckets live in process memory, so each worker enforces the
+limit on its own. With RATE_LIMIT_STORAGE=sqlite:///path/to/file.db all
+worker processes on the host share buckets through a local SQLite file.
+Either way storage stays bounded: memory keeps at most RATE_LIMIT_MAX_KEYS
+buckets (least recently used evicted first), and SQLite deletes idle ones
+every RATE_LIMIT_PRUNE_SECONDS.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from flask import request, jsonify
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STORAGE = os.getenv("RATE_LIMIT_STORAGE", "memory")
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+RATE_LIMIT_PRUNE_SECONDS = float(os.getenv("RATE_LIMIT_PRUNE_SECONDS", 300))
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+DEFAULT_LIMITS = {
+    "login": {"ip": "20/minute", "account": "5/minute"},
+    "signup": {"ip": "5/minute", "account": None},
+    "detect": {"ip": "30/minute", "account": "20/minute"},
+}
+
+
+def parse_limit(value: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Parse "N/period" into (capacity, tokens per second). None/"" disables."""
+    if not value:
+        return None
+    count, _, period = value.partition("/")
+    period = period.strip()
+    seconds = float(period) if period.isdigit() else PERIODS.get(period.rstrip("s"))
+    if not seconds:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    capacity = float(count)
+    return capacity, capacity / seconds
+
+
+LIMITS = {
+    name: {
+        scope: parse_limit(os.getenv(f"RATE_LIMIT_{name.upper()}_{scope.upper()}", default))
+        for scope, default in scopes.items()
+    }
+    for name, scopes in DEFAULT_LIMITS.items()
+}
+
+# A bucket untouched for this long has refilled completely, so it can be dropped
+IDLE_SECONDS = max(
+    (limit[0] / limit[1] for scopes in LIMITS.values() for limit in scopes.values() if limit),
+    default=3600
+)
+
+
+# ---------------------------
+# Storage backends
+# ---------------------------
+
+class MemoryStore:
+    """Per-process buckets: key -> (tokens, last refill timestamp), in LRU order."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until one is available."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens, last = capacity, now
+                # A spray of new keys evicts the least recently used buckets
+                while len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                tokens, last = bucket
+                self._buckets.move_to_end(key)
+            tokens = min(capacity, tokens + (now - last) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+
+class SQLiteStore:
+    """Buckets shared by all processes on one host through a SQLite file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._next_prune = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, last REAL)"
+            )
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def consume(self, key: str, capacity: float, rate: float, now: float) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, last FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, last = row if row else (capacity, now)
+            tokens = min(capacity, tokens + (now - last) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, last) VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if now >= self._next_prune:
+            self._next_prune = now + RATE_LIMIT_PRUNE_SECONDS
+            self._prune(conn, now)
+        return wait
+
+    def _prune(self, conn: sqlite3.Connection, now: float):
+        try:
+            conn.execute("DELETE FROM buckets WHERE last < ?", (now - IDLE_SECONDS,))
+        except sqlite3.Error as e:
+            print(f"[RATE] Could not prune buckets: {e}")
+
+
+def _build_store():
+    if RATE_LIMIT_STORAGE.startswith("sqlite:///"):
+        return SQLiteStore(RATE_LIMIT_STORAGE[len("sqlite:///"):])
+    return MemoryStore(RATE_LIMIT_MAX_KEYS)
+
+
+store = _build_store()
+
+
+# ---------------------------
+# Request keys
+# ---------------------------
+
+def client_ip() -> str:
+    if RATE_LIMIT_TRUST_PROXY and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or "unknown"
+
+
+def login_account() -> Optional[str]:
+    data = request.get_json(silent=True) or {}
+    email = data.get("email")
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def scanner_account() -> Optional[str]:
+    return request.headers.get("X-User-Id") or request.args.get("user_id")
+
+
+# ---------------------------
+# Decorator
+# ---------------------------
+
+def check_limit(name: str, scope: str, key: str) -> float:
+    limit = LIMITS[name][scope]
+    if limit is None:
+        return 0.0
+    capacity, rate = limit
+    try:
+        return store.consume(f"{name}:{scope}:{key}", capacity, rate, time.time())
+    except Exception as e:
+        # Never fail a request because the limiter storage is unavailable
+        print(f"[RATE] Storage error, allowing request: {e}")
+        return 0.0
+
+
+def rate_limit(name: str, account_key: Callable[[], Optional[str]] = None):
+    """Apply the ``name`` limits per client IP and, optionally, per account."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED or request.method == "OPTIONS":
+                return f(*args, **kwargs)
+
+            wait = check_limit(name, "ip", client_ip())
+            if not wait and account_key is not None:
+                account = account_key()
+                if account:
+                    wait = check_limit(name, "account", account)
+            if wait:
+                print(f"[RATE] {name} limited for {client_ip()}, retry in {wait:.1f}s")
+                response = jsonify({"success": False, "error": "Too many requests, please slow down"})
+                response.headers["Retry-After"] = str(max(1, math.ceil(wait)))
+                return response, 429
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
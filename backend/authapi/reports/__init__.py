@@ -0,0 +1 @@
+# Reports module - PDF rendering (render) and the background job queue (jobs)
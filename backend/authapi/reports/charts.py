@@ -0,0 +1,231 @@
+# backend/authapi/reports/charts.py
+"""
+Report charts
+
+Figures are drawn with matplotlib's object-oriented API on an Agg canvas,
+never through pyplot, whose global "current figure" state is not safe
+under threaded workers. Each thread keeps one Figure per size and clears
+it between charts instead of building a new one per request. Fonts and
+colours are created once at import.
+
+Rendered charts are cached by a hash of the data they show, so repeated
+reports with the same numbers skip drawing altogether. Output is PNG by
+default; "svg" gives vector charts for the FPDF renderer.
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.patches import Circle
+
+from db.cache import TTLCache
+
+CHART_DPI = int(os.getenv("CHART_DPI", 120))
+CHART_CACHE_TTL_SECONDS = float(os.getenv("CHART_CACHE_TTL_SECONDS", 3600))
+CHART_CACHE_MAXSIZE = int(os.getenv("CHART_CACHE_MAXSIZE", 256))
+FORMATS = ("png", "svg")
+
+BAR_COLORS = ['#27AE60', '#2ecc71', '#1abc9c', '#16a085', '#3498db', '#9b59b6', '#e67e22']
+QUALITY_COLORS = ['#27AE60', '#2ecc71', '#f1c40f', '#e74c3c', '#3498db']
+SUCCESS_COLORS = ['#10B981', '#EF4444']
+LINE_COLOR = '#e67e22'
+FILL_COLOR = '#f9e79f'
+
+TITLE_FONT = FontProperties(size=13, weight='bold')
+LABEL_FONT = FontProperties(size=10)
+
+WIDE = (8, 3)
+SQUARE = (5, 4)
+
+_local = threading.local()
+_cache = TTLCache(ttl=CHART_CACHE_TTL_SECONDS, maxsize=CHART_CACHE_MAXSIZE)
+
+
+# ---------------------------
+# Canvas
+# ---------------------------
+
+def _figure(size) -> Figure:
+    """This thread's Figure for a size, cleared and ready to draw on."""
+    figures = getattr(_local, "figures", None)
+    if figures is None:
+        figures = _local.figures = {}
+    fig = figures.get(size)
+    if fig is None:
+        fig = Figure(figsize=size)
+        FigureCanvasAgg(fig)
+        figures[size] = fig
+    else:
+        fig.clear()
+    return fig
+
+
+# No creation date or tool info, so identical data gives identical bytes
+_SVG_METADATA = {'Date': None, 'Creator': None, 'Format': None, 'Type': None}
+
+
+def _encode(fig: Figure, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    metadata = _SVG_METADATA if fmt == "svg" else None
+    fig.savefig(buf, format=fmt, dpi=CHART_DPI, bbox_inches='tight', metadata=metadata)
+    return buf.getvalue()
+
+
+def _cached(name: str, payload: Any, fmt: str, draw: Callable[[Figure], None], size) -> Optional[bytes]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    raw = json.dumps([name, fmt, CHART_DPI, payload], sort_keys=True, default=str)
+    key = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    chart = _cache.get(key)
+    if chart is not None:
+        return chart
+    try:
+        fig = _figure(size)
+        draw(fig)
+        fig.tight_layout()
+        chart = _encode(fig, fmt)
+    except Exception as e:
+        print(f"[REPORTS] {name} chart error: {e}")
+        return None
+    _cache.set(key, chart)
+    return chart
+
+
+def _style_bars(ax):
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+
+
+def _donut(ax, sizes: List[float], labels: List[str], colors: List[str], title: str):
+    ax.pie(
+        sizes,
+        labels=labels,
+        autopct=lambda p: f'{p:.1f}%' if p > 0 else '',
+        startangle=140,
+        colors=colors,
+        pctdistance=0.8
+    )
+    ax.add_artist(Circle((0, 0), 0.65, fc='white'))
+    ax.set_title(title, fontproperties=TITLE_FONT)
+    ax.axis('equal')
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return None
+
+
+# ---------------------------
+# User report
+# ---------------------------
+
+def weekly_chart(weekly_data: List[Dict[str, Any]], fmt: str = "png") -> Optional[bytes]:
+    """Scans per day, one coloured bar per day."""
+    if not weekly_data:
+        return None
+    dates = [str(d.get('date', ''))[-5:] for d in weekly_data]
+    counts = [d.get('scans', 0) for d in weekly_data]
+
+    def draw(fig):
+        ax = fig.add_subplot()
+        ax.bar(dates, counts, color=[BAR_COLORS[i % len(BAR_COLORS)] for i in range(len(counts))])
+        ax.set_title('Scan Activity Trends', fontproperties=TITLE_FONT)
+        ax.set_ylabel('Number of Scans', fontproperties=LABEL_FONT)
+        ax.set_xlabel('Date', fontproperties=LABEL_FONT)
+        _style_bars(ax)
+        ax.tick_params(axis='x', labelrotation=45)
+
+    return _cached("weekly", [dates, counts], fmt, draw, WIDE)
+
+
+def quality_chart(quality_distribution: List[Dict[str, Any]], fmt: str = "png") -> Optional[bytes]:
+    """Donut of scans per quality range."""
+    if not quality_distribution or sum(d.get('count', 0) for d in quality_distribution) == 0:
+        return None
+    labels = [d.get('range', '') for d in quality_distribution]
+    sizes = [d.get('count', 0) for d in quality_distribution]
+
+    def draw(fig):
+        _donut(fig.add_subplot(), sizes, labels, QUALITY_COLORS, 'Quality Distribution')
+
+    return _cached("quality", [labels, sizes], fmt, draw, SQUARE)
+
+
+def recent_scan_chart(recent_scans: List[Dict[str, Any]], fmt: str = "png") -> Optional[bytes]:
+    """Quality of the most recent scans, oldest first."""
+    points = []
+    for scan in recent_scans or []:
+        when = _as_datetime(scan.get('date') or scan.get('created_at'))
+        if when is not None and scan.get('quality') is not None:
+            points.append((when, scan['quality']))
+    if not points:
+        return None
+    points.sort(key=lambda p: p[0])
+    labels = [when.strftime('%b %d') for when, _ in points]
+    qualities = [quality for _, quality in points]
+
+    def draw(fig):
+        ax = fig.add_subplot()
+        ax.plot(labels, qualities, marker='o', linewidth=2.5, color=LINE_COLOR)
+        ax.fill_between(labels, qualities, color=FILL_COLOR, alpha=0.3)
+        ax.set_title('Recent Scan Quality Trend', fontproperties=TITLE_FONT)
+        ax.set_xlabel('Date', fontproperties=LABEL_FONT)
+        ax.set_ylabel('Quality Score', fontproperties=LABEL_FONT)
+        ax.grid(True, linestyle='--', alpha=0.4)
+        ax.tick_params(axis='x', labelrotation=45)
+
+    return _cached("recent", [labels, qualities], fmt, draw, WIDE)
+
+
+# ---------------------------
+# Admin report
+# ---------------------------
+
+def admin_weekly_chart(daily_scans: List[Dict[str, Any]], fmt: str = "png") -> Optional[bytes]:
+    if not daily_scans:
+        return None
+    days = [d.get('day', '') for d in daily_scans]
+    counts = [d.get('scans', 0) for d in daily_scans]
+
+    def draw(fig):
+        ax = fig.add_subplot()
+        ax.bar(days, counts, color=[BAR_COLORS[i % len(BAR_COLORS)] for i in range(len(counts))])
+        ax.set_title('Weekly Scan Activity', fontproperties=TITLE_FONT)
+        ax.set_ylabel('Scans', fontproperties=LABEL_FONT)
+        ax.set_xlabel('Day', fontproperties=LABEL_FONT)
+        _style_bars(ax)
+
+    return _cached("admin_weekly", [days, counts], fmt, draw, WIDE)
+
+
+def success_chart(breakdown: Optional[Dict[str, Any]], fmt: str = "png") -> Optional[bytes]:
+    """Donut of successful vs rejected scans."""
+    if not breakdown:
+        return None
+    sizes = [breakdown.get('successful', 0), breakdown.get('rejected', 0)]
+    if sum(sizes) == 0:
+        return None
+
+    def draw(fig):
+        _donut(fig.add_subplot(), sizes, ['Successful', 'Rejected'], SUCCESS_COLORS, 'Scan Success Breakdown')
+
+    return _cached("success", sizes, fmt, draw, SQUARE)
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
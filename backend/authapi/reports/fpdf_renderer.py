@@ -0,0 +1,255 @@
+# backend/authapi/reports/fpdf_renderer.py
+"""
+Native PDF layouts for the analytics reports
+
+Draws the same pages as durian_report_template.html and
+gen_admin_analytics_template.html directly with FPDF, so a report is built
+in-process without HTML or a wkhtmltopdf subprocess. Charts are passed in
+as PNG (or, on fpdf2, SVG) bytes and embedded as-is.
+
+Written against fpdf2; the legacy PyFPDF 1.7 API (still used for receipts
+on older installs) works too, with images going through a temporary file.
+"""
+
+import io
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+from fpdf import FPDF, FPDF_VERSION
+
+FPDF2 = int(FPDF_VERSION.split(".")[0]) >= 2
+
+GREEN = "#27AE60"
+TEXT = "#2c3e50"
+MUTED = "#555555"
+FOOTER = "#888888"
+ROW_FILL = "#f2fbf6"
+ROW_BORDER = "#d4f5e1"
+CARD_FILL = "#f5f5f5"
+CARD_BORDER = "#cccccc"
+
+PAGE_MARGIN = 15
+
+
+def _rgb(color: str):
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def _text(value: Any) -> str:
+    """Core PDF fonts are latin-1 only."""
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+def pdf_bytes(pdf: FPDF) -> bytes:
+    if FPDF2:
+        return bytes(pdf.output())
+    return pdf.output(dest="S").encode("latin1")
+
+
+class ReportPDF(FPDF):
+    """A4 document with the report's title, card, table and chart blocks."""
+
+    def __init__(self, footer_text: Optional[str] = None):
+        super().__init__(orientation="P", unit="mm", format="A4")
+        self.footer_text = footer_text
+        self.set_margins(PAGE_MARGIN, PAGE_MARGIN, PAGE_MARGIN)
+        self.set_auto_page_break(True, margin=PAGE_MARGIN + 5)
+        self.content_width = self.w - 2 * PAGE_MARGIN
+
+    def footer(self):
+        if not self.footer_text:
+            return
+        self.set_y(-PAGE_MARGIN)
+        self._use_font(8, color=FOOTER)
+        self.cell(0, 5, _text(f"{self.footer_text} - Page {self.page_no()}"), align="C")
+
+    # -- primitives --
+    def _use_font(self, size: float, style: str = "", color: str = TEXT):
+        self.set_font("helvetica", style, size)
+        self.set_text_color(*_rgb(color))
+
+    def line_of(self, text: str, size: float, style: str = "", color: str = TEXT, align: str = "L", height: float = None):
+        self._use_font(size, style, color)
+        self.cell(0, height or size * 0.5, _text(text), align=align)
+        self.ln(height or size * 0.5)
+
+    def page_title(self, text: str, subtitle: Optional[str] = None):
+        self.line_of(text, 20, "B", GREEN, "C", 11)
+        if subtitle:
+            self.line_of(subtitle, 10, "", MUTED, "C", 6)
+        self.ln(6)
+
+    def section_title(self, text: str, keep_with: float = 40):
+        """Section heading; starts a new page rather than orphan the heading."""
+        if self.get_y() + keep_with > self.page_break_trigger:
+            self.add_page()
+        self.ln(3)
+        self.line_of(text, 12, "B", TEXT, "L", 7)
+        self.set_draw_color(*_rgb(CARD_BORDER))
+        self.line(self.l_margin, self.get_y(), self.l_margin + self.content_width, self.get_y())
+        self.ln(3)
+
+    def chart(self, image: Optional[bytes], width_ratio: float = 0.9, missing: Optional[str] = None):
+        if not image:
+            if missing:
+                self.line_of(missing, 10, "", MUTED, "L", 6)
+            return
+        width = self.content_width * width_ratio
+        x = self.l_margin + (self.content_width - width) / 2
+        if FPDF2:
+            # SVG shapes without an explicit fill (matplotlib's black text)
+            # inherit the current colours
+            self.set_fill_color(0, 0, 0)
+            self.set_draw_color(0, 0, 0)
+            self.image(io.BytesIO(image), x=x, w=width)
+        else:
+            fd, path = tempfile.mkstemp(suffix=".png")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(image)
+                self.image(path, x=x, w=width)
+            finally:
+                os.remove(path)
+        self.ln(4)
+
+    def cards(self, items: Sequence[tuple], per_row: int, height: float, fill: str, accent: Optional[str] = None):
+        """(value, label) cards in a grid; the value is drawn large."""
+        gap = 4
+        width = (self.content_width - gap * (per_row - 1)) / per_row
+        for start in range(0, len(items), per_row):
+            if self.get_y() + height > self.page_break_trigger:
+                self.add_page()
+            y = self.get_y()
+            for i, (value, label) in enumerate(items[start:start + per_row]):
+                x = self.l_margin + i * (width + gap)
+                self.set_fill_color(*_rgb(fill))
+                self.set_draw_color(*_rgb(CARD_BORDER))
+                self.rect(x, y, width, height, "DF")
+                if accent:
+                    self.set_fill_color(*_rgb(accent))
+                    self.rect(x, y, width, 2, "F")
+                self.set_xy(x, y + height * 0.22)
+                self._use_font(16, "B")
+                self.cell(width, 9, _text(value), align="C")
+                self.set_xy(x, y + height * 0.22 + 10)
+                self._use_font(9, "", MUTED)
+                self.cell(width, 5, _text(label), align="C")
+            self.set_xy(self.l_margin, y + height + gap)
+
+    def data_table(self, headers: List[str], rows: List[List[Any]], row_height: float = 8):
+        width = self.content_width / len(headers)
+
+        def header():
+            self._use_font(10, "B", "#ffffff")
+            self.set_fill_color(*_rgb(GREEN))
+            self.set_draw_color(*_rgb(GREEN))
+            for text in headers:
+                self.cell(width, row_height, _text(text), border=1, align="C", fill=True)
+            self.ln(row_height)
+
+        header()
+        self.set_draw_color(*_rgb(ROW_BORDER))
+        for index, row in enumerate(rows):
+            if self.get_y() + row_height > self.page_break_trigger:
+                self.add_page()
+                header()
+                self.set_draw_color(*_rgb(ROW_BORDER))
+            self._use_font(9)
+            self.set_fill_color(*_rgb(ROW_FILL if index % 2 else "#ffffff"))
+            for value in row:
+                self.cell(width, row_height, _text(value), border=1, align="C", fill=True)
+            self.ln(row_height)
+        self.ln(4)
+
+
+# ---------------------------
+# Reports
+# ---------------------------
+
+def _stat_value(key: str, value: Any) -> str:
+    return f"{value}%" if key.endswith("_percent") or key == "weekly_growth" else str(value)
+
+
+def render_user_report(data: Dict[str, Any], charts: Dict[str, Optional[bytes]]) -> bytes:
+    """durian_report_template.html: key metrics, weekly activity, quality, recent scans."""
+    pdf = ReportPDF(footer_text="Confidential Durian Analytics Report")
+
+    pdf.add_page()
+    pdf.page_title("Key Metrics", "Summary of your durian scans")
+    stats = data.get("stats", {})
+    pdf.cards(
+        [(_stat_value(k, v), k.replace("_", " ").title()) for k, v in stats.items()],
+        per_row=3, height=30, fill="#ffffff", accent=GREEN
+    )
+
+    pdf.add_page()
+    pdf.page_title("Weekly Activity", "Number of scans per day")
+    pdf.chart(charts.get("weekly_chart"))
+    if data.get("weekly_data"):
+        pdf.data_table(
+            ["Date", "Day", "Scans", "Avg Quality"],
+            [[d.get("date"), d.get("day"), d.get("scans"), d.get("quality")] for d in data["weekly_data"]]
+        )
+
+    pdf.add_page()
+    pdf.page_title("Quality Distribution")
+    pdf.chart(charts.get("dist_chart"), width_ratio=0.6)
+    if data.get("quality_distribution"):
+        pdf.data_table(
+            ["Range", "Count", "Percentage"],
+            [[d.get("range"), d.get("count"), f"{d.get('percentage')}%"] for d in data["quality_distribution"]]
+        )
+
+    pdf.add_page()
+    pdf.page_title("Recent Scans")
+    pdf.chart(charts.get("recent_chart"))
+    if data.get("recent_scans"):
+        pdf.data_table(
+            ["Date", "Variety", "Quality", "Status"],
+            [[s.get("formatted_date"), s.get("variety"), f"{s.get('quality')}%", s.get("status")] for s in data["recent_scans"]]
+        )
+
+    return pdf_bytes(pdf)
+
+
+def render_admin_report(data: Dict[str, Any], charts: Dict[str, Optional[bytes]]) -> bytes:
+    """gen_admin_analytics_template.html: metrics, health, charts and daily scans."""
+    stats = data.get("stats", {})
+    pdf = ReportPDF()
+    pdf.add_page()
+    pdf.page_title("Gen Admin Analytics Report", f"Generated at: {data.get('generated_at', '')}")
+
+    pdf.section_title("Key Metrics")
+    pdf.cards([
+        (stats.get("total_users"), "Total Users"),
+        (stats.get("total_scans"), "Total Scans"),
+        (stats.get("total_durians_detected"), "Durians Detected"),
+        (f"{stats.get('overall_success_rate')}%", "Overall Success Rate"),
+        (f"{stats.get('user_growth_percent')}%", "User Growth"),
+        (f"{stats.get('weekly_growth_percent')}%", "Weekly Growth"),
+    ], per_row=2, height=24, fill=CARD_FILL)
+
+    pdf.section_title("System Health")
+    pdf.line_of(stats.get("system_health") or "N/A", 10, height=6)
+
+    pdf.section_title("Weekly Activity Chart")
+    pdf.chart(charts.get("weekly_chart"), missing="No weekly activity data available.")
+
+    pdf.section_title("Scan Success Breakdown")
+    pdf.chart(charts.get("success_pie"), width_ratio=0.6, missing="No scan success data available.")
+
+    pdf.section_title("Recent Scan Details")
+    if stats.get("daily_scans"):
+        pdf.data_table(["Day", "Scans"], [[d.get("day"), d.get("scans")] for d in stats["daily_scans"]])
+    else:
+        pdf.line_of("No daily scans data available.", 10, "", MUTED, height=6)
+
+    return pdf_bytes(pdf)
+
+
+RENDERERS = {
+    "user": render_user_report,
+    "admin": render_admin_report,
+}
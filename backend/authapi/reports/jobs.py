@@ -0,0 +1,317 @@
+# backend/authapi/reports/jobs.py
+"""
+Report job queue
+
+PDF reports are rendered by a bounded pool of worker processes instead of
+inside the request. A job is identified by its artifact key, a hash of
+(report kind, user, time_range, data version), so:
+
+- identical requests (e.g. everyone downloading their monthly report at the
+  end of the month) map to the same job and the PDF is rendered once,
+- a finished PDF is served from REPORT_CACHE_DIR until the data version
+  changes or the file is older than REPORT_CACHE_TTL_SECONDS,
+- job state lives next to the artifact on disk (<key>.job.json), so any
+  gunicorn worker on the host can answer status and download requests.
+
+The data version comes from db.analytics and only costs a count and an
+indexed find_one; the report data itself is built in the web process and
+handed to the worker, which never talks to MongoDB.
+
+Workers are started with the "spawn" method so they never inherit the
+MongoDB client, gevent hub or model weights of the web process.
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from hashlib import sha256
+from typing import Any, BinaryIO, Dict, Optional
+
+from db import analytics as analytics_service
+
+# ---------------------------
+# Settings
+# ---------------------------
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", min(2, os.cpu_count() or 1)))
+REPORT_QUEUE_MAX = int(os.getenv("REPORT_QUEUE_MAX", 16))
+REPORT_WAIT_SECONDS = float(os.getenv("REPORT_WAIT_SECONDS", 30))
+REPORT_JOB_TIMEOUT_SECONDS = float(os.getenv("REPORT_JOB_TIMEOUT_SECONDS", 300))
+REPORT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+REPORT_CACHE_DIR = os.getenv(
+    "REPORT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "reports")
+)
+REPORT_PRUNE_INTERVAL_SECONDS = 600
+
+# Bump when the rendered output changes so stale artifacts are not served
+REPORT_FORMAT_VERSION = 3
+
+TIME_RANGES = ("week", "month", "year")
+_JOB_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ReportsBusy(Exception):
+    """Raised when too many reports are already queued in this process."""
+
+
+# ---------------------------
+# Worker pool
+# ---------------------------
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+_inflight: Dict[str, Any] = {}
+_inflight_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor_pid != pid or _executor is None:
+        with _executor_lock:
+            if _executor_pid != pid or _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=max(1, REPORT_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        _executor = None
+
+
+# ---------------------------
+# Artifact store
+# ---------------------------
+
+def artifact_key(kind: str, subject: str, time_range: Optional[str], version: str) -> str:
+    raw = json.dumps([REPORT_FORMAT_VERSION, kind, subject, time_range, version])
+    return sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _path(job_id: str, suffix: str) -> str:
+    return os.path.join(REPORT_CACHE_DIR, f"{job_id}.{suffix}")
+
+
+def _read_job(job_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_path(job_id, "job.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_job(job_id: str, job: Dict[str, Any]):
+    tmp = f"{_path(job_id, 'job.json')}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(job, f)
+    os.replace(tmp, _path(job_id, "job.json"))
+
+
+def _claim(job_id: str, job: Dict[str, Any]) -> bool:
+    """Take ownership of a job unless another process is already rendering it."""
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    try:
+        fd = os.open(_path(job_id, "job.json"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        with os.fdopen(fd, "w") as f:
+            json.dump(job, f)
+        return True
+    except FileExistsError:
+        existing = _read_job(job_id) or {}
+        stale = time.time() - existing.get("submitted_at", 0) > REPORT_JOB_TIMEOUT_SECONDS
+        if existing.get("status") == "failed" or stale:
+            _write_job(job_id, job)
+            return True
+        return False
+
+
+def artifact_path(job_id: str) -> Optional[str]:
+    """Path of the finished PDF for a job, or None."""
+    if not _JOB_ID.match(job_id or ""):
+        return None
+    path = _path(job_id, "pdf")
+    return path if os.path.exists(path) else None
+
+
+def open_artifact(job_id: str) -> Optional[BinaryIO]:
+    """The finished PDF opened for reading, or None if it is gone (e.g. pruned)."""
+    path = artifact_path(job_id)
+    if path is None:
+        return None
+    try:
+        return open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+
+def discard_job(job_id: str):
+    """Forget a job whose PDF was pruned, so the next submit renders it again."""
+    if not _JOB_ID.match(job_id or "") or artifact_path(job_id) is not None:
+        return
+    try:
+        os.remove(_path(job_id, "job.json"))
+    except OSError:
+        pass
+
+
+def prune_cache(max_age: float = REPORT_CACHE_TTL_SECONDS) -> int:
+    """Delete artifacts and job files older than max_age seconds."""
+    removed = 0
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(REPORT_CACHE_DIR)
+    except OSError:
+        return 0
+    for name in names:
+        path = os.path.join(REPORT_CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    if removed:
+        print(f"[REPORTS] Pruned {removed} cached report files")
+    return removed
+
+
+def _maybe_prune():
+    global _last_prune
+    now = time.time()
+    if now - _last_prune > REPORT_PRUNE_INTERVAL_SECONDS:
+        _last_prune = now
+        prune_cache()
+
+
+# ---------------------------
+# Jobs
+# ---------------------------
+
+def _render(kind: str, data: Dict[str, Any], path: str) -> int:
+    """Worker entry point; matplotlib and FPDF never load in the web process."""
+    from .render import render_to_file
+    return render_to_file(kind, data, path)
+
+
+def _finish(job_id: str, future):
+    """Record a failed render; a successful one is visible through its PDF."""
+    with _inflight_lock:
+        if _inflight.get(job_id) is not future:
+            return
+        _inflight.pop(job_id, None)
+    error = future.exception()
+    if error is None:
+        return
+    if isinstance(error, BrokenProcessPool):
+        _reset_executor()
+    print(f"[REPORTS] Report {job_id[:12]} failed: {error}")
+    job = _read_job(job_id) or {}
+    _write_job(job_id, {**job, "status": "failed", "error": str(error), "finished_at": time.time()})
+
+
+def _submit(kind: str, subject: str, time_range: Optional[str], version: str, build_data) -> Dict[str, Any]:
+    job_id = artifact_key(kind, subject, time_range, version)
+    job = get_job(job_id)
+    if job and job["status"] in ("queued", "done"):
+        return job
+
+    with _inflight_lock:
+        if job_id in _inflight:
+            return get_job(job_id)
+        if len(_inflight) >= REPORT_WORKERS + REPORT_QUEUE_MAX:
+            raise ReportsBusy("Too many reports are being generated, please try again shortly")
+
+    _maybe_prune()
+    job = {
+        "job_id": job_id,
+        "kind": kind,
+        "subject": subject,
+        "time_range": time_range,
+        "status": "queued",
+        "submitted_at": time.time()
+    }
+    if not _claim(job_id, job):
+        return get_job(job_id)
+
+    try:
+        data = build_data()
+        future = _get_executor().submit(_render, kind, data, _path(job_id, "pdf"))
+    except Exception as e:
+        _write_job(job_id, {**job, "status": "failed", "error": str(e), "finished_at": time.time()})
+        raise
+    with _inflight_lock:
+        _inflight[job_id] = future
+    future.add_done_callback(lambda f: _finish(job_id, f))
+    return job
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Current state of a job: queued, done or failed (None if unknown)."""
+    if not _JOB_ID.match(job_id or ""):
+        return None
+    job = _read_job(job_id)
+    if job is None:
+        return None
+    if os.path.exists(_path(job_id, "pdf")):
+        job["status"] = "done"
+    elif job.get("status") == "queued" and time.time() - job.get("submitted_at", 0) > REPORT_JOB_TIMEOUT_SECONDS:
+        job["status"] = "failed"
+        job["error"] = "Report generation timed out"
+    return job
+
+
+def wait(job_id: str, timeout: float = REPORT_WAIT_SECONDS) -> Optional[Dict[str, Any]]:
+    """Block until a job leaves the queue or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_job(job_id)
+        remaining = deadline - time.monotonic()
+        if job is None or job["status"] != "queued" or remaining <= 0:
+            return job
+        future = _inflight.get(job_id)
+        if future is None:
+            time.sleep(min(0.25, remaining))  # rendered by another worker process
+        elif future.done():
+            _finish(job_id, future)
+        else:
+            wait_futures([future], timeout=remaining)
+
+
+def submit_user_report(user_id: str, time_range: str = "month") -> Dict[str, Any]:
+    if time_range not in TIME_RANGES:
+        raise ValueError(f"time_range must be one of {', '.join(TIME_RANGES)}")
+
+    def build_data():
+        data = analytics_service.get_user_analytics(user_id, time_range)
+        for scan in data.get("recent_scans", []):
+            created_at = scan.get("created_at")
+            scan["formatted_date"] = created_at.strftime("%Y-%m-%d") if isinstance(created_at, datetime) else "N/A"
+        return data
+
+    version = analytics_service.get_user_data_version(user_id)
+    return _submit("user", user_id, time_range, version, build_data)
+
+
+def submit_admin_report() -> Dict[str, Any]:
+    def build_data():
+        return {"stats": analytics_service.get_admin_analytics_data()}
+
+    version = analytics_service.get_admin_data_version()
+    return _submit("admin", "platform", None, version, build_data)
+
+
+def public_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job fields safe to return to clients."""
+    fields = ("job_id", "kind", "status", "time_range", "error")
+    return {k: job[k] for k in fields if job.get(k) is not None}
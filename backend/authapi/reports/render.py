@@ -0,0 +1,107 @@
+# backend/authapi/reports/render.py
+"""
+PDF report rendering
+
+Runs inside the report worker processes (see reports/jobs.py), so it only
+takes plain report data and never touches MongoDB or Flask. Charts come
+from reports/charts.py as PNG, or as vector SVG with REPORT_CHART_FORMAT=svg
+on fpdf2.
+
+By default the PDF is laid out natively with FPDF (reports/fpdf_renderer.py);
+set REPORT_RENDERER=wkhtmltopdf to render the HTML templates with
+wkhtmltopdf instead. wkhtmltopdf is also the fallback when FPDF fails and a
+binary is available (WKHTMLTOPDF_PATH or on PATH).
+"""
+
+import base64
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from . import charts
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+REPORT_RENDERER = os.getenv("REPORT_RENDERER", "fpdf").lower()
+WKHTMLTOPDF_PATH = os.getenv("WKHTMLTOPDF_PATH") or shutil.which("wkhtmltopdf")
+REPORT_CHART_FORMAT = os.getenv("REPORT_CHART_FORMAT", "png").lower()
+PDF_OPTIONS = {
+    'page-size': 'A4',
+    'encoding': "UTF-8",
+    'enable-local-file-access': None
+}
+
+TEMPLATES = {
+    "user": "durian_report_template.html",
+    "admin": "gen_admin_analytics_template.html",
+}
+
+_env = None
+
+
+def _get_env():
+    global _env
+    if _env is None:
+        from jinja2 import Environment, FileSystemLoader, select_autoescape
+        _env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape(["html"]))
+    return _env
+
+
+# =========================
+# REPORTS
+# =========================
+def build_charts(kind: str, data: Dict[str, Any], fmt: str = "png") -> Dict[str, Optional[bytes]]:
+    if kind == "admin":
+        stats = data.get("stats", {})
+        return {
+            "weekly_chart": charts.admin_weekly_chart(stats.get("daily_scans", []), fmt),
+            "success_pie": charts.success_chart(stats.get("scan_success_breakdown"), fmt)
+        }
+    return {
+        "weekly_chart": charts.weekly_chart(data.get("weekly_data", []), fmt),
+        "dist_chart": charts.quality_chart(data.get("quality_distribution", []), fmt),
+        "recent_chart": charts.recent_scan_chart(data.get("recent_scans", []), fmt)
+    }
+
+
+def render_fpdf(kind: str, data: Dict[str, Any]) -> bytes:
+    from .fpdf_renderer import FPDF2, RENDERERS
+    # SVG charts need fpdf2; PyFPDF 1.7 only embeds raster images
+    fmt = REPORT_CHART_FORMAT if FPDF2 else "png"
+    return RENDERERS[kind](data, build_charts(kind, data, fmt))
+
+
+def render_wkhtmltopdf(kind: str, data: Dict[str, Any]) -> bytes:
+    import pdfkit
+    if not WKHTMLTOPDF_PATH:
+        raise RuntimeError("wkhtmltopdf not found; install it or set WKHTMLTOPDF_PATH")
+    pngs = build_charts(kind, data, "png")
+    encoded = {name: base64.b64encode(png).decode('utf-8') for name, png in pngs.items() if png}
+    html = _get_env().get_template(TEMPLATES[kind]).render(data={**data, **encoded})
+    config = pdfkit.configuration(wkhtmltopdf=WKHTMLTOPDF_PATH)
+    return pdfkit.from_string(html, False, configuration=config, options=PDF_OPTIONS)
+
+
+def render_pdf(kind: str, data: Dict[str, Any]) -> bytes:
+    """PDF bytes for a "user" or "admin" report built from the service data."""
+    data = {"generated_at": datetime.now().strftime('%m/%d/%Y, %I:%M %p'), **data}
+    if REPORT_RENDERER == "wkhtmltopdf":
+        return render_wkhtmltopdf(kind, data)
+    try:
+        return render_fpdf(kind, data)
+    except Exception as e:
+        if not WKHTMLTOPDF_PATH:
+            raise
+        print(f"[REPORTS] FPDF rendering failed, falling back to wkhtmltopdf: {e}")
+        return render_wkhtmltopdf(kind, data)
+
+
+def render_to_file(kind: str, data: Dict[str, Any], path: str) -> int:
+    """Render a report and move it into place atomically; returns its size."""
+    pdf = render_pdf(kind, data)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp, path)
+    return len(pdf)
@@ -1,9 +1,15 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from bson.objectid import ObjectId
-from db import users_collection, posts_collection, scans_collection  # <- added posts & scans
-from handlers.email_handler import send_deactivation_email, send_reactivation_email
+from bson.errors import InvalidId
+from db import users_collection, build_user_query, list_users, count_users, bulk_update_users, iter_users
+from db import analytics as analytics_service
+from handlers.email_handler import send_deactivation_email, send_reactivation_email, queue_account_emails
+from db.outbox import list_messages, requeue_dead, outbox_stats, STATUSES as OUTBOX_STATUSES
+import csv
 import datetime
-from auth import jwt_required, admin_required
+import io
+import json
+from auth import jwt_required, admin_required, invalidate_principal, refresh_principals
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -11,6 +17,35 @@ admin_bp = Blueprint('admin', __name__)
 # Admin User Management
 # ---------------------------
 
+USER_PAGE_MAX = 200
+BULK_MAX_USERS = 1000
+EXPORT_FIELDS = ["id", "name", "email", "role", "isActive", "createdAt", "updatedAt", "lastLogin"]
+EXPORT_FLUSH_ROWS = 500
+
+
+def _user_row(user):
+    return {
+        "id": str(user["_id"]),
+        "name": user.get("name", ""),
+        "email": user.get("email", ""),
+        "role": user.get("role", "user"),
+        "profile_picture": user.get("profile_picture") or user.get("photoProfile", ""),
+        "createdAt": user.get("createdAt", ""),
+        "updatedAt": user.get("updatedAt", ""),
+        "lastLogin": user.get("lastLogin", ""),
+        "isActive": user.get("isActive", True)
+    }
+
+
+def _user_filter_from_args():
+    active = request.args.get("active")
+    return build_user_query(
+        search=request.args.get("search", ""),
+        role=request.args.get("role") or None,
+        active=None if active in (None, "", "all") else active.lower() == "true"
+    )
+
+
 @admin_bp.route("/users", methods=["GET", "OPTIONS"])
 def get_all_users():
     if request.method == "OPTIONS":
@@ -19,25 +54,117 @@ def get_all_users():
     @jwt_required
     @admin_required
     def inner():
-        users = list(users_collection.find({}, {"password": 0}))
-        users_data = [
-            {
-                "id": str(user["_id"]),
-                "name": user.get("name", ""),
-                "email": user.get("email", ""),
-                "role": user.get("role", "user"),
-                "profile_picture": user.get("profile_picture", ""),
-                "createdAt": user.get("createdAt", ""),
-                "updatedAt": user.get("updatedAt", ""),
-                "isActive": user.get("isActive", True)
-            }
-            for user in users
-        ]
-        return jsonify({"success": True, "users": users_data, "total": len(users_data)}), 200
+        try:
+            limit = min(max(int(request.args.get("limit", 50)), 1), USER_PAGE_MAX)
+            skip = max(int(request.args.get("skip", 0)), 0)
+            query = _user_filter_from_args()
+            page = list_users(query, limit=limit, after=request.args.get("cursor") or None, skip=skip)
+        except (ValueError, InvalidId):
+            return jsonify({"success": False, "error": "Invalid pagination or filter parameters"}), 400
+
+        total, approximate = count_users(query)
+        return jsonify({
+            "success": True,
+            "users": [_user_row(user) for user in page["users"]],
+            "total": total,
+            "approximate": approximate,
+            "limit": limit,
+            "next_cursor": page["next_cursor"]
+        }), 200
 
     return inner()
 
 
+@admin_bp.route("/users/bulk", methods=["POST", "OPTIONS"])
+@jwt_required
+@admin_required
+def bulk_update():
+    if request.method == "OPTIONS":
+        return '', 200
+
+    data = request.json or {}
+    user_ids = data.get("user_ids") or []
+    action = data.get("action")
+    if not isinstance(user_ids, list) or not user_ids:
+        return jsonify({"success": False, "error": "user_ids must be a non-empty list"}), 400
+    if len(user_ids) > BULK_MAX_USERS:
+        return jsonify({"success": False, "error": f"At most {BULK_MAX_USERS} users per request"}), 400
+
+    reason = data.get("reason", "No reason provided")
+    try:
+        result = bulk_update_users(user_ids, action, role=data.get("role"), reason=reason)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    changed = result["changed"]
+    refresh_principals([user["_id"] for user in changed])
+    emails_queued = 0
+    if action in ("activate", "deactivate") and data.get("notify", True):
+        try:
+            emails_queued = queue_account_emails(action, changed, reason)
+        except Exception as e:
+            print(f"[MAIL] Could not queue bulk {action} emails: {e}")
+
+    return jsonify({
+        "success": True,
+        "action": action,
+        "requested": result["requested"],
+        "modified": result["modified"],
+        "user_ids": [str(user["_id"]) for user in changed],
+        "invalid_ids": result["invalid_ids"],
+        "emailsQueued": emails_queued
+    }), 200
+
+
+def _export_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+@admin_bp.route("/users/export", methods=["GET", "OPTIONS"])
+@jwt_required
+@admin_required
+def export_users():
+    if request.method == "OPTIONS":
+        return '', 200
+
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"success": False, "error": "format must be csv or ndjson"}), 400
+    query = _user_filter_from_args()
+
+    def rows():
+        for user in iter_users(query):
+            row = _user_row(user)
+            yield {field: _export_value(row.get(field)) for field in EXPORT_FIELDS}
+
+    def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for count, row in enumerate(rows(), 1):
+            writer.writerow(row)
+            if count % EXPORT_FLUSH_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def ndjson_lines():
+        for row in rows():
+            yield json.dumps(row) + "\n"
+
+    stamp = datetime.datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    return Response(
+        stream_with_context(csv_lines() if fmt == "csv" else ndjson_lines()),
+        mimetype="text/csv" if fmt == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f"attachment; filename=users-{stamp}.{fmt}"}
+    )
+
+
 @admin_bp.route("/users/<user_id>/role", methods=["PUT", "OPTIONS"])
 @jwt_required
 @admin_required
@@ -58,6 +185,7 @@ def update_user_role(user_id):
             {"_id": ObjectId(user_id)},
             {"$set": {"role": data["role"], "updatedAt": datetime.datetime.utcnow().isoformat()}}
         )
+        invalidate_principal(user_id)
 
         if result.modified_count > 0:
             return jsonify({"success": True, "message": "Role updated"}), 200
@@ -93,6 +221,7 @@ def deactivate_user(user_id):
                 }
             }
         )
+        invalidate_principal(user_id)
 
         email_sent = False
         if result.modified_count > 0:
@@ -126,6 +255,7 @@ def activate_user(user_id):
                 "$unset": {"deactivationReason": "", "deactivatedAt": ""}
             }
         )
+        invalidate_principal(user_id)
 
         email_sent = False
         if result.modified_count > 0:
@@ -151,6 +281,7 @@ def delete_user(user_id):
             {"_id": ObjectId(user_id)},
             {"$set": {"isActive": False, "updatedAt": datetime.datetime.utcnow().isoformat()}}
         )
+        invalidate_principal(user_id)
 
         if result.modified_count > 0:
             return jsonify({"success": True, "message": "User deleted"}), 200
@@ -199,45 +330,52 @@ def get_admin_stats():
 @admin_required
 def get_admin_analytics():
     try:
-        # -------------------------------
-        # Fetch stats
-        # -------------------------------
-        total_users = users_collection.count_documents({})
-        total_posts = posts_collection.count_documents({})
-        total_scans = scans_collection.count_documents({})
-
-        # -------------------------------
-        # Total durians safely
-        # -------------------------------
-        pipeline_durians = [
-            {"$group": {"_id": None, "total_durians": {"$sum": {"$ifNull": ["$durian_count", 0]}}}}
-        ]
-        durians_result = list(scans_collection.aggregate(pipeline_durians))
-        total_durians = durians_result[0]["total_durians"] if durians_result else 0
-
-        # -------------------------------
-        # Overall success rate safely
-        # -------------------------------
-        pipeline_success = [
-            {"$group": {"_id": None, "avg_success": {"$avg": {"$ifNull": ["$export_ready", 0]}}}}
-        ]
-        success_result = list(scans_collection.aggregate(pipeline_success))
-        overall_success_rate = success_result[0]["avg_success"] if success_result and success_result[0]["avg_success"] is not None else 0
-
-        # -------------------------------
-        # Return JSON
-        # -------------------------------
-        return jsonify({
-            "success": True,
-            "stats": {
-                "total_users": total_users,
-                "total_posts": total_posts,
-                "total_scans": total_scans,
-                "total_durians_detected": total_durians,
-                "overall_success_rate": round(overall_success_rate, 2)
-            }
-        }), 200
+        return jsonify({"success": True, "stats": analytics_service.get_admin_analytics()}), 200
 
     except Exception as e:
         print("GenAnalytics error:", e)
-        return jsonify({"success": False, "error": "Failed to fetch admin GenAnalytics"}), 500
\ No newline at end of file
+        return jsonify({"success": False, "error": "Failed to fetch admin GenAnalytics"}), 500
+
+
+# ---------------------------
+# Email Outbox (dead letters)
+# ---------------------------
+
+@admin_bp.route("/outbox", methods=["GET", "OPTIONS"])
+@jwt_required
+@admin_required
+def get_outbox():
+    if request.method == "OPTIONS":
+        return '', 200
+
+    status = request.args.get("status", "dead")
+    if status not in OUTBOX_STATUSES:
+        return jsonify({"success": False, "error": "Invalid status"}), 400
+    try:
+        limit = min(max(int(request.args.get("limit", 50)), 1), 200)
+        skip = max(int(request.args.get("skip", 0)), 0)
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid pagination parameters"}), 400
+
+    return jsonify({
+        "success": True,
+        "status": status,
+        "messages": list_messages(status, limit=limit, skip=skip),
+        "counts": outbox_stats()
+    }), 200
+
+
+@admin_bp.route("/outbox/retry", methods=["POST", "OPTIONS"])
+@jwt_required
+@admin_required
+def retry_outbox():
+    if request.method == "OPTIONS":
+        return '', 200
+
+    ids = (request.json or {}).get("ids")
+    try:
+        message_ids = [ObjectId(message_id) for message_id in ids] if ids is not None else None
+    except (InvalidId, TypeError):
+        return jsonify({"success": False, "error": "Invalid message id"}), 400
+
+    return jsonify({"success": True, "requeued": requeue_dead(message_ids)}), 200
@@ -1,10 +1,11 @@
 from flask import Blueprint, request, jsonify
-from auth import signup_user, login_user, hash_password, signup_user_with_pfp, get_current_admin
+from auth import signup_user, login_user, hash_password, signup_user_with_pfp, get_current_admin, invalidate_principal
 from db import users_collection, upload_user_pfp
 from bson.objectid import ObjectId
 import tempfile
 import os
 import traceback
+from ratelimit import rate_limit, login_account
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -13,6 +14,7 @@ auth_bp = Blueprint('auth', __name__)
 # ---------------------------
 
 @auth_bp.route("/signup", methods=["POST", "OPTIONS"])
+@rate_limit("signup")
 def signup():
     if request.method == "OPTIONS":
         return '', 200
@@ -26,7 +28,7 @@ def signup():
             confirm_password = request.form.get("confirmPassword")
             photo_file = request.files.get("photo")
             result = signup_user_with_pfp(name, email, password, confirm_password, photo_file)
-            return jsonify(result), 200 if result.get("success") else 400
+            return jsonify(result), 200 if result.get("success") else 503 if result.get("busy") else 400
         else:
             data = request.json
             if not data:
@@ -37,7 +39,7 @@ def signup():
             password = data.get("password")
             confirm_password = data.get("confirmPassword")
             result = signup_user(name, email, password, confirm_password)
-            return jsonify(result), 200 if result.get("success") else 400
+            return jsonify(result), 200 if result.get("success") else 503 if result.get("busy") else 400
 
     except Exception as e:
         print("Signup error:", str(e))
@@ -46,6 +48,7 @@ def signup():
 
 
 @auth_bp.route("/login", methods=["POST", "OPTIONS"])
+@rate_limit("login", account_key=login_account)
 def login():
     if request.method == "OPTIONS":
         return '', 200
@@ -59,7 +62,7 @@ def login():
         password = data.get("password")
 
         result = login_user(email, password)
-        return jsonify(result), 200 if result.get("success") else 401
+        return jsonify(result), 200 if result.get("success") else 503 if result.get("busy") else 401
 
     except Exception as e:
         print("Login error:", str(e))
@@ -88,6 +91,7 @@ def logout():
             {"_id": ObjectId(user_id)},
             {"$set": {"isLoggedIn": False}}
         )
+        invalidate_principal(user_id)
         return jsonify({"success": True, "message": "Logged out"}), 200
 
     except Exception as e:
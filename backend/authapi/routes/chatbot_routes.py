@@ -1,51 +1,75 @@
-from flask import Blueprint, request, jsonify
-import requests
-import os
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+import json
+from auth import decode_request_token
+from handlers import chat_handler
+from handlers.chat_handler import ChatError
 
 chatbot_bp = Blueprint('chatbot', __name__)
 
+
+def _sse(payload) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _grounding_user_id(data):
+    """
+    The caller's own id, whose scans may ground the answer. It comes from a
+    verified token; a user_id / X-User-Id that does not match it is ignored,
+    and without a token the answer is grounded on forum posts alone.
+    """
+    payload = decode_request_token()
+    token_user = str(payload.get("sub") or "") if payload else ""
+    claimed = data.get('user_id') or request.headers.get('X-User-Id')
+    if token_user and (not claimed or str(claimed) == token_user):
+        return token_user
+    return None
+
+
+def _wants_stream(data) -> bool:
+    return bool(data.get('stream')) or 'text/event-stream' in request.headers.get('Accept', '')
+
+
 @chatbot_bp.route('/chat', methods=['POST'])
 def chat():
     try:
-        data = request.json
-        messages = data.get('messages', [])
-        
-        # Get Groq API key from environment
-        api_key = os.getenv('GROQ_API_KEY')
-        if not api_key:
-            return jsonify({
-                'success': False,
-                'error': 'GROQ_API_KEY not configured'
-            }), 500
-        
-        # Call Groq API
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {api_key}',
-                'Content-Type': 'application/json'
-            },
-            json={
-                'model': 'llama-3.1-8b-instant',  # Fast and free model
-                'messages': messages,
-                'max_tokens': 1000,
-                'temperature': 0.7
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
+        data = request.json or {}
+        messages = chat_handler.ground_messages(data.get('messages', []), _grounding_user_id(data))
+
+        if not _wants_stream(data):
             return jsonify({
                 'success': True,
-                'message': result['choices'][0]['message']['content']
+                'message': chat_handler.complete(messages)
             })
-        else:
-            return jsonify({
-                'success': False,
-                'error': f'Groq API error: {response.status_code}'
-            }), response.status_code
-            
+
+        # Pull the first chunk before answering so busy/upstream errors
+        # still get a proper status code instead of a broken stream
+        chunks = chat_handler.stream(messages)
+        first = next(chunks, None)
+
+        def events():
+            try:
+                if first:
+                    yield _sse({'delta': first})
+                for delta in chunks:
+                    yield _sse({'delta': delta})
+                yield _sse({'done': True})
+            except ChatError as e:
+                print(f'[ERROR] Chat stream error: {str(e)}')
+                yield _sse({'error': str(e)})
+
+        return Response(
+            stream_with_context(events()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    except ChatError as e:
+        print(f'[ERROR] Chat error: {str(e)}')
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), e.status
+
     except Exception as e:
         print(f'[ERROR] Chat error: {str(e)}')
         return jsonify({
@@ -1,6 +1,5 @@
 from flask import Blueprint, request, jsonify
 from bson import ObjectId
-from datetime import datetime
 import db
 
 # Create Blueprint
@@ -23,40 +22,20 @@ def get_forum_posts():
         limit = int(request.args.get('limit', 50))
         skip = int(request.args.get('skip', 0))
         search = request.args.get('search', '')
+        user_id = request.args.get('user_id') or request.headers.get('X-User-Id')
         
-        query = {}
-        if category and category != "All":
-            query["category"] = category
+        # Indexed search (text index + token prefix), never a regex scan
+        result = db.get_posts(category=category, limit=limit, skip=skip, search=search)
+        posts = result["posts"]
+        # One $in query for the whole page instead of shipping liked_by arrays
+        db.annotate_liked("post", posts, user_id)
+        db.hydrate_authors(posts)
         
-        if search:
-            query["$or"] = [
-                {"title": {"$regex": search, "$options": "i"}},
-                {"content": {"$regex": search, "$options": "i"}},
-                {"username": {"$regex": search, "$options": "i"}}
-            ]
-        
-        posts = list(db.posts_collection.find(query)
-                    .sort("created_at", -1)
-                    .skip(skip)
-                    .limit(limit))
-        
-        # Helper to serialize BSON types (ObjectId, datetime) and lists
-        def _serialize_doc(doc):
-            for k, v in list(doc.items()):
-                if isinstance(v, ObjectId):
-                    doc[k] = str(v)
-                elif isinstance(v, list):
-                    doc[k] = [str(x) if isinstance(x, ObjectId) else (x.isoformat() if isinstance(x, datetime) else x) for x in v]
-                elif isinstance(v, datetime):
-                    doc[k] = v.isoformat()
-            return doc
-
-        posts = [_serialize_doc(post) for post in posts]
-            
         return jsonify({
             "success": True,
             "posts": posts,
-            "total": db.posts_collection.count_documents(query)
+            "total": result["total"],
+            "total_is_approximate": result.get("approximate", False)
         }), 200
         
     except Exception as e:
@@ -70,28 +49,14 @@ def get_single_post(post_id):
         return '', 200
     
     try:
-        post = db.posts_collection.find_one({"_id": ObjectId(post_id)})
+        # Views are buffered and flushed in batches; the read does no write
+        post = db.get_post(post_id, increment_views=True)
         
         if not post:
             return jsonify({"success": False, "error": "Post not found"}), 404
         
-        db.posts_collection.update_one(
-            {"_id": ObjectId(post_id)},
-            {"$inc": {"views": 1}}
-        )
-        
-        # Serialize BSON types to JSON-safe types
-        def _serialize_doc(doc):
-            for k, v in list(doc.items()):
-                if isinstance(v, ObjectId):
-                    doc[k] = str(v)
-                elif isinstance(v, list):
-                    doc[k] = [str(x) if isinstance(x, ObjectId) else (x.isoformat() if isinstance(x, datetime) else x) for x in v]
-                elif isinstance(v, datetime):
-                    doc[k] = v.isoformat()
-            return doc
-
-        post = _serialize_doc(post)
+        db.annotate_liked("post", [post], request.args.get('user_id') or request.headers.get('X-User-Id'))
+        db.hydrate_authors([post])
         
         return jsonify({"success": True, "post": post}), 200
         
@@ -117,42 +82,11 @@ def create_forum_post():
             print("[ROUTE] Missing required fields in POST /forum/posts", data)
             return jsonify({"success": False, "error": "Missing required fields"}), 400
         
-        user = db.users_collection.find_one({"_id": ObjectId(data["user_id"])})
-        if not user:
+        created_post = db.create_post(data["user_id"], data["title"], data["content"], data["category"])
+        if not created_post:
             print(f"[ROUTE] User not found for id: {data.get('user_id')}")
             return jsonify({"success": False, "error": "User not found"}), 404
-        
-        post_data = {
-            "user_id": ObjectId(data["user_id"]),
-            "username": user.get("name", "Anonymous"),
-            "user_avatar": user.get("photoProfile", ""),
-            "title": data["title"],
-            "content": data["content"],
-            "category": data["category"],
-            "replies": 0,
-            "views": 0,
-            "likes": 0,
-            "liked_by": [],
-            "is_pinned": False,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        result = db.posts_collection.insert_one(post_data)
-        print(f"[ROUTE] Inserted post id: {result.inserted_id}")
-        
-        created_post = db.posts_collection.find_one({"_id": result.inserted_id})
-        # Serialize new post doc
-        def _serialize_doc(doc):
-            for k, v in list(doc.items()):
-                if isinstance(v, ObjectId):
-                    doc[k] = str(v)
-                elif isinstance(v, list):
-                    doc[k] = [str(x) if isinstance(x, ObjectId) else (x.isoformat() if isinstance(x, datetime) else x) for x in v]
-                elif isinstance(v, datetime):
-                    doc[k] = v.isoformat()
-            return doc
-        created_post = _serialize_doc(created_post)
+        print(f"[ROUTE] Inserted post id: {created_post['_id']}")
         
         return jsonify({
             "success": True,
@@ -176,47 +110,11 @@ def like_forum_post(post_id):
         if "user_id" not in data:
             return jsonify({"success": False, "error": "User ID required"}), 400
         
-        post = db.posts_collection.find_one({"_id": ObjectId(post_id)})
-        if not post:
+        # Atomic conditional toggle; returns the post as it is after the update
+        updated_post, liked = db.toggle_post_like(post_id, data["user_id"])
+        if not updated_post:
             return jsonify({"success": False, "error": "Post not found"}), 404
         
-        user_id = ObjectId(data["user_id"])
-        liked_by = post.get("liked_by", [])
-        
-        if user_id in liked_by:
-            db.posts_collection.update_one(
-                {"_id": ObjectId(post_id)},
-                {
-                    "$pull": {"liked_by": user_id},
-                    "$inc": {"likes": -1},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
-            liked = False
-        else:
-            db.posts_collection.update_one(
-                {"_id": ObjectId(post_id)},
-                {
-                    "$addToSet": {"liked_by": user_id},
-                    "$inc": {"likes": 1},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
-            liked = True
-        
-        updated_post = db.posts_collection.find_one({"_id": ObjectId(post_id)})
-        # Serialize updated post
-        def _serialize_doc(doc):
-            for k, v in list(doc.items()):
-                if isinstance(v, ObjectId):
-                    doc[k] = str(v)
-                elif isinstance(v, list):
-                    doc[k] = [str(x) if isinstance(x, ObjectId) else (x.isoformat() if isinstance(x, datetime) else x) for x in v]
-                elif isinstance(v, datetime):
-                    doc[k] = v.isoformat()
-            return doc
-        updated_post = _serialize_doc(updated_post)
-        
         return jsonify({
             "success": True,
             "liked": liked,
@@ -250,33 +148,9 @@ def create_comment():
             print("[ROUTE] Missing required fields in POST /forum/comments", data)
             return jsonify({"success": False, "error": "Missing required fields"}), 400
         
-        user = db.users_collection.find_one({"_id": ObjectId(data["user_id"])})
-        if not user:
-            return jsonify({"success": False, "error": "User not found"}), 404
-        
-        comment_data = {
-            "user_id": ObjectId(data["user_id"]),
-            "username": user.get("name", "Anonymous"),
-            "user_avatar": user.get("photoProfile", ""),
-            "post_id": ObjectId(data["post_id"]),
-            "content": data["content"],
-            "likes": 0,
-            "liked_by": [],
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        result = db.comments_collection.insert_one(comment_data)
-        
-        db.posts_collection.update_one(
-            {"_id": ObjectId(data["post_id"])},
-            {"$inc": {"replies": 1}}
-        )
-        
-        created_comment = db.comments_collection.find_one({"_id": result.inserted_id})
-        created_comment["_id"] = str(created_comment["_id"])
-        created_comment["user_id"] = str(created_comment["user_id"])
-        created_comment["post_id"] = str(created_comment["post_id"])
+        created_comment = db.create_comment(data["user_id"], data["post_id"], data["content"])
+        if not created_comment:
+            return jsonify({"success": False, "error": "User or post not found"}), 404
         
         return jsonify({
             "success": True,
@@ -295,21 +169,10 @@ def get_post_comments(post_id):
         return '', 200
     
     try:
-        comments = list(db.comments_collection.find({"post_id": ObjectId(post_id)})
+        comments = list(db.comments_collection.find({"post_id": ObjectId(post_id)}, {"liked_by": 0})
                        .sort("created_at", 1))
-        
-        # Serialize comment docs
-        def _serialize_doc(doc):
-            for k, v in list(doc.items()):
-                if isinstance(v, ObjectId):
-                    doc[k] = str(v)
-                elif isinstance(v, list):
-                    doc[k] = [str(x) if isinstance(x, ObjectId) else (x.isoformat() if isinstance(x, datetime) else x) for x in v]
-                elif isinstance(v, datetime):
-                    doc[k] = v.isoformat()
-            return doc
-
-        comments = [_serialize_doc(comment) for comment in comments]
+        db.annotate_liked("comment", comments, request.args.get('user_id') or request.headers.get('X-User-Id'))
+        db.hydrate_authors(comments)
         
         return jsonify({
             "success": True,
@@ -332,39 +195,10 @@ def like_comment(comment_id):
         if "user_id" not in data:
             return jsonify({"success": False, "error": "User ID required"}), 400
         
-        comment = db.comments_collection.find_one({"_id": ObjectId(comment_id)})
-        if not comment:
+        updated_comment, liked = db.toggle_comment_like(comment_id, data["user_id"])
+        if not updated_comment:
             return jsonify({"success": False, "error": "Comment not found"}), 404
         
-        user_id = ObjectId(data["user_id"])
-        liked_by = comment.get("liked_by", [])
-        
-        if user_id in liked_by:
-            db.comments_collection.update_one(
-                {"_id": ObjectId(comment_id)},
-                {
-                    "$pull": {"liked_by": user_id},
-                    "$inc": {"likes": -1},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
-            liked = False
-        else:
-            db.comments_collection.update_one(
-                {"_id": ObjectId(comment_id)},
-                {
-                    "$addToSet": {"liked_by": user_id},
-                    "$inc": {"likes": 1},
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
-            liked = True
-        
-        updated_comment = db.comments_collection.find_one({"_id": ObjectId(comment_id)})
-        updated_comment["_id"] = str(updated_comment["_id"])
-        updated_comment["user_id"] = str(updated_comment["user_id"])
-        updated_comment["post_id"] = str(updated_comment["post_id"])
-        
         return jsonify({
             "success": True,
             "liked": liked,
@@ -387,17 +221,16 @@ def get_forum_stats():
         return '', 200
     
     try:
-        total_posts = db.posts_collection.count_documents({})
-        total_comments = db.comments_collection.count_documents({})
-        total_users = db.users_collection.count_documents({})
+        totals = db.get_forum_stats()
         
         return jsonify({
             "success": True,
             "stats": {
-                "total_posts": total_posts,
-                "total_comments": total_comments,
-                "total_users": total_users,
-                "online_users": 24
+                "total_posts": totals["total_posts"],
+                "total_comments": totals["total_comments"],
+                "total_users": totals["total_users"],
+                "online_users": 24,
+                "approximate": totals.get("approximate", False)
             }
         }), 200
         
@@ -0,0 +1,61 @@
+# backend/authapi/routes/inference_routes.py
+"""
+Inference service (APP_ROLES=inference)
+
+Serves the ai/ models to scanner-tier workers over HTTP (see inference.py).
+The body of POST /infer/<task> is the raw image; the result is the model's
+dict as JSON. Meant to listen on loopback or a private network; set
+INFERENCE_TOKEN on both sides to require a shared token.
+"""
+
+import hmac
+import os
+import tempfile
+
+from flask import Blueprint, request, jsonify
+
+from concurrency import run_inference
+from inference import TASKS, INFERENCE_TOKEN, TOKEN_HEADER, EXT_HEADER, run_task, local_status
+
+inference_bp = Blueprint('inference', __name__)
+
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'bmp', 'gif', 'webp'}
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+
+@inference_bp.before_request
+def check_token():
+    if INFERENCE_TOKEN and not hmac.compare_digest(request.headers.get(TOKEN_HEADER, ""), INFERENCE_TOKEN):
+        return jsonify({"success": False, "error": "Unauthorized"}), 401
+
+
+@inference_bp.route("/health", methods=["GET"])
+def health():
+    return jsonify(local_status())
+
+
+@inference_bp.route("/<task>", methods=["POST"])
+def infer(task):
+    if task not in TASKS:
+        return jsonify({"success": False, "error": f"Unknown task: {task}"}), 404
+
+    ext = request.headers.get(EXT_HEADER, "jpg").lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        return jsonify({"success": False, "error": "Invalid file type"}), 400
+    if (request.content_length or 0) > MAX_IMAGE_BYTES:
+        return jsonify({"success": False, "error": "File too large"}), 413
+    image = request.get_data(cache=False)
+    if not image:
+        return jsonify({"success": False, "error": "No image provided"}), 400
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{ext}') as tmp:
+        tmp.write(image)
+        temp_path = tmp.name
+    try:
+        result = run_inference(run_task, task, temp_path)
+    except Exception as e:
+        print(f"[INFERENCE] {task} failed: {e}")
+        result = {"success": False, "error": str(type(e).__name__), "message": str(e)}
+    finally:
+        os.unlink(temp_path)
+    return jsonify(result)
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from bson.objectid import ObjectId
-from auth import hash_password, get_current_admin
-from db import users_collection, upload_user_pfp
+from auth import hash_password, get_current_user, invalidate_principal
+from db import users_collection, upload_user_pfp, invalidate_author
 import datetime
 import tempfile
 import os
@@ -9,29 +9,6 @@ import traceback
 
 profile_bp = Blueprint('profile', __name__)
 
-# ---------------------------
-# Profile Routes
-# ---------------------------
-
-def get_current_user():
-    """Return the current authenticated user based on JWT token"""
-    user = get_current_admin()  # Reuse admin JWT check
-    if user:
-        return user
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return None
-    try:
-        from jose import jwt
-        from auth import JWT_SECRET, JWT_ALGORITHM
-        token = auth_header.split(" ")[1]
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("sub")
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
-        return user
-    except:
-        return None
-
 # ---------------------------
 # Get profile
 # ---------------------------
@@ -94,6 +71,8 @@ def update_profile():
             {"_id": user["_id"]},
             {"$set": update_data}
         )
+        invalidate_author(user["_id"])
+        invalidate_principal(user["_id"])
 
         if result.modified_count > 0:
             return jsonify({"success": True, "message": "Profile updated"}), 200
@@ -148,6 +127,8 @@ def update_profile_picture():
                     "photoPublicId": upload_result.get("public_id") or upload_result.get("photoPublicId")
                 }}
             )
+            invalidate_author(user["_id"])
+            invalidate_principal(user["_id"])
             return jsonify({
                 "success": True,
                 "message": "Profile picture updated",
@@ -6,16 +6,13 @@ import os
 from datetime import datetime
 import uuid
 
-# Use local YOLO model (your trained model)
-from ai.yolo_detector import get_yolo_detector
-from ai.durian_color import get_durian_color
-from ai.durian_desease import get_durian_disease
-from ai.durian_size import get_durian_size
-from ai.durian_shape import get_durian_shape
+# Models run in-process or on the inference service (see inference.py)
+import inference
 from handlers.cloudinary_handler import CloudinaryScan
+from ratelimit import rate_limit, scanner_account
 from db import (
     save_scan, get_user_scans, get_scan_by_id, delete_scan,
-    get_user_scan_stats, get_weekly_scan_data, get_quality_distribution
+    get_user_scan_stats, get_user_analytics
 )
 
 scanner_bp = Blueprint('scanner', __name__)
@@ -27,15 +24,15 @@ scanner_bp = Blueprint('scanner', __name__)
 @scanner_bp.route("/health", methods=["GET"])
 @cross_origin()  # Allow CORS for GET
 def health_check():
-    detector = get_yolo_detector()
-    test_result = detector.test_connection()
+    model = inference.status()
     
     return jsonify({
         "service": "Durian Scanner API",
-        "model": str(detector.model_path.name) if detector.model_path else "Not loaded",
+        "model": model.get("model") or "Not loaded",
         "model_type": "Local YOLO (custom trained)",
-        "available": detector.available,
-        "connection_test": test_result,
+        "inference": "remote" if inference.is_remote() else "local",
+        "available": model.get("available", False),
+        "connection_test": model.get("connection_test"),
         "timestamp": datetime.utcnow().isoformat()
     })
 
@@ -44,15 +41,14 @@ def health_check():
 @cross_origin()  # Allow CORS for GET
 def test_endpoint():
     try:
-        detector = get_yolo_detector()
-        test_result = detector.test_connection()
+        model = inference.status()
         
         return jsonify({
             "success": True,
             "message": "Scanner API is working",
             "model_type": "Local YOLO (custom trained)",
-            "model_file": str(detector.model_path.name) if detector.model_path else "Not loaded",
-            "connection": test_result,
+            "model_file": model.get("model") or "Not loaded",
+            "connection": model.get("connection_test"),
             "endpoints": {
                 "detect": "POST /scanner/detect",
                 "classify_disease": "POST /scanner/classify/disease",
@@ -75,6 +71,7 @@ def test_endpoint():
 
 @scanner_bp.route("/detect", methods=["POST", "OPTIONS"])
 @cross_origin(origin="*", headers=["Content-Type", "Authorization", "X-Requested-With", "ngrok-skip-browser-warning", "X-User-Id"])
+@rate_limit("detect", account_key=scanner_account)
 def detect_durians():
     if request.method == "OPTIONS":
         return '', 200
@@ -108,21 +105,8 @@ def detect_durians():
         
         print(f"🔍 Processing image: {image_file.filename} ({file_size/1024:.1f} KB)")
         
-        # -- YOLO Detection --
-        detector = get_yolo_detector()
-        result = detector.predict(temp_path)
-        
-        # -- Durian Color --
-        print("[DEBUG] Calling get_durian_color with:", temp_path)
-        result["color"] = get_durian_color(temp_path)
-        
-        # -- Durian Shape --
-        print("[DEBUG] Calling get_durian_shape with:", temp_path)
-        result["shape"] = get_durian_shape(temp_path)
-        
-        
-        # -- Durian Size --
-        result["size"] = get_durian_size(temp_path)
+        # -- YOLO Detection + Color, Shape, Size (one inference call) --
+        result = inference.infer("scan", temp_path)
         
         # -- Cloudinary Save if needed --
         if result.get("success") and user_id and save_to_history:
@@ -141,7 +125,7 @@ def detect_durians():
                     if scan_record:
                         result.update({
                             "scan_saved": True,
-                            "scan_id": str(scan_record.get("_id")),
+                            "scan_id": scan_record.get("_id"),
                             "cloudinary": {
                                 "image_url": cloudinary_data.get("image_url"),
                                 "thumbnail_url": cloudinary_data.get("thumbnail_url")
@@ -203,7 +187,7 @@ def classify_disease():
             temp_path = tmp.name
 
         # Run your disease model
-        result = get_durian_disease(temp_path)
+        result = inference.infer("disease", temp_path)
 
         os.unlink(temp_path)
 
@@ -252,11 +236,6 @@ def get_scan_history(user_id):
     limit = int(request.args.get('limit', 50))
     skip = int(request.args.get('skip', 0))
     scans = get_user_scans(user_id, limit=limit, skip=skip)
-    for scan in scans:
-        scan["_id"] = str(scan.get("_id"))
-        scan["user_id"] = str(scan.get("user_id"))
-        if scan.get("created_at"):
-            scan["created_at"] = scan["created_at"].isoformat()
     return jsonify({"success": True, "scans": scans, "count": len(scans), "limit": limit, "skip": skip})
 
 @scanner_bp.route("/scan/<scan_id>", methods=["GET"])
@@ -265,10 +244,6 @@ def get_single_scan(scan_id):
     scan = get_scan_by_id(scan_id)
     if not scan:
         return jsonify({"success": False, "error": "Scan not found"}), 404
-    scan["_id"] = str(scan.get("_id"))
-    scan["user_id"] = str(scan.get("user_id"))
-    if scan.get("created_at"):
-        scan["created_at"] = scan["created_at"].isoformat()
     return jsonify({"success": True, "scan": scan})
 
 @scanner_bp.route("/scan/<scan_id>", methods=["DELETE"])
@@ -287,38 +262,7 @@ def delete_user_scan(scan_id):
 @cross_origin()
 def get_analytics(user_id):
     time_range = request.args.get('time_range', 'month')
-    stats = get_user_scan_stats(user_id, time_range)
-    weekly_data = get_weekly_scan_data(user_id)
-    quality_dist = get_quality_distribution(user_id, time_range)
-    recent_scans = get_user_scans(user_id, limit=10)
-    formatted_scans = []
-    for scan in recent_scans:
-        created_at = scan.get("created_at")
-        if created_at:
-            time_diff = datetime.utcnow() - created_at
-            if time_diff.days > 0:
-                time_ago = f"{time_diff.days} days ago"
-            elif time_diff.seconds > 3600:
-                time_ago = f"{time_diff.seconds // 3600} hrs ago"
-            elif time_diff.seconds > 60:
-                time_ago = f"{time_diff.seconds // 60} min ago"
-            else:
-                time_ago = "Just now"
-        else:
-            time_ago = "Unknown"
-        formatted_scans.append({
-            "id": str(scan.get("_id")),
-            "variety": scan.get("variety", "Unknown"),
-            "quality": scan.get("quality_score", 0),
-            "status": scan.get("status", "Unknown"),
-            "time": time_ago,
-            "image_url": scan.get("image_url"),
-            "thumbnail_url": scan.get("thumbnail_url"),
-            "created_at": scan.get("created_at").isoformat() if scan.get("created_at") else None,
-            "durian_count": scan.get("durian_count", 0),
-            "confidence": scan.get("confidence", 0)
-        })
-    return jsonify({"success": True, "stats": stats, "weekly_data": weekly_data, "quality_distribution": quality_dist, "recent_scans": formatted_scans, "time_range": time_range})
+    return jsonify({"success": True, **get_user_analytics(user_id, time_range)})
 
 @scanner_bp.route("/analytics/<user_id>/stats", methods=["GET"])
 @cross_origin()
@@ -1,7 +1,6 @@
 from flask import Blueprint, request, jsonify, current_app
 bp = Blueprint('transaction', __name__)
 
-from utils.pdf_utils import generate_receipt_pdf  # returns BytesIO
 import uuid
 from handlers.email_handler import send_checkout_email
 
@@ -20,11 +19,12 @@ def checkout():
         return jsonify({"error": "Missing data"}), 400
 
     try:
+        from utils.pdf_utils import generate_receipt_pdf  # fpdf loads on first checkout
         transaction_id = str(uuid.uuid4())
         pdf_bytes = generate_receipt_pdf(items, total, transaction_id)
 
-        # Send email via Mailtrap using custom handler
-        sent = send_checkout_email(
+        # Queued for the outbox workers; a mail outage must not fail the order
+        email_queued = send_checkout_email(
             user_email=email,
             user_name=email,
             items=items,
@@ -36,14 +36,12 @@ def checkout():
             payment_method=payment_method
         )
 
-        if not sent:
-            raise Exception("Failed to send checkout email")
-
         return jsonify({
             "success": True,
             "transaction_id": transaction_id,
             "amount": total,
-            "email": email
+            "email": email,
+            "emailQueued": email_queued
         })
 
     except Exception as e:
@@ -0,0 +1,64 @@
+import datetime
+import json
+import uuid
+
+from bson import ObjectId, Decimal128
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(o):
+    """Encode BSON and other non-JSON types found in Mongo documents."""
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    if isinstance(o, Decimal128):
+        return str(o.to_decimal())
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, "item"):  # numpy scalars
+        return o.item()
+    if hasattr(o, "tolist"):  # numpy arrays
+        return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """
+    App-wide JSON provider that understands ObjectId, datetime and the other
+    BSON types at any nesting depth, so routes can jsonify Mongo documents
+    directly. Uses orjson when it is installed and the stdlib encoder
+    otherwise; both produce ISO 8601 datetimes.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            return orjson.dumps(obj, default=_default, option=option).decode("utf-8")
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None and not self._app.debug:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            body = orjson.dumps(obj, default=_default, option=option)
+        else:
+            body = self.dumps(obj, indent=2 if self._app.debug else None) + "\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
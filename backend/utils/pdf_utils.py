@@ -1,6 +1,7 @@
 from fpdf import FPDF
 from io import BytesIO
 from db import get_admin_analytics_data
+from reports.fpdf_renderer import pdf_bytes
 
 def generate_receipt_pdf(items, total, transaction_id):
     pdf = FPDF()
@@ -38,8 +39,7 @@ def generate_receipt_pdf(items, total, transaction_id):
     pdf.cell(0, 10, f"Grand Total: P{total}", ln=True, align="R")
 
     # Output as bytes
-    pdf_bytes = pdf.output(dest="S").encode("latin1")
-    return pdf_bytes
+    return pdf_bytes(pdf)
 
 def generate_admin_report_pdf():
     data = get_admin_analytics_data()  # returns dict with all admin analytics
@@ -58,5 +58,5 @@ def generate_admin_report_pdf():
     pdf.cell(0, 10, f"User Growth: {data.get('user_growth_percent', 'N/A')}%", ln=True)
     pdf.cell(0, 10, f"Weekly Growth: {data.get('weekly_growth_percent', 'N/A')}%", ln=True)
 
-    return pdf.output(dest='S').encode('latin1')  # returns PDF bytes
+    return pdf_bytes(pdf)
 
@@ -31,7 +31,7 @@ interface ForumPost {
   replies: number;
   views: number;
   likes: number;
-  liked_by: string[];
+  liked?: boolean;
   is_pinned: boolean;
   timestamp: string;
   created_at: string;
@@ -46,7 +46,7 @@ interface Comment {
   post_id: string;
   content: string;
   likes: number;
-  liked_by: string[];
+  liked?: boolean;
   timestamp: string;
   created_at: string;
 }
@@ -89,7 +89,7 @@ export default function Forum({ embedded = false }: ForumProps) {
   const fetchPosts = async () => {
     try {
       setLoadingPosts(true);
-      const url = `${API_URL}/forum/posts?category=${selectedCategory}&search=${searchQuery}`;
+      const url = `${API_URL}/forum/posts?category=${selectedCategory}&search=${searchQuery}&user_id=${userId || ""}`;
       console.log('[CLIENT] fetchPosts url:', url);
 
       const response = await fetch(url, {
@@ -129,7 +129,7 @@ export default function Forum({ embedded = false }: ForumProps) {
   const fetchComments = async (postId: string) => {
     try {
       setLoadingComments(true);
-      const response = await fetch(`${API_URL}/forum/posts/${postId}/comments`, {
+      const response = await fetch(`${API_URL}/forum/posts/${postId}/comments?user_id=${userId || ""}`, {
         headers: {
           'ngrok-skip-browser-warning': 'true',
           'Accept': 'application/json',
@@ -314,7 +314,7 @@ export default function Forum({ embedded = false }: ForumProps) {
         // Update comment in local state
         setComments(comments.map(comment =>
           comment._id === commentId
-            ? { ...comment, likes: data.likes }
+            ? { ...comment, likes: data.likes, liked: data.liked }
             : comment
         ));
       }
@@ -339,7 +339,7 @@ export default function Forum({ embedded = false }: ForumProps) {
   // Fetch posts on component mount and when filters change
   useEffect(() => {
     fetchPosts();
-  }, [selectedCategory, searchQuery]);
+  }, [selectedCategory, searchQuery, userId]);
 
   // Get user info from AsyncStorage on mount
   useEffect(() => {
@@ -539,9 +539,9 @@ export default function Forum({ embedded = false }: ForumProps) {
                         onPress={() => handleLikePost(post._id)}
                       >
                         <Ionicons
-                          name={post.liked_by?.includes(userId || "") ? "heart" : "heart-outline"}
+                          name={post.liked ? "heart" : "heart-outline"}
                           size={18}
-                          color={post.liked_by?.includes(userId || "") ? "#ef4444" : "#64748b"}
+                          color={post.liked ? "#ef4444" : "#64748b"}
                         />
                         <Text style={styles.statText}>{formatNumber(post.likes)}</Text>
                       </TouchableOpacity>
@@ -701,9 +701,9 @@ export default function Forum({ embedded = false }: ForumProps) {
                         onPress={() => handleLikeComment(comment._id)}
                       >
                         <Ionicons
-                          name={comment.liked_by?.includes(userId || "") ? "heart" : "heart-outline"}
+                          name={comment.liked ? "heart" : "heart-outline"}
                           size={16}
-                          color={comment.liked_by?.includes(userId || "") ? "#ef4444" : "#64748b"}
+                          color={comment.liked ? "#ef4444" : "#64748b"}
                         />
                         <Text style={styles.commentLikeCount}>{comment.likes}</Text>
                       </TouchableOpacity>
@@ -25,15 +25,20 @@ export default function UserManage() {
   const styles = useAdminStyles();
   const { isWeb, isSmallScreen } = useResponsive();
 
-  const { users, loading, fetchUsers } = useFetchUsers();
-
   const [sidebarVisible, setSidebarVisible] = useState(false);
   const [showDeactivated, setShowDeactivated] = useState(false);
+  const [searchText, setSearchText] = useState('');
+  const [search, setSearch] = useState('');
   const [deactivateModalVisible, setDeactivateModalVisible] = useState(false);
   const [deactivateReason, setDeactivateReason] = useState('');
   const [userToDeactivate, setUserToDeactivate] = useState<User | null>(null);
   const [deactivating, setDeactivating] = useState(false);
 
+  // Filters are applied by the server; pages are fetched on demand
+  const {
+    users, total, approximate, hasMore, loading, loadingMore, fetchUsers, loadMore,
+  } = useFetchUsers({ showDeactivated, search });
+
   // ---------------------------
   // Role update
   // ---------------------------
@@ -106,25 +111,6 @@ export default function UserManage() {
     }
   };
 
-  // ---------------------------
-  // Filtered list
-  // ---------------------------
-  const displayedUsers = showDeactivated ? users : users.filter(u => u.isActive);
-
-  // ---------------------------
-  // Loading state
-  // ---------------------------
-  if (loading) {
-    return (
-      <View style={styles.centeredContainer}>
-        <ActivityIndicator size="large" color={Palette.warmCopper} />
-        <Text style={{ marginTop: 12, fontFamily: Fonts.medium, color: Palette.slate }}>
-          Loading users...
-        </Text>
-      </View>
-    );
-  }
-
   return (
     <View style={{ flex: 1, flexDirection: (isSmallScreen || !isWeb) ? 'column' : 'row', backgroundColor: Palette.linenWhite }}>
       <AdminSidebar isVisible={sidebarVisible} onClose={() => setSidebarVisible(false)} />
@@ -160,10 +146,27 @@ export default function UserManage() {
               </TouchableOpacity>
             </View>
 
-            {displayedUsers.length === 0 ? (
+            <TextInput
+              style={searchStyles.input}
+              placeholder="Search by name or email"
+              placeholderTextColor="#999"
+              value={searchText}
+              onChangeText={setSearchText}
+              onSubmitEditing={() => setSearch(searchText)}
+              returnKeyType="search"
+            />
+            {!loading && (
+              <Text style={searchStyles.count}>
+                Showing {users.length} of {approximate ? '~' : ''}{total} users
+              </Text>
+            )}
+
+            {loading ? (
+              <ActivityIndicator size="large" color={Palette.warmCopper} style={{ marginVertical: 20 }} />
+            ) : users.length === 0 ? (
               <Text style={styles.emptyText}>No users found.</Text>
             ) : (
-              displayedUsers.map(user => (
+              users.map(user => (
                 <View key={user._id} style={styles.userRow}>
                   <View style={styles.userInfo}>
                     <Text style={styles.userName}>{user.name}</Text>
@@ -212,6 +215,12 @@ export default function UserManage() {
                 </View>
               ))
             )}
+
+            {hasMore && !loading && (
+              <TouchableOpacity style={[styles.retryBtn, { alignSelf: 'center', marginTop: 12 }]} onPress={loadMore} disabled={loadingMore}>
+                <Text style={styles.retryBtnText}>{loadingMore ? 'Loading...' : 'Load More'}</Text>
+              </TouchableOpacity>
+            )}
           </View>
         </ScrollView>
 
@@ -266,6 +275,10 @@ const modalStyles = RNStyleSheet.create({
   confirmBtnText: { color: Palette.white, fontFamily: Fonts.bold },
   disabledBtn: { backgroundColor: '#ccc' },
 });
+const searchStyles = RNStyleSheet.create({
+  input: { borderWidth: 1, borderColor: '#ddd', borderRadius: 8, paddingHorizontal: 12, paddingVertical: 8, backgroundColor: '#f9f9f9', marginTop: 12 },
+  count: { fontSize: 12, fontFamily: Fonts.medium, color: Palette.slate, marginTop: 8, marginBottom: 4 },
+});
 const mobileHeaderStyles = RNStyleSheet.create({
   header: { flexDirection: 'row', alignItems: 'center', justifyContent: 'space-between', paddingHorizontal: 20, paddingVertical: 15, backgroundColor: Palette.white, borderBottomWidth: 1, borderBottomColor: '#eee' },
   title: { fontSize: 18, fontFamily: Fonts.bold, color: Palette.deepObsidian },
@@ -17,6 +17,7 @@ import AsyncStorage from '@react-native-async-storage/async-storage';
 import { router } from 'expo-router';
 import { Picker } from '@react-native-picker/picker';
 import { API_URL } from '@/config/appconf';
+import { useFetchUsers, User } from '@/hooks/useFetchUsers';
 import { useAdminStyles } from '@/styles/admin_styles/index.styles';
 import AdminSidebar from '@/components/admin/AdminSidebar';
 import { Fonts, Palette } from '@/constants/theme';
@@ -112,14 +113,20 @@ const modalStyles = RNStyleSheet.create({
   },
 });
 
-interface User {
-  _id: string;
-  id: string;
-  name: string;
-  email: string;
-  role: string;
-  isActive: boolean;
-}
+const searchStyles = RNStyleSheet.create({
+  input: { borderWidth: 1, borderColor: '#ddd', borderRadius: 8, paddingHorizontal: 12, paddingVertical: 8, backgroundColor: '#f9f9f9', marginTop: 12 },
+  count: { fontSize: 12, fontFamily: Fonts.medium, color: Palette.slate, marginTop: 8, marginBottom: 4 },
+});
+
+// GET with the admin's stored token (this screen does not use apiFetch)
+const fetchWithToken = async (path: string) => {
+  const token = await AsyncStorage.getItem('jwt_token');
+  const res = await fetch(`${API_URL}${path}`, {
+    headers: { Authorization: `Bearer ${token}`, 'ngrok-skip-browser-warning': 'true', Accept: 'application/json' },
+  });
+  if (!res.ok) throw new Error(`HTTP ${res.status}`);
+  return res.json();
+};
 
 export default function Admin() {
   const styles = useAdminStyles();
@@ -130,8 +137,9 @@ export default function Admin() {
   const [loading, setLoading] = useState(true);
   const [statusData, setStatusData] = useState<{ message: string } | null>(null);
   const [error, setError] = useState<string | null>(null);
-  const [users, setUsers] = useState<User[]>([]);
   const [showDeactivated, setShowDeactivated] = useState(false);
+  const [searchText, setSearchText] = useState('');
+  const [search, setSearch] = useState('');
   const [deactivateModalVisible, setDeactivateModalVisible] = useState(false);
   const [deactivateReason, setDeactivateReason] = useState('');
   const [userToDeactivate, setUserToDeactivate] = useState<User | null>(null);
@@ -155,22 +163,10 @@ export default function Admin() {
       .finally(() => setLoading(false));
   };
 
-  // Fetch users
-  const fetchUsers = async () => {
-    setLoading(true);
-    const token = await AsyncStorage.getItem('jwt_token');
-    fetch(`${API_URL}/admin/users`, {
-      headers: { Authorization: `Bearer ${token}`, 'ngrok-skip-browser-warning': 'true', Accept: 'application/json' },
-    })
-      .then((res) => (res.ok ? res.json() : Promise.reject(`HTTP ${res.status}`)))
-      .then((data) => {
-        const normalizedUsers = data.users.map((user: any) => ({ ...user, _id: user._id || user.id }));
-        setUsers(normalizedUsers);
-        setError(null);
-      })
-      .catch(() => setError('Failed to fetch users.'))
-      .finally(() => setLoading(false));
-  };
+  // One page of users at a time, filtered on the server
+  const {
+    users, total, approximate, hasMore, loading: usersLoading, loadingMore, fetchUsers, loadMore,
+  } = useFetchUsers({ showDeactivated, search }, fetchWithToken);
 
   // Logout
   const handleLogout = async () => {
@@ -230,7 +226,7 @@ export default function Admin() {
       .catch(() => Alert.alert('Error', 'Failed to reactivate user.'));
   };
 
-  useEffect(() => { fetchStatus(); fetchUsers(); }, []);
+  useEffect(() => { fetchStatus(); }, []);
 
   if (userLoading || loading || !user) return (
     <View style={{ flex: 1, justifyContent: 'center', alignItems: 'center', backgroundColor: Palette.linenWhite }}>
@@ -239,8 +235,6 @@ export default function Admin() {
     </View>
   );
 
-  const visibleUsers = showDeactivated ? users : users.filter(u => u.isActive !== false);
-
   return (
     <View style={{ flex: 1, flexDirection: (isSmallScreen || !isWeb) ? 'column' : 'row', backgroundColor: Palette.linenWhite }}>
       <AdminSidebar isVisible={sidebarVisible} onClose={() => setSidebarVisible(false)} />
@@ -278,9 +272,26 @@ export default function Admin() {
               <Text style={styles.retryBtnText}>{showDeactivated ? 'Hide Deactivated' : 'Show Deactivated'}</Text>
             </TouchableOpacity>
 
-            {visibleUsers.length === 0 ? (
+            <TextInput
+              style={searchStyles.input}
+              placeholder="Search by name or email"
+              placeholderTextColor="#999"
+              value={searchText}
+              onChangeText={setSearchText}
+              onSubmitEditing={() => setSearch(searchText)}
+              returnKeyType="search"
+            />
+            {!usersLoading && (
+              <Text style={searchStyles.count}>
+                Showing {users.length} of {approximate ? '~' : ''}{total} users
+              </Text>
+            )}
+
+            {usersLoading ? (
+              <ActivityIndicator size="large" color={Palette.warmCopper} style={{ marginVertical: 20 }} />
+            ) : users.length === 0 ? (
               <Text style={styles.emptyText}>No users found.</Text>
-            ) : visibleUsers.map(u => (
+            ) : users.map(u => (
               <View key={u._id} style={styles.userRow}>
                 <View style={styles.userInfo}>
                   <Text style={styles.userName}>{u.name}</Text>
@@ -308,6 +319,12 @@ export default function Admin() {
                 </View>
               </View>
             ))}
+
+            {hasMore && !usersLoading && (
+              <TouchableOpacity style={[styles.retryBtn, { alignSelf: 'center', marginTop: 12 }]} onPress={loadMore} disabled={loadingMore}>
+                <Text style={styles.retryBtnText}>{loadingMore ? 'Loading...' : 'Load More'}</Text>
+              </TouchableOpacity>
+            )}
           </View>
         </ScrollView>
 
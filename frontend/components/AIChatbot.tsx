@@ -12,6 +12,8 @@ import {
   KeyboardAvoidingView,
 } from 'react-native';
 import { useSafeAreaInsets } from 'react-native-safe-area-context';
+import { fetch as streamingFetch } from 'expo/fetch';
+import AsyncStorage from '@react-native-async-storage/async-storage';
 import { Ionicons } from '@expo/vector-icons';
 import { API_URL } from '@/config/appconf';
 import { Fonts, Colors, Palette } from '@/constants/theme';
@@ -135,32 +137,69 @@ export default function AIChatbot({
         { role: 'user', content: userMessage.content },
       ];
 
-      const response = await fetch(`${API_URL}/chatbot/chat`, {
+      // Lets the server ground answers in this user's recent scans; the
+      // token proves the id, without it only forum posts are used
+      const userId = await AsyncStorage.getItem('user_id');
+      const token = await AsyncStorage.getItem('jwt_token');
+
+      // Stream tokens (server-sent events) so the answer appears as it is generated
+      const response = await streamingFetch(`${API_URL}/chatbot/chat`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          Accept: 'text/event-stream',
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
         },
         body: JSON.stringify({
           messages: apiMessages,
+          user_id: userId,
+          stream: true,
         }),
       });
 
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
+      if (!response.ok || !response.body) {
+        let serverError = '';
+        try {
+          serverError = (await response.json()).error || '';
+        } catch {}
+        throw new Error(serverError || `HTTP error! status: ${response.status}`);
       }
 
-      const data = await response.json();
+      const assistantId = (Date.now() + 1).toString();
+      setMessages(prev => [
+        ...prev,
+        { id: assistantId, role: 'assistant', content: '', timestamp: new Date() },
+      ]);
+      setIsLoading(false);
 
-      if (data.success && data.message) {
-        const assistantMessage: Message = {
-          id: (Date.now() + 1).toString(),
-          role: 'assistant',
-          content: data.message.trim(),
-          timestamp: new Date(),
-        };
-        setMessages(prev => [...prev, assistantMessage]);
-      } else {
-        throw new Error(data.error || 'Invalid response from server');
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let content = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split('\n\n');
+        buffer = events.pop() || '';
+        for (const event of events) {
+          if (!event.startsWith('data:')) continue;
+          const payload = JSON.parse(event.slice(5));
+          if (payload.error) throw new Error(payload.error);
+          if (payload.delta) {
+            content += payload.delta;
+            const text = content;
+            setMessages(prev =>
+              prev.map(msg => (msg.id === assistantId ? { ...msg, content: text } : msg))
+            );
+          }
+        }
+      }
+
+      if (!content.trim()) {
+        throw new Error('Invalid response from server');
       }
     } catch (error) {
       console.error('Error sending message:', error);
@@ -183,7 +222,8 @@ export default function AIChatbot({
         content: errorMessage,
         timestamp: new Date(),
       };
-      setMessages(prev => [...prev, errorResponse]);
+      // Drop the empty streaming placeholder, if any
+      setMessages(prev => [...prev.filter(msg => msg.content !== ''), errorResponse]);
     } finally {
       setIsLoading(false);
       // Scroll to bottom
@@ -1,5 +1,5 @@
 // frontend/src/hooks/useFetchUsers.ts
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { Alert } from 'react-native';
 import { apiFetch } from '@/utils/api';
 
@@ -12,35 +12,87 @@ export interface User {
   isActive: boolean;
 }
 
-export function useFetchUsers() {
+export interface UserFilters {
+  showDeactivated?: boolean;
+  search?: string;
+}
+
+type FetchJson = (path: string) => Promise<any>;
+
+// Users per request; /admin/users pages with next_cursor
+export const USER_PAGE_SIZE = 50;
+
+export function buildUsersPath(filters: UserFilters, cursor: string | null): string {
+  const params = [`limit=${USER_PAGE_SIZE}`];
+  if (!filters.showDeactivated) params.push('active=true');
+  const search = (filters.search || '').trim();
+  if (search) params.push(`search=${encodeURIComponent(search)}`);
+  if (cursor) params.push(`cursor=${encodeURIComponent(cursor)}`);
+  return `/admin/users?${params.join('&')}`;
+}
+
+/**
+ * One page of users at a time, filtered on the server. loadMore() appends
+ * the next page; fetchUsers() reloads from the first one. fetchJson must be
+ * stable (module-level or memoized).
+ */
+export function useFetchUsers(filters: UserFilters = {}, fetchJson: FetchJson = apiFetch) {
+  const { showDeactivated = false, search = '' } = filters;
   const [users, setUsers] = useState<User[]>([]);
+  const [total, setTotal] = useState(0);
+  const [approximate, setApproximate] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Responses to superseded requests (e.g. an older filter) are ignored
+  const requestId = useRef(0);
 
-  const fetchUsers = useCallback(async () => {
-    setLoading(true);
+  const loadPage = useCallback(async (cursor: string | null) => {
+    const id = ++requestId.current;
+    if (cursor) setLoadingMore(true);
+    else setLoading(true);
     try {
-      const data = await apiFetch('/admin/users');
-      const usersArray: User[] = Array.isArray(data)
-        ? data
-        : Array.isArray(data.users)
-        ? data.users
-        : [];
-      const normalizedUsers = usersArray.map((u: any) => ({
+      const data = await fetchJson(buildUsersPath({ showDeactivated, search }, cursor));
+      if (id !== requestId.current) return;
+      const page: User[] = (Array.isArray(data.users) ? data.users : []).map((u: any) => ({
         ...u,
-        _id: u._id || u.id || Math.random().toString(),
+        _id: u._id || u.id,
       }));
-      setUsers(normalizedUsers);
+      setUsers(prev => (cursor ? [...prev, ...page] : page));
+      setTotal(typeof data.total === 'number' ? data.total : page.length);
+      setApproximate(Boolean(data.approximate));
+      setNextCursor(data.next_cursor || null);
     } catch (err: any) {
+      if (id !== requestId.current) return;
       console.error('Fetch Users Error:', err);
       Alert.alert('Error', err.message || 'Failed to fetch users.');
     } finally {
-      setLoading(false);
+      if (id === requestId.current) {
+        setLoading(false);
+        setLoadingMore(false);
+      }
     }
-  }, []);
+  }, [showDeactivated, search, fetchJson]);
+
+  const fetchUsers = useCallback(() => loadPage(null), [loadPage]);
+
+  const loadMore = useCallback(() => {
+    if (nextCursor && !loading && !loadingMore) loadPage(nextCursor);
+  }, [nextCursor, loading, loadingMore, loadPage]);
 
   useEffect(() => {
     fetchUsers();
   }, [fetchUsers]);
 
-  return { users, setUsers, loading, fetchUsers };
-}
\ No newline at end of file
+  return {
+    users,
+    setUsers,
+    total,
+    approximate,
+    hasMore: nextCursor !== null,
+    loading,
+    loadingMore,
+    fetchUsers,
+    loadMore,
+  };
+}